@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+🧾 GCP Billing Export Ingester
+
+Stream billing-export dumps (CSV, JSONL or Parquet, optionally gzipped),
+keep only the rows for our project and cluster, aggregate cost by service,
+SKU and day, and reconcile the result against the monitor's estimates.
+Files are read in fixed-size chunks so memory stays bounded no matter how
+large the export is.
+"""
+
+import csv
+import gzip
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_CHUNK_SIZE = 10000
+CLUSTER_LABEL = "goog-k8s-cluster-name"
+
+
+def _open_text(path: Path):
+    """Open a possibly gzipped text file"""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", newline="")
+    return open(path, "r", newline="")
+
+
+def _file_format(path: Path) -> str:
+    """Detect the export format from the file name"""
+    suffixes = [s.lower() for s in path.suffixes if s.lower() != ".gz"]
+    suffix = suffixes[-1] if suffixes else ""
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".jsonl", ".json", ".ndjson"):
+        return "jsonl"
+    if suffix == ".parquet":
+        return "parquet"
+    raise ValueError(f"Unsupported billing export format: {path.name}")
+
+
+def _chunked(rows: Iterator[Dict[str, Any]],
+             chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Group a row iterator into lists of at most chunk_size rows"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_billing_chunks(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE
+                        ) -> Iterator[List[Dict[str, Any]]]:
+    """Yield chunks of raw rows from one billing export file"""
+    fmt = _file_format(path)
+
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Reading Parquet exports requires pyarrow") from e
+        parquet = pq.ParquetFile(path)
+        for batch in parquet.iter_batches(batch_size=chunk_size):
+            yield batch.to_pylist()
+        return
+
+    with _open_text(path) as f:
+        if fmt == "csv":
+            yield from _chunked(csv.DictReader(f), chunk_size)
+        else:
+            yield from _chunked((json.loads(line) for line in f if line.strip()),
+                                chunk_size)
+
+
+def _field(row: Dict[str, Any], dotted: str) -> Any:
+    """Read a nested field, or its flattened "a.b" column in CSV exports"""
+    if dotted in row:
+        return row[dotted]
+    value: Any = row
+    for part in dotted.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _labels(row: Dict[str, Any]) -> Dict[str, str]:
+    """Resource labels as a dict, from nested or flattened export rows"""
+    raw = row.get("labels")
+    if isinstance(raw, str):
+        raw = json.loads(raw) if raw.strip() else []
+    labels = {item.get("key"): item.get("value") for item in raw or []}
+    for column, value in row.items():
+        if column.startswith("labels.") and value not in (None, ""):
+            labels[column[len("labels."):]] = value
+    return labels
+
+
+def _credits(row: Dict[str, Any]) -> float:
+    """Sum of credits on a row (credits are negative amounts)"""
+    raw = row.get("credits")
+    if raw in (None, ""):
+        return 0.0
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            return float(raw)
+    if isinstance(raw, (int, float)):
+        return float(raw)
+    return sum(float(credit.get("amount") or 0) for credit in raw)
+
+
+class BillingAggregator:
+    """Filter billing rows and accumulate net cost by (service, SKU, day)"""
+
+    def __init__(self, project_id: Optional[str] = None,
+                 cluster_name: Optional[str] = None):
+        """Initialize the aggregator with optional project and cluster filters"""
+        self.project_id = project_id
+        self.cluster_name = cluster_name
+        self.costs: Dict[Tuple[str, str, str], float] = {}
+        self.rows_read = 0
+        self.rows_matched = 0
+        self.currencies = set()
+
+    def add_chunk(self, rows: List[Dict[str, Any]]) -> None:
+        """Fold one chunk of export rows into the totals"""
+        costs = self.costs
+        for row in rows:
+            self.rows_read += 1
+            if self.project_id and _field(row, "project.id") != self.project_id:
+                continue
+            if self.cluster_name and \
+                    _labels(row).get(CLUSTER_LABEL) != self.cluster_name:
+                continue
+
+            day = str(_field(row, "usage_start_time") or "")[:10]
+            key = (_field(row, "service.description") or "unknown",
+                   _field(row, "sku.description") or "unknown",
+                   day)
+            costs[key] = (costs.get(key, 0.0) + float(row.get("cost") or 0)
+                          + _credits(row))
+            self.rows_matched += 1
+            currency = row.get("currency")
+            if currency:
+                self.currencies.add(currency)
+
+    def ingest(self, path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        """Stream a whole export file through the aggregator"""
+        for chunk in iter_billing_chunks(path, chunk_size):
+            self.add_chunk(chunk)
+
+    def daily_totals(self) -> Dict[str, float]:
+        """Net cost per day across all services and SKUs"""
+        totals: Dict[str, float] = {}
+        for (_, _, day), cost in self.costs.items():
+            totals[day] = totals.get(day, 0.0) + cost
+        return {day: round(cost, 4) for day, cost in sorted(totals.items())}
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregated costs by service, SKU and day"""
+        by_service: Dict[str, float] = {}
+        by_sku: Dict[str, float] = {}
+        for (service, sku, _), cost in self.costs.items():
+            by_service[service] = by_service.get(service, 0.0) + cost
+            by_sku[f"{service} / {sku}"] = by_sku.get(f"{service} / {sku}", 0.0) + cost
+
+        return {
+            "rows_read": self.rows_read,
+            "rows_matched": self.rows_matched,
+            "currencies": sorted(self.currencies),
+            "total_cost": round(sum(self.costs.values()), 2),
+            "by_service": {k: round(v, 4) for k, v in
+                           sorted(by_service.items(), key=lambda kv: -kv[1])},
+            "by_sku": {k: round(v, 4) for k, v in
+                       sorted(by_sku.items(), key=lambda kv: -kv[1])},
+            "by_day": self.daily_totals(),
+            "rows": [
+                {"service": service, "sku": sku, "day": day, "cost": round(cost, 6)}
+                for (service, sku, day), cost in sorted(self.costs.items())
+            ],
+        }
+
+
+def reconcile(actual_by_day: Dict[str, float],
+              estimated_daily: Any) -> Dict[str, Any]:
+    """Compare billed daily cost with the model's estimate
+
+    estimated_daily is either one daily figure (e.g. estimate_gke_costs()
+    ["daily_cost"]) or a dict of per-day estimates.
+    """
+    days = []
+    for day, actual in sorted(actual_by_day.items()):
+        estimate = estimated_daily.get(day) if isinstance(estimated_daily, dict) \
+            else estimated_daily
+        if estimate is None:
+            continue
+        error = estimate - actual
+        days.append({
+            "day": day,
+            "actual": round(actual, 4),
+            "estimated": round(estimate, 4),
+            "error": round(error, 4),
+            "error_percent": round(error / actual * 100, 1) if actual else None,
+        })
+
+    percents = [abs(d["error_percent"]) for d in days if d["error_percent"] is not None]
+    total_actual = sum(d["actual"] for d in days)
+    total_estimated = sum(d["estimated"] for d in days)
+    return {
+        "days": days,
+        "total_actual": round(total_actual, 2),
+        "total_estimated": round(total_estimated, 2),
+        "bias": round(total_estimated - total_actual, 2),
+        "mean_absolute_percent_error": round(sum(percents) / len(percents), 1)
+        if percents else None,
+    }
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Reconcile GCP billing exports against GKE cost estimates")
+    parser.add_argument("files", nargs="+", type=Path,
+                        help="Billing export files "
+                             "(.csv, .jsonl, .parquet, optionally .gz)")
+    parser.add_argument("--project", help="Only count rows for this project ID")
+    parser.add_argument("--cluster", help="Only count rows labelled with this cluster")
+    parser.add_argument("--estimate", type=float,
+                        help="Estimated daily cost (default: ask GKECostMonitor)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--json", action="store_true", help="Print JSON output")
+    args = parser.parse_args()
+
+    print("🧾 GCP Billing Reconciliation")
+    print("=" * 50)
+
+    aggregator = BillingAggregator(args.project, args.cluster)
+    for path in args.files:
+        try:
+            aggregator.ingest(path, args.chunk_size)
+        except Exception as e:
+            print(f"❌ Failed to read {path}: {e}")
+            return 1
+    summary = aggregator.summary()
+
+    estimate = args.estimate
+    if estimate is None:
+        from gke_cost_monitor import GKECostMonitor
+        estimate = GKECostMonitor().estimate_gke_costs().get("daily_cost")
+
+    result = {"billing": summary,
+              "reconciliation": reconcile(summary["by_day"], estimate)
+              if estimate is not None else None}
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+
+    print(f"📄 Rows: {summary['rows_matched']} matched of {summary['rows_read']} read")
+    print(f"💰 Billed total: ${summary['total_cost']:.2f}")
+    for service, cost in summary["by_service"].items():
+        print(f"   {service}: ${cost:.2f}")
+
+    reconciliation = result["reconciliation"]
+    if not reconciliation:
+        print("⚠️ No estimate available for reconciliation")
+        return 0
+    print("\n📊 Estimate vs billed:")
+    for day in reconciliation["days"]:
+        pct = (f"{day['error_percent']:+.1f}%" if day["error_percent"] is not None
+               else "n/a")
+        print(f"   {day['day']}: billed ${day['actual']:.2f}, "
+              f"estimated ${day['estimated']:.2f} ({pct})")
+    if reconciliation["mean_absolute_percent_error"] is not None:
+        print("🎯 Mean absolute error: "
+              f"{reconciliation['mean_absolute_percent_error']:.1f}% "
+              f"(bias ${reconciliation['bias']:+.2f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+🧩 GKE Node Pool Bin-Packing Simulator
+
+Pack the current pod requests onto candidate machine types and pick the
+cheapest node pool that still fits. DaemonSet and static pods are charged
+to every node, and allocatable capacity follows GKE's system reservations.
+"""
+
+import json
+import math
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from gke_cost_monitor import (
+    DEFAULT_MAX_PODS_PER_NODE,
+    MACHINE_TYPES,
+    POD_PHASES,
+    PodTable,
+    collect_pods,
+    node_allocatable,
+    pod_requests,
+    pod_workload,
+)
+
+# Owners whose pods run once per node rather than being packed
+PER_NODE_OWNERS = ("DaemonSet", "Node")
+
+
+def _strip_node(name: str, node: Optional[str]) -> str:
+    """Drop a -<node name> suffix from a static pod name"""
+    if node and name.endswith(f"-{node}"):
+        return name[:-len(node) - 1]
+    return name
+
+
+def static_pod_component(pod: Dict[str, Any]) -> str:
+    """Component of a static pod: its name without the -<node name> suffix"""
+    metadata = pod.get("metadata", {})
+    owners = metadata.get("ownerReferences") or [{}]
+    node = owners[0].get("name") or pod.get("spec", {}).get("nodeName")
+    return _strip_node(metadata.get("name", ""), node)
+
+
+def split_pod_requests(pods: List[Dict[str, Any]]
+                       ) -> Tuple[List[Tuple[int, int]], Tuple[int, int, int]]:
+    """Split pods into packable requests and per-node overhead
+
+    Returns (requests, overhead) where requests is a list of (cpu millicores,
+    memory Mi) for schedulable pods and overhead is (cpu, memory, pods) that
+    every node carries for DaemonSets and static pods.
+    """
+    return _split_rows(
+        (pod_workload(pod), static_pod_component(pod), *pod_requests(pod))
+        for pod in pods
+        if pod.get("status", {}).get("phase") not in ("Succeeded", "Failed"))
+
+
+def split_table_requests(table: PodTable
+                         ) -> Tuple[List[Tuple[int, int]], Tuple[int, int, int]]:
+    """Split the pods of an already collected PodTable like split_pod_requests"""
+    finished = {POD_PHASES.index("Succeeded"), POD_PHASES.index("Failed")}
+    strings = table.strings
+
+    def rows() -> Iterable[Tuple[str, str, float, float]]:
+        for i in range(len(table)):
+            if table.phase[i] in finished:
+                continue
+            workload = strings[table.workload[i]]
+            # Static pods are owned by their node, named <component>-<node>
+            node = workload[5:] if workload.startswith("Node/") else None
+            yield (workload, _strip_node(table.name(i), node),
+                   table.cpu_requests_millicores[i], table.memory_requests_mi[i])
+
+    return _split_rows(rows())
+
+
+def _split_rows(rows: Iterable[Tuple[str, str, float, float]]
+                ) -> Tuple[List[Tuple[int, int]], Tuple[int, int, int]]:
+    """Split (workload, static pod component, cpu, memory) rows"""
+    requests = []
+    per_node: Dict[str, Tuple[int, int]] = {}
+
+    for workload, component, cpu, memory in rows:
+        cpu, memory = int(math.ceil(cpu)), int(math.ceil(memory))
+
+        if workload.split("/", 1)[0] in PER_NODE_OWNERS:
+            # One pod per node; static pods are keyed by their component
+            key = workload if workload.startswith("DaemonSet/") else component
+            prev = per_node.get(key, (0, 0))
+            per_node[key] = (max(prev[0], cpu), max(prev[1], memory))
+        else:
+            requests.append((cpu, memory))
+
+    overhead = (
+        sum(c for c, _ in per_node.values()),
+        sum(m for _, m in per_node.values()),
+        len(per_node),
+    )
+    return requests, overhead
+
+
+def _group(requests: Iterable[Tuple[int, int]]) -> List[List[int]]:
+    """Collapse identical requests into [cpu, memory, count] groups"""
+    counts: Dict[Tuple[int, int], int] = {}
+    for request in requests:
+        counts[request] = counts.get(request, 0) + 1
+    return [[cpu, memory, n] for (cpu, memory), n in counts.items()]
+
+
+def _fits(cpu: int, memory: int, free_cpu: int, free_memory: int,
+          free_pods: int) -> int:
+    """How many pods of one shape fit into the given free capacity"""
+    k = free_pods
+    if cpu:
+        k = min(k, free_cpu // cpu)
+    if memory:
+        k = min(k, free_memory // memory)
+    return max(k, 0)
+
+
+def _fill(node_class: List[int], cpu: int, memory: int, remaining: int
+          ) -> Tuple[List[List[int]], int]:
+    """Place pods into a class of identical nodes, first node first
+
+    A class is [free_cpu, free_memory, free_pods, node_count]. Returns the
+    classes it splits into (in node order) and the pods still unplaced.
+    """
+    free_cpu, free_memory, free_pods, count = node_class
+    per_node = _fits(cpu, memory, free_cpu, free_memory, free_pods)
+    if not per_node or not remaining:
+        return [node_class], remaining
+
+    parts = []
+    full = min(count, remaining // per_node)
+    if full:
+        parts.append([free_cpu - per_node * cpu, free_memory - per_node * memory,
+                      free_pods - per_node, full])
+        remaining -= full * per_node
+        count -= full
+    if remaining and count:
+        parts.append([free_cpu - remaining * cpu, free_memory - remaining * memory,
+                      free_pods - remaining, 1])
+        remaining = 0
+        count -= 1
+    if count:
+        parts.append([free_cpu, free_memory, free_pods, count])
+    return parts, remaining
+
+
+def _open_nodes(cpu: int, memory: int, remaining: int, capacity: Tuple[int, int, int]
+                ) -> List[List[int]]:
+    """Classes of new nodes holding the remaining pods of one shape"""
+    cap_cpu, cap_memory, cap_pods = capacity
+    per_node = _fits(cpu, memory, cap_cpu, cap_memory, cap_pods)
+    parts, _ = _fill([cap_cpu, cap_memory, cap_pods, math.ceil(remaining / per_node)],
+                     cpu, memory, remaining)
+    return parts
+
+
+def _close_exhausted(classes: List[List[int]], min_cpu: int, min_memory: int
+                     ) -> Tuple[List[List[int]], int]:
+    """Drop node classes that cannot take even the smallest remaining pod"""
+    still_open = []
+    closed = 0
+    for node_class in classes:
+        if node_class[2] and node_class[0] >= min_cpu and node_class[1] >= min_memory:
+            still_open.append(node_class)
+        else:
+            closed += node_class[3]
+    return still_open, closed
+
+
+def _suffix_minimums(groups: List[List[int]]) -> List[Tuple[int, int]]:
+    """Smallest cpu and memory among the groups from each position onwards"""
+    minimums = [(0, 0)] * len(groups)
+    min_cpu = min_memory = float("inf")
+    for i in range(len(groups) - 1, -1, -1):
+        min_cpu = min(min_cpu, groups[i][0])
+        min_memory = min(min_memory, groups[i][1])
+        minimums[i] = (min_cpu, min_memory)
+    return minimums
+
+
+def first_fit_decreasing(groups: List[List[int]], capacity: Tuple[int, int, int]
+                         ) -> Optional[int]:
+    """Number of nodes needed by first-fit decreasing, None when a pod never fits
+
+    Nodes with identical free capacity are tracked as one class, so a group
+    of identical pods is placed in O(classes) rather than O(nodes).
+    """
+    classes: List[List[int]] = []
+    closed = 0
+    minimums = _suffix_minimums(groups)
+
+    for i, (cpu, memory, count) in enumerate(groups):
+        if not _fits(cpu, memory, *capacity):
+            return None
+        remaining = count
+        updated = []
+        for node_class in classes:
+            parts, remaining = _fill(node_class, cpu, memory, remaining)
+            updated.extend(parts)
+        if remaining:
+            updated.extend(_open_nodes(cpu, memory, remaining, capacity))
+
+        if i + 1 < len(groups):
+            updated, newly_closed = _close_exhausted(updated, *minimums[i + 1])
+            closed += newly_closed
+        classes = updated
+
+    return closed + sum(node_class[3] for node_class in classes)
+
+
+def best_fit_decreasing(groups: List[List[int]], capacity: Tuple[int, int, int]
+                        ) -> Optional[int]:
+    """Number of nodes needed by best-fit decreasing, None when a pod never fits
+
+    Each pod goes to the node it leaves with the least normalized slack;
+    identical nodes are handled as one class as in first_fit_decreasing.
+    """
+    cap_cpu, cap_memory, _ = capacity
+    classes: List[List[int]] = []
+    closed = 0
+    minimums = _suffix_minimums(groups)
+
+    for i, (cpu, memory, count) in enumerate(groups):
+        if not _fits(cpu, memory, *capacity):
+            return None
+        remaining = count
+        while remaining:
+            best = None
+            best_slack = None
+            for index, node_class in enumerate(classes):
+                if _fits(cpu, memory, node_class[0], node_class[1], node_class[2]):
+                    slack = ((node_class[0] - cpu) / cap_cpu
+                             + (node_class[1] - memory) / cap_memory)
+                    if best_slack is None or slack < best_slack:
+                        best, best_slack = index, slack
+            if best is None:
+                classes.extend(_open_nodes(cpu, memory, remaining, capacity))
+                break
+            parts, remaining = _fill(classes[best], cpu, memory, remaining)
+            classes[best:best + 1] = parts
+
+        if i + 1 < len(groups):
+            classes, newly_closed = _close_exhausted(classes, *minimums[i + 1])
+            closed += newly_closed
+
+    return closed + sum(node_class[3] for node_class in classes)
+
+
+HEURISTICS = {
+    "first-fit-decreasing": first_fit_decreasing,
+    "best-fit-decreasing": best_fit_decreasing,
+}
+
+
+def simulate_node_pools(requests: List[Tuple[int, int]],
+                        overhead: Tuple[int, int, int] = (0, 0, 0),
+                        machine_types: Optional[Iterable[str]] = None,
+                        preemptible: bool = False,
+                        min_nodes: int = 1,
+                        max_pods_per_node: int = DEFAULT_MAX_PODS_PER_NODE,
+                        evaluate_all: bool = False) -> Dict[str, Any]:
+    """Find the cheapest machine type and node count that fits the requests
+
+    Candidates are visited in order of their lower-bound cost and the search
+    stops once that bound exceeds the best packing found, so only a few
+    machine types are actually packed unless evaluate_all is set.
+    """
+    groups = _group(requests)
+    total_cpu = sum(cpu * n for cpu, _, n in groups)
+    total_memory = sum(memory * n for _, memory, n in groups)
+    total_pods = sum(n for _, _, n in groups)
+
+    candidates = []
+    infeasible = []
+    for machine_type in machine_types or MACHINE_TYPES:
+        alloc_cpu, alloc_memory = node_allocatable(machine_type)
+        capacity = (alloc_cpu - overhead[0], alloc_memory - overhead[1],
+                    max_pods_per_node - overhead[2])
+        if min(capacity) <= 0:
+            infeasible.append(machine_type)
+            continue
+
+        price = (MACHINE_TYPES[machine_type]["monthly_cost"]
+                 * (0.5 if preemptible else 1))
+        lower_bound = max(min_nodes,
+                          math.ceil(total_cpu / capacity[0]),
+                          math.ceil(total_memory / capacity[1]),
+                          math.ceil(total_pods / capacity[2]))
+        candidates.append((lower_bound * price, lower_bound, price, machine_type,
+                           capacity))
+
+    candidates.sort()
+    results = []
+    best = None
+    pruned = 0
+
+    for i, (bound_cost, lower_bound, price, machine_type, capacity) in enumerate(
+            candidates):
+        if best and not evaluate_all and bound_cost >= best["monthly_cost"]:
+            pruned = len(candidates) - i
+            break
+
+        packed = {}
+        for name, heuristic in HEURISTICS.items():
+            # Largest dominant share first, relative to this node shape
+            groups.sort(key=lambda g: max(g[0] / capacity[0], g[1] / capacity[1]),
+                        reverse=True)
+            nodes = heuristic(groups, capacity)
+            if nodes is not None:
+                packed[name] = max(nodes, min_nodes)
+            if nodes is not None and nodes <= lower_bound:
+                break   # Already optimal, skip the remaining heuristics
+
+        if not packed:
+            infeasible.append(machine_type)
+            continue
+
+        heuristic = min(packed, key=packed.get)
+        nodes = packed[heuristic]
+        alloc_cpu, alloc_memory = node_allocatable(machine_type)
+        result = {
+            "machine_type": machine_type,
+            "node_count": nodes,
+            "heuristic": heuristic,
+            "monthly_cost": round(nodes * price, 2),
+            "lower_bound_nodes": lower_bound,
+            "cpu_allocated_percent": round(
+                (total_cpu + overhead[0] * nodes) / (alloc_cpu * nodes) * 100, 1),
+            "memory_allocated_percent": round(
+                (total_memory + overhead[1] * nodes) / (alloc_memory * nodes) * 100, 1),
+        }
+        results.append(result)
+        if best is None or result["monthly_cost"] < best["monthly_cost"]:
+            best = result
+
+    results.sort(key=lambda r: (r["monthly_cost"], r["node_count"]))
+    return {
+        "best": best,
+        "evaluated": results,
+        "infeasible": sorted(infeasible),
+        "pruned": pruned,
+        "total_pods": total_pods,
+        "overhead_per_node": {"cpu_millicores": overhead[0],
+                              "memory_mi": overhead[1],
+                              "pods": overhead[2]},
+    }
+
+
+def simulate_current_cluster(**kwargs) -> Dict[str, Any]:
+    """Run the simulator against the pods currently in the cluster"""
+    pods = collect_pods()["items"]
+    requests, overhead = split_pod_requests(pods)
+    return simulate_node_pools(requests, overhead, **kwargs)
+
+
+def main():
+    """Main function"""
+    print("🧩 GKE Node Pool Simulator")
+    print("=" * 50)
+
+    preemptible = "--preemptible" in sys.argv
+    try:
+        result = simulate_current_cluster(preemptible=preemptible,
+                                          evaluate_all="--all" in sys.argv)
+    except Exception as e:
+        print(f"❌ Failed to simulate node pools: {e}")
+        return 1
+
+    if "--json" in sys.argv:
+        print(json.dumps(result, indent=2))
+        return 0
+
+    best = result["best"]
+    if not best:
+        print("❌ No candidate machine type fits the current workloads")
+        return 1
+
+    print(f"📦 Pods packed: {result['total_pods']} "
+          f"(+{result['overhead_per_node']['pods']} per-node pods)")
+    for entry in result["evaluated"]:
+        marker = "✅" if entry is best else "  "
+        print(f"{marker} {entry['machine_type']:<16} x{entry['node_count']:<4} "
+              f"${entry['monthly_cost']:>8.2f}/month  "
+              f"CPU {entry['cpu_allocated_percent']:.0f}%  "
+              f"memory {entry['memory_allocated_percent']:.0f}%  "
+              f"({entry['heuristic']})")
+    print(f"💡 Cheapest feasible pool: {best['node_count']} x {best['machine_type']} "
+          f"for ${best['monthly_cost']:.2f}/month")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+🔔 GKE Cost Alert Manager
+
+Stateful cost alerts: each alert has a fingerprint and moves between
+firing, resolved and silenced. Thresholds use hysteresis bands so values
+hovering at the limit do not flap, and notifications are emitted only for
+state changes, rate limited and delivered in batches.
+"""
+
+import hashlib
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+LEVELS = ("ok", "warning", "critical")
+WARNING_RATIO = 0.8     # Warn at 80% of a threshold, as check_cost_thresholds does
+
+
+def alert_fingerprint(name: str, labels: Optional[Dict[str, str]] = None) -> str:
+    """Stable identifier of an alert from its name and labels"""
+    parts = [name] + [f"{k}={v}" for k, v in sorted((labels or {}).items())]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:16]
+
+
+def print_notifications(batch: List[Dict[str, Any]]) -> None:
+    """Default notifier: print one batch of alert changes"""
+    print(f"🔔 {len(batch)} alert change(s):")
+    for event in batch:
+        emoji = {"critical": "🚨", "warning": "⚠️"}.get(event["severity"], "✅")
+        if event["state"] == "resolved":
+            emoji = "✅"
+        print(f"  {emoji} [{event['state'].upper()}] {event['summary']}")
+
+
+class AlertManager:
+    """Track alert state and turn state changes into batched notifications"""
+
+    def __init__(self, hysteresis: float = 0.05, repeat_interval: float = 4 * 3600,
+                 group_wait: float = 30.0, max_notifications_per_hour: int = 12,
+                 event_timeout: float = 3600.0,
+                 notifier: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+                 clock: Callable[[], float] = time.time):
+        """Initialize the alert manager
+
+        hysteresis is the fraction below a threshold a value must fall before
+        the alert clears. Firing alerts are re-sent after repeat_interval,
+        pending changes are held for group_wait seconds to batch them, and at
+        most max_notifications_per_hour batches are delivered.
+        """
+        self.hysteresis = hysteresis
+        self.repeat_interval = repeat_interval
+        self.group_wait = group_wait
+        self.max_notifications_per_hour = max_notifications_per_hour
+        self.event_timeout = event_timeout
+        self.notifier = notifier or print_notifications
+        self.clock = clock
+
+        self.alerts: Dict[str, Dict[str, Any]] = {}
+        self.silences: Dict[str, float] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._pending_since: Optional[float] = None
+        self._sent: List[float] = []
+
+    def _level(self, current: str, value: float, threshold: float) -> str:
+        """Next level of a threshold alert, with hysteresis on the way down"""
+        warning = threshold * WARNING_RATIO
+        band = 1 - self.hysteresis
+        if value > threshold:
+            return "critical"
+        if current == "critical" and value >= threshold * band:
+            return "critical"
+        if value > warning:
+            return "warning"
+        if current != "ok" and value >= warning * band:
+            return "warning"
+        return "ok"
+
+    def _transition(self, fingerprint: str, name: str, labels: Dict[str, str],
+                    level: str, summary: str, value: Optional[float],
+                    now: float) -> Optional[Dict[str, Any]]:
+        """Apply a new level to an alert and queue a notification if it changed"""
+        alert = self.alerts.get(fingerprint)
+        previous = alert["severity"] if alert and alert["state"] == "firing" else "ok"
+
+        if alert is None:
+            if level == "ok":
+                return None
+            alert = self.alerts[fingerprint] = {
+                "fingerprint": fingerprint, "name": name, "labels": dict(labels),
+                "state": "resolved", "severity": "ok", "since": now,
+                "last_notified": None,
+            }
+        alert["value"] = value
+        alert["summary"] = summary
+        alert["updated"] = now
+
+        if level == previous:
+            # Unchanged; only a long-firing alert is worth repeating. One that
+            # was never delivered (it fired while silenced) goes out once the
+            # silence lapses.
+            last_notified = alert["last_notified"]
+            due = last_notified is None or now - last_notified >= self.repeat_interval
+            if level != "ok" and due and fingerprint not in self._pending and \
+                    not self._silenced(fingerprint, now):
+                return self._queue(alert, "firing", now, repeat=True)
+            return None
+
+        alert["state"] = "firing" if level != "ok" else "resolved"
+        alert["severity"] = level if level != "ok" else previous
+        alert["since"] = now
+        return self._queue(alert, alert["state"], now)
+
+    def _silenced(self, fingerprint: str, now: float) -> bool:
+        """Whether notifications for an alert are currently suppressed"""
+        return self.silences.get(fingerprint, 0) > now
+
+    def _queue(self, alert: Dict[str, Any], state: str, now: float,
+               repeat: bool = False) -> Dict[str, Any]:
+        """Queue a notification for an alert; a newer change replaces an older one"""
+        event = {
+            "fingerprint": alert["fingerprint"],
+            "name": alert["name"],
+            "labels": alert["labels"],
+            "state": state,
+            "severity": alert["severity"],
+            "summary": alert["summary"],
+            "value": alert.get("value"),
+            "at": now,
+            "repeat": repeat,
+        }
+        if self._silenced(alert["fingerprint"], now):
+            event["state_shown"] = "silenced"
+            return event
+
+        self._pending[alert["fingerprint"]] = event
+        if self._pending_since is None:
+            self._pending_since = now
+        return event
+
+    def observe(self, name: str, value: float, threshold: float,
+                labels: Optional[Dict[str, str]] = None, summary: str = "",
+                now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Feed one value of a thresholded metric; returns the change, if any"""
+        now = self.clock() if now is None else now
+        labels = labels or {}
+        fingerprint = alert_fingerprint(name, labels)
+        alert = self.alerts.get(fingerprint)
+        current = alert["severity"] if alert and alert["state"] == "firing" else "ok"
+        level = self._level(current, value, threshold)
+        return self._transition(fingerprint, name, labels, level,
+                                summary or f"{name} = {value} (threshold {threshold})",
+                                value, now)
+
+    def record_event(self, name: str, labels: Optional[Dict[str, str]] = None,
+                     severity: str = "warning", summary: str = "",
+                     now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Fire a point-in-time alert (e.g. a cost spike) that resolves on its own
+
+        The alert stays firing while the event keeps recurring and resolves
+        after event_timeout seconds without a new occurrence.
+        """
+        now = self.clock() if now is None else now
+        labels = labels or {}
+        fingerprint = alert_fingerprint(name, labels)
+        change = self._transition(fingerprint, name, labels, severity,
+                                  summary or name, None, now)
+        self.alerts[fingerprint]["expires"] = now + self.event_timeout
+        return change
+
+    def evaluate_thresholds(self, costs: Dict[str, Any], thresholds: Dict[str, float],
+                            phase: str, now: Optional[float] = None
+                            ) -> List[Dict[str, Any]]:
+        """Update the daily/weekly/monthly cost alerts from one cost estimate"""
+        now = self.clock() if now is None else now
+        changes = []
+        for window in ("daily", "weekly", "monthly"):
+            value = costs.get(f"{window}_cost")
+            threshold = thresholds.get(window)
+            if value is None or threshold is None:
+                continue
+            change = self.observe(
+                f"{window}_cost", value, threshold, {"phase": phase},
+                f"{window.capitalize()} cost ${value:.2f} "
+                f"vs ${threshold:.2f} threshold ({phase})", now)
+            if change:
+                changes.append(change)
+        return changes
+
+    def expire_events(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Resolve point-in-time alerts whose event has not recurred"""
+        now = self.clock() if now is None else now
+        changes = []
+        for fingerprint, alert in list(self.alerts.items()):
+            if alert.get("expires") and alert["state"] == "firing" and \
+                    now >= alert["expires"]:
+                alert.pop("expires")
+                change = self._transition(fingerprint, alert["name"], alert["labels"],
+                                          "ok", alert["summary"], None, now)
+                if change:
+                    changes.append(change)
+        return changes
+
+    def silence(self, fingerprint: str, duration: float,
+                now: Optional[float] = None) -> None:
+        """Suppress notifications for an alert for duration seconds"""
+        now = self.clock() if now is None else now
+        self.silences[fingerprint] = now + duration
+        self._pending.pop(fingerprint, None)
+
+    def state(self, fingerprint: str, now: Optional[float] = None) -> str:
+        """Current state of an alert: firing, resolved, silenced or inactive"""
+        now = self.clock() if now is None else now
+        alert = self.alerts.get(fingerprint)
+        if alert is None:
+            return "inactive"
+        if self.silences.get(fingerprint, 0) > now:
+            return "silenced"
+        return alert["state"]
+
+    def active_alerts(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Alerts that are currently firing, worst first"""
+        now = self.clock() if now is None else now
+        firing = [dict(a, silenced=self.silences.get(f, 0) > now)
+                  for f, a in self.alerts.items() if a["state"] == "firing"]
+        return sorted(firing, key=lambda a: LEVELS.index(a["severity"]), reverse=True)
+
+    def flush(self, now: Optional[float] = None, force: bool = False
+              ) -> Optional[List[Dict[str, Any]]]:
+        """Deliver pending changes as one batch when grouping and rate limits allow"""
+        now = self.clock() if now is None else now
+        if not self._pending:
+            return None
+        if not force and now - self._pending_since < self.group_wait:
+            return None
+
+        self._sent = [t for t in self._sent if now - t < 3600]
+        if len(self._sent) >= self.max_notifications_per_hour:
+            return None     # Keep accumulating; the batch goes out when allowed
+
+        batch = sorted(self._pending.values(),
+                       key=lambda e: (e["state"] != "firing",
+                                      -LEVELS.index(e["severity"])))
+        self._pending = {}
+        self._pending_since = None
+        self._sent.append(now)
+        for event in batch:
+            alert = self.alerts.get(event["fingerprint"])
+            if alert:
+                alert["last_notified"] = now
+
+        self.notifier(batch)
+        return batch
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+📈 GKE Cost Anomaly Detector
+
+Online spike detection for attributed cost series (cluster, namespace,
+workload). Each series keeps an exponentially weighted mean and variance,
+so memory is constant per series and every sample is an O(1) update.
+"""
+
+import math
+from typing import Any, Dict, List, Optional
+
+
+class _SeriesState:
+    """EWMA state of one cost series"""
+
+    __slots__ = ("mean", "variance", "count", "last")
+
+    def __init__(self):
+        self.mean = 0.0
+        self.variance = 0.0
+        self.count = 0
+        self.last = 0.0
+
+
+class CostAnomalyDetector:
+    """Flag cost samples that jump well above their series' recent behaviour"""
+
+    def __init__(self, alpha: float = 0.2, threshold: float = 3.0,
+                 min_samples: int = 5, min_increase: float = 0.01,
+                 min_relative_increase: float = 0.25):
+        """Initialize the detector
+
+        alpha is the EWMA weight of a new sample, threshold the z-score that
+        counts as a spike. A spike must also raise the cost by at least
+        min_increase dollars and min_relative_increase of the baseline, so
+        tiny or very stable series do not alert on noise.
+        """
+        self.alpha = alpha
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.min_increase = min_increase
+        self.min_relative_increase = min_relative_increase
+        self._series: Dict[str, _SeriesState] = {}
+
+    def update(self, key: str, value: float) -> Optional[Dict[str, Any]]:
+        """Add one sample to a series and return an anomaly if it is a spike
+
+        The sample is scored against the state before it is absorbed, so an
+        alert fires on the first sample that shows the spike.
+        """
+        state = self._series.get(key)
+        if state is None:
+            state = self._series[key] = _SeriesState()
+
+        anomaly = None
+        if state.count >= self.min_samples:
+            deviation = value - state.mean
+            std = math.sqrt(state.variance)
+            # Flat series have no variance; fall back to the relative floor
+            z_score = deviation / std if std > 1e-12 else (
+                math.inf if deviation > 0 else 0.0)
+            if (z_score >= self.threshold
+                    and deviation >= self.min_increase
+                    and deviation >= self.min_relative_increase * abs(state.mean)):
+                anomaly = {
+                    "series": key,
+                    "value": round(value, 4),
+                    "baseline": round(state.mean, 4),
+                    "increase": round(deviation, 4),
+                    "z_score": round(z_score, 1) if math.isfinite(z_score) else None,
+                }
+
+        # Warm up with a plain running mean, then switch to the EWMA weight
+        state.count += 1
+        alpha = max(self.alpha, 1.0 / state.count)
+        diff = value - state.mean
+        increment = alpha * diff
+        state.mean += increment
+        state.variance = (1 - alpha) * (state.variance + diff * increment)
+        state.last = value
+
+        return anomaly
+
+    def update_many(self, samples: Dict[str, float]) -> List[Dict[str, Any]]:
+        """Update every series in one sampling interval and return the spikes"""
+        anomalies = []
+        for key, value in samples.items():
+            anomaly = self.update(key, value)
+            if anomaly:
+                anomalies.append(anomaly)
+        anomalies.sort(key=lambda a: a["increase"], reverse=True)
+        return anomalies
+
+    def baseline(self, key: str) -> Optional[Dict[str, float]]:
+        """Current mean, standard deviation and sample count of a series"""
+        state = self._series.get(key)
+        if state is None:
+            return None
+        return {"mean": state.mean, "std": math.sqrt(state.variance),
+                "count": state.count, "last": state.last}
+
+    def forget(self, key: str) -> None:
+        """Drop a series that no longer exists (e.g. a deleted workload)"""
+        self._series.pop(key, None)
+
+    def retain(self, keys) -> None:
+        """Drop every series whose key is not in keys"""
+        for key in [k for k in self._series if k not in keys]:
+            del self._series[key]
+
+    def __len__(self) -> int:
+        """Number of tracked series"""
+        return len(self._series)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+📊 GKE Cost Dashboard
+
+Streamlit dashboard over the cost history written by the monitor and the
+cost service. Run with:
+
+    streamlit run gke_cost_dashboard.py
+
+All queries go through DashboardData, which downsamples in SQLite and
+caches results until the history store's version changes, so reruns of the
+page cost a single version lookup while no new sample has arrived.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from gke_cost_history import DEFAULT_HISTORY_PATH, DEFAULT_MAX_POINTS, CostHistory
+
+WINDOWS = {"24 hours": 24, "7 days": 24 * 7, "30 days": 24 * 30,
+           "90 days": 24 * 90, "All": None}
+FORECAST_DAYS = 30
+
+
+def linear_forecast(points: List[Tuple[float, float]],
+                    horizon_days: float = FORECAST_DAYS) -> Optional[Dict[str, Any]]:
+    """Least-squares trend of (timestamp, daily cost) points projected forward
+
+    Returns the trend in $/day per day, the trend's daily cost now and at
+    the end of the horizon, and the total spend expected over the horizon.
+    """
+    if len(points) < 2:
+        return None
+    n = len(points)
+    t0 = points[0][0]
+    xs = [(t - t0) / 86400 for t, _ in points]
+    ys = [v or 0.0 for _, v in points]
+    mean_x, mean_y = sum(xs) / n, sum(ys) / n
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    slope = covariance / var_x if var_x else 0.0
+    intercept = mean_y - slope * mean_x
+
+    def daily_at(x: float) -> float:
+        return max(intercept + slope * x, 0.0)
+
+    start = xs[-1]
+    end = start + horizon_days
+    return {
+        "slope_per_day": round(slope, 4),
+        "current_daily_cost": round(daily_at(start), 4),
+        "projected_daily_cost": round(daily_at(end), 4),
+        # Integral of the (non-negative) trend line over the horizon
+        "projected_total": round(
+            (daily_at(start) + daily_at(end)) / 2 * horizon_days, 2),
+    }
+
+
+class DashboardData:
+    """History queries for the dashboard, cached per history version
+
+    Windows are anchored at the newest sample rather than the wall clock, so
+    every result is a pure function of the store's version and can be reused
+    until a new sample is recorded.
+    """
+
+    def __init__(self, history: CostHistory, max_entries: int = 64):
+        """Initialize the query cache"""
+        self.history = history
+        self.max_entries = max_entries
+        self._version: Optional[int] = None
+        self._cache: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, name: str, compute: Callable[[], Any], *args) -> Any:
+        """Result of compute, reused while the history version is unchanged
+
+        One instance serves every Streamlit session, so the cache is only
+        touched under a lock. compute runs outside it (queries nest), and
+        its result is stored only if the version did not move meanwhile.
+        """
+        version = self.history.version
+        key = (name,) + args
+        with self._lock:
+            if self._version is None or version > self._version:
+                self._cache.clear()
+                self._version = version
+            if version == self._version and key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            if version == self._version == self.history.version:
+                self._cache[key] = value
+                if len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return value
+
+    def _anchor(self) -> float:
+        """Timestamp of the newest sample (windows end here)"""
+        latest = self.latest()
+        return latest["taken_at"] if latest else time.time()
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Newest cluster sample"""
+        return self._cached("latest", self.history.latest)
+
+    def timeline(self, hours: Optional[float],
+                 max_points: int = DEFAULT_MAX_POINTS) -> List[Dict[str, Any]]:
+        """Downsampled cluster cost and utilization over a window"""
+        return self._cached("timeline", lambda: self.history.downsample(
+            hours, max_points, now=self._anchor()), hours, max_points)
+
+    def namespace_timeline(self, hours: Optional[float],
+                           max_points: int = DEFAULT_MAX_POINTS
+                           ) -> Dict[str, List[Tuple[float, float]]]:
+        """Downsampled attributed cost per namespace over a window"""
+        return self._cached(
+            "namespace_timeline", lambda: self.history.downsample_series(
+                "namespace/", hours, max_points, now=self._anchor()),
+            hours, max_points)
+
+    def attribution(self) -> Dict[str, float]:
+        """Current daily cost per namespace"""
+        return self._cached("attribution",
+                            lambda: self.history.latest_attribution("namespace/"))
+
+    def alerts(self, hours: Optional[float]) -> List[Dict[str, Any]]:
+        """Threshold status changes over a window"""
+        return self._cached("alerts", lambda: self.history.status_changes(
+            hours, now=self._anchor()), hours)
+
+    def forecast(self, hours: Optional[float],
+                 horizon_days: float = FORECAST_DAYS) -> Optional[Dict[str, Any]]:
+        """Trend of the downsampled daily cost projected over horizon_days"""
+        return self._cached("forecast", lambda: linear_forecast(
+            [(p["taken_at"], p["daily_cost"]) for p in self.timeline(hours)],
+            horizon_days), hours, horizon_days)
+
+
+def _timestamps(values: List[float]) -> List[datetime]:
+    """Epoch seconds to datetimes for chart axes"""
+    return [datetime.fromtimestamp(v) for v in values]
+
+
+def render_dashboard() -> None:
+    """Render the Streamlit page"""
+    import streamlit as st
+
+    st.set_page_config(page_title="GKE Cost Dashboard", page_icon="💰", layout="wide")
+
+    @st.cache_resource
+    def load_data(path: str) -> DashboardData:
+        # One store and query cache shared by every session
+        return DashboardData(CostHistory(Path(path)))
+
+    path = st.sidebar.text_input(
+        "History database",
+        os.environ.get("GKE_COST_HISTORY", str(DEFAULT_HISTORY_PATH)))
+    window = st.sidebar.selectbox("Window", list(WINDOWS), index=1)
+    hours = WINDOWS[window]
+    data = load_data(path)
+
+    st.title("💰 GKE Cost Dashboard")
+    latest = data.latest()
+    if latest is None:
+        st.info("No cost history yet. Start gke_cost_service.py to record snapshots.")
+        return
+
+    forecast = data.forecast(hours)
+    status = (latest.get("status") or "unknown").upper()
+    columns = st.columns(4)
+    columns[0].metric("Daily cost", f"${latest['daily_cost'] or 0:.2f}")
+    columns[1].metric("Monthly cost", f"${latest['monthly_cost'] or 0:.2f}")
+    columns[2].metric(
+        f"Next {FORECAST_DAYS} days (forecast)",
+        f"${forecast['projected_total']:.2f}" if forecast else "n/a",
+        f"{forecast['slope_per_day']:+.3f} $/day per day" if forecast else None,
+        delta_color="inverse")
+    columns[3].metric(f"Status ({latest.get('phase')})", status)
+    taken_at = datetime.fromtimestamp(latest["taken_at"])
+    st.caption(f"Last sample {taken_at:%Y-%m-%d %H:%M:%S}")
+
+    st.subheader("📈 Daily cost")
+    timeline = data.timeline(hours)
+    chart = {"time": _timestamps([p["taken_at"] for p in timeline]),
+             "daily cost": [p["daily_cost"] for p in timeline],
+             "peak": [p["max_daily_cost"] for p in timeline]}
+    st.line_chart(chart, x="time", y=["daily cost", "peak"])
+    if forecast:
+        st.caption(f"🔮 Trend: ${forecast['current_daily_cost']:.2f}/day now, "
+                   f"${forecast['projected_daily_cost']:.2f}/day "
+                   f"in {FORECAST_DAYS} days")
+
+    left, right = st.columns(2)
+    with left:
+        st.subheader("📦 Cost by namespace")
+        attribution = data.attribution()
+        if attribution:
+            st.bar_chart({"namespace": list(attribution),
+                          "daily cost": list(attribution.values())},
+                         x="namespace", y="daily cost")
+        namespace_timeline = data.namespace_timeline(hours)
+        if namespace_timeline:
+            times = sorted({t for points in namespace_timeline.values()
+                            for t, _ in points})
+            index = {t: i for i, t in enumerate(times)}
+            chart = {"time": _timestamps(times)}
+            for namespace, points in namespace_timeline.items():
+                values = [0.0] * len(times)
+                for t, cost in points:
+                    values[index[t]] = cost
+                chart[namespace] = values
+            st.area_chart(chart, x="time", y=list(namespace_timeline))
+
+    with right:
+        st.subheader("🚨 Alerts")
+        if status == "CRITICAL":
+            st.error("Costs exceed the phase thresholds")
+        elif status == "WARNING":
+            st.warning("Costs are approaching the phase thresholds")
+        else:
+            st.success("All costs within budget")
+        changes = data.alerts(hours)
+        if changes:
+            st.dataframe([{"time": datetime.fromtimestamp(c["taken_at"]),
+                           "phase": c["phase"],
+                           "status": f"{c['previous'] or '-'} → {c['status']}",
+                           "daily cost": c["daily_cost"]} for c in changes],
+                         use_container_width=True)
+
+    st.subheader("⚙️ Utilization")
+    st.line_chart({"time": _timestamps([p["taken_at"] for p in timeline]),
+                   "cpu %": [p["cpu_utilization_percent"] for p in timeline],
+                   "memory %": [p["memory_utilization_percent"] for p in timeline]},
+                  x="time", y=["cpu %", "memory %"])
+
+
+if __name__ == "__main__":
+    render_dashboard()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+🗄️ GKE Cost History
+
+SQLite store of monitor snapshots: one row of cluster totals per snapshot
+plus the attributed daily cost of every namespace and workload series.
+Each call opens its own connection, so the store is safe to share between
+the snapshot refresher and request handlers.
+"""
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_HISTORY_PATH = Path("cost_reports") / "cost_history.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    taken_at REAL NOT NULL,
+    phase TEXT,
+    daily_cost REAL,
+    weekly_cost REAL,
+    monthly_cost REAL,
+    node_count INTEGER,
+    running_pods INTEGER,
+    cpu_utilization_percent REAL,
+    memory_utilization_percent REAL,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS samples_taken_at ON samples (taken_at);
+CREATE TABLE IF NOT EXISTS series (
+    sample_id INTEGER NOT NULL REFERENCES samples (id),
+    taken_at REAL NOT NULL,
+    key TEXT NOT NULL,
+    daily_cost REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS series_key_taken_at ON series (key, taken_at);
+CREATE INDEX IF NOT EXISTS series_sample_id ON series (sample_id);
+"""
+
+DEFAULT_MAX_POINTS = 600
+
+SAMPLE_COLUMNS = ("taken_at", "phase", "daily_cost", "weekly_cost", "monthly_cost",
+                  "node_count", "running_pods", "cpu_utilization_percent",
+                  "memory_utilization_percent", "status")
+
+
+def _prefix_range(prefix: str) -> Tuple[str, str]:
+    """Key range [low, high) of all keys starting with prefix, for index scans"""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class CostHistory:
+    """Append-only cost history backed by SQLite"""
+
+    def __init__(self, path: Optional[Path] = None):
+        """Open (and create if needed) the history database"""
+        self.path = Path(path) if path else DEFAULT_HISTORY_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Short-lived connection in one transaction (WAL: reads run during writes)"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(self, snapshot) -> int:
+        """Store one MonitorSnapshot and return its sample id"""
+        costs = snapshot.costs
+        pod_status = snapshot.pod_status
+        row = (
+            snapshot.taken_at, snapshot.phase,
+            costs.get("daily_cost"), costs.get("weekly_cost"),
+            costs.get("monthly_cost"),
+            snapshot.cluster_status.get("node_count"), pod_status.get("running_pods"),
+            pod_status.get("cpu_utilization_percent"),
+            pod_status.get("memory_utilization_percent"),
+            snapshot.threshold_check.get("status"),
+        )
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO samples ({', '.join(SAMPLE_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(SAMPLE_COLUMNS))})", row)
+            sample_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO series (sample_id, taken_at, key, daily_cost) "
+                "VALUES (?, ?, ?, ?)",
+                [(sample_id, snapshot.taken_at, key, cost)
+                 for key, cost in snapshot.cost_attribution.items()])
+        return sample_id
+
+    @property
+    def version(self) -> int:
+        """Id of the newest sample; changes whenever history changes"""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM samples").fetchone()[0]
+
+    def samples(self, hours: Optional[float] = 24.0,
+                now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Cluster samples of the last hours (all samples when hours is None)"""
+        now = time.time() if now is None else now
+        since = now - hours * 3600 if hours is not None else 0
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(SAMPLE_COLUMNS)} FROM samples "
+                "WHERE taken_at >= ? ORDER BY taken_at", (since,)).fetchall()
+        return [dict(zip(SAMPLE_COLUMNS, row)) for row in rows]
+
+    def series(self, key: str, hours: Optional[float] = 24.0,
+               now: Optional[float] = None) -> List[Dict[str, float]]:
+        """Daily cost samples of one attributed series (e.g. "namespace/ai")"""
+        now = time.time() if now is None else now
+        since = now - hours * 3600 if hours is not None else 0
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT taken_at, daily_cost FROM series "
+                "WHERE key = ? AND taken_at >= ? ORDER BY taken_at",
+                (key, since)).fetchall()
+        return [{"taken_at": t, "daily_cost": c} for t, c in rows]
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Newest cluster sample"""
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(SAMPLE_COLUMNS)} FROM samples "
+                "ORDER BY id DESC LIMIT 1").fetchone()
+        return dict(zip(SAMPLE_COLUMNS, row)) if row else None
+
+    def latest_attribution(self, prefix: str = "namespace/") -> Dict[str, float]:
+        """Attributed daily cost of each series in the newest sample"""
+        low, high = _prefix_range(prefix)
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT key, daily_cost FROM series "
+                "WHERE sample_id = (SELECT MAX(id) FROM samples) "
+                "AND key >= ? AND key < ? "
+                "ORDER BY daily_cost DESC", (low, high)).fetchall()
+        return {key[len(prefix):]: cost for key, cost in rows}
+
+    def _bucket(self, conn: sqlite3.Connection, since: float,
+                max_points: int) -> Optional[Tuple[float, float]]:
+        """Start and width of the time buckets that fit a window into max_points"""
+        first, last = conn.execute(
+            "SELECT MIN(taken_at), MAX(taken_at) FROM samples WHERE taken_at >= ?",
+            (since,)).fetchone()
+        if first is None:
+            return None
+        return first, max((last - first) / max(max_points - 1, 1), 1e-6)
+
+    def downsample(self, hours: Optional[float] = None,
+                   max_points: int = DEFAULT_MAX_POINTS,
+                   now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Cluster samples averaged into at most max_points time buckets
+
+        The aggregation runs in SQLite, so a window of months of one-minute
+        samples returns only max_points rows to the caller.
+        """
+        now = time.time() if now is None else now
+        since = now - hours * 3600 if hours is not None else 0
+        with self._connect() as conn:
+            bucket = self._bucket(conn, since, max_points)
+            if bucket is None:
+                return []
+            rows = conn.execute(
+                "SELECT MIN(taken_at), AVG(daily_cost), MAX(daily_cost), "
+                "AVG(cpu_utilization_percent), AVG(memory_utilization_percent), "
+                "MAX(node_count), COUNT(*) FROM samples WHERE taken_at >= ? "
+                "GROUP BY CAST((taken_at - ?) / ? AS INTEGER) ORDER BY 1",
+                (since,) + bucket).fetchall()
+        columns = ("taken_at", "daily_cost", "max_daily_cost",
+                   "cpu_utilization_percent", "memory_utilization_percent",
+                   "node_count", "samples")
+        return [dict(zip(columns, row)) for row in rows]
+
+    def downsample_series(self, prefix: str = "namespace/",
+                          hours: Optional[float] = None,
+                          max_points: int = DEFAULT_MAX_POINTS,
+                          now: Optional[float] = None
+                          ) -> Dict[str, List[Tuple[float, float]]]:
+        """Attributed series under prefix, averaged into at most max_points buckets"""
+        now = time.time() if now is None else now
+        since = now - hours * 3600 if hours is not None else 0
+        low, high = _prefix_range(prefix)
+        series: Dict[str, List[Tuple[float, float]]] = {}
+        with self._connect() as conn:
+            bucket = self._bucket(conn, since, max_points)
+            if bucket is None:
+                return series
+            rows = conn.execute(
+                "SELECT key, MIN(taken_at), AVG(daily_cost) FROM series "
+                "WHERE key >= ? AND key < ? AND taken_at >= ? "
+                "GROUP BY key, CAST((taken_at - ?) / ? AS INTEGER) ORDER BY key, 2",
+                (low, high, since) + bucket).fetchall()
+        for key, taken_at, cost in rows:
+            series.setdefault(key[len(prefix):], []).append((taken_at, cost))
+        return series
+
+    def status_changes(self, hours: Optional[float] = None,
+                       now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Samples where the threshold status changed, newest first"""
+        now = time.time() if now is None else now
+        since = now - hours * 3600 if hours is not None else 0
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT taken_at, phase, status, previous, daily_cost FROM ("
+                "  SELECT taken_at, phase, status, daily_cost,"
+                "         LAG(status) OVER (ORDER BY taken_at) AS previous"
+                "  FROM samples WHERE taken_at >= ?"
+                ") WHERE previous IS NULL OR previous != status "
+                "ORDER BY taken_at DESC", (since,)).fetchall()
+        columns = ("taken_at", "phase", "status", "previous", "daily_cost")
+        return [dict(zip(columns, row)) for row in rows]
@@ -8,10 +8,1047 @@ Integrates with existing GCP cost control system.
 
 import json
 import subprocess
+import sys
+import threading
 import time
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from gke_cost_alerts import AlertManager
+from gke_cost_anomaly import CostAnomalyDetector
+from gke_cost_history import CostHistory
+from gke_kubectl import (
+    NODES_PATH,
+    TABLE_ACCEPT,
+    consume_list,
+    count_items,
+    get_raw,
+    kubectl_command,
+    namespaced_path,
+    supports_trimmed_responses,
+)
+
+# Unit prices used to cost resource requests. Derived from the e2-standard-2
+# entry in the machine price table (2 vCPU + 8 GB = $36/month) using the
+# list-price ratio between one vCPU and one GB of memory on E2 machines.
+CPU_CORE_MONTHLY_COST = 11.72   # $/vCPU/month
+MEMORY_GB_MONTHLY_COST = 1.57   # $/GB/month
+DISK_GB_MONTHLY_COST = 0.08     # $/GB/month of persistent disk
+NETWORK_DAILY_COST = 0.10       # $/day base network cost
+PREEMPTIBLE_DISCOUNT = 0.5      # Preemptible/spot nodes cost half
+
+# Cost thresholds for different phases
+DEFAULT_COST_THRESHOLDS = {
+    "development": {
+        "daily": 0.20,      # $0.20/day = ~$6/month
+        "weekly": 1.40,     # $1.40/week
+        "monthly": 5.00     # $5/month
+    },
+    "testing": {
+        "daily": 0.50,      # $0.50/day = ~$15/month
+        "weekly": 3.50,     # $3.50/week
+        "monthly": 15.00    # $15/month
+    },
+    "demo": {
+        "daily": 0.83,      # $0.83/day = ~$25/month
+        "weekly": 5.83,     # $5.83/week
+        "monthly": 25.00    # $25/month
+    }
+}
+
+_CPU_SUFFIXES = {"n": 1e-6, "u": 1e-3, "m": 1.0}
+_MEMORY_SUFFIXES = {
+    "Ki": 1 / 1024, "Mi": 1.0, "Gi": 1024.0, "Ti": 1024.0 ** 2,
+    "k": 1000 / 1024 ** 2, "K": 1000 / 1024 ** 2, "M": 1000 ** 2 / 1024 ** 2,
+    "G": 1000 ** 3 / 1024 ** 2, "T": 1000 ** 4 / 1024 ** 2,
+}
+
+
+def parse_cpu_millicores(value: Union[str, int, float, None]) -> float:
+    """Convert a Kubernetes CPU quantity ("250m", "0.5", "1234n") to millicores"""
+    if value is None or value == "":
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value) * 1000
+    value = str(value).strip()
+    suffix = value[-1]
+    if suffix in _CPU_SUFFIXES:
+        return float(value[:-1]) * _CPU_SUFFIXES[suffix]
+    return float(value) * 1000
+
+
+def parse_memory_mi(value: Union[str, int, float, None]) -> float:
+    """Convert a Kubernetes memory quantity ("128Mi", "1Gi", "512k") to Mi"""
+    if value is None or value == "":
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value) / 1024 ** 2
+    value = str(value).strip()
+    for suffix in ("Ki", "Mi", "Gi", "Ti"):
+        if value.endswith(suffix):
+            return float(value[:-2]) * _MEMORY_SUFFIXES[suffix]
+    if value[-1] in _MEMORY_SUFFIXES:
+        return float(value[:-1]) * _MEMORY_SUFFIXES[value[-1]]
+    return float(value) / 1024 ** 2
+
+
+def parse_k8s_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse an RFC 3339 timestamp from a Kubernetes object"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def requests_monthly_cost(cpu_millicores: float, memory_mi: float) -> float:
+    """Monthly cost of reserving the given CPU and memory requests"""
+    return (cpu_millicores / 1000 * CPU_CORE_MONTHLY_COST
+            + memory_mi / 1024 * MEMORY_GB_MONTHLY_COST)
+
+
+# Shared-core E2 machines keep their historical prices; other shapes are
+# priced from the per-vCPU/GB unit costs scaled by a family multiplier.
+MACHINE_TYPES: Dict[str, Dict[str, Any]] = {
+    "e2-micro": {"vcpu": 2, "memory_gb": 1, "shared_core": True, "monthly_cost": 4.50},
+    "e2-small": {"vcpu": 2, "memory_gb": 2, "shared_core": True, "monthly_cost": 9.00},
+    "e2-medium": {"vcpu": 2, "memory_gb": 4, "shared_core": True,
+                  "monthly_cost": 18.00},
+}
+_MACHINE_FAMILIES = {
+    # family: (price multiplier, {shape: (GB per vCPU, vCPU sizes)})
+    "e2": (1.00, {"standard": (4, (2, 4, 8, 16, 32)),
+                  "highmem": (8, (2, 4, 8, 16)),
+                  "highcpu": (1, (2, 4, 8, 16, 32))}),
+    "n2": (1.09, {"standard": (4, (2, 4, 8, 16, 32)),
+                  "highmem": (8, (2, 4, 8, 16)),
+                  "highcpu": (1, (2, 4, 8, 16, 32))}),
+    "n2d": (0.95, {"standard": (4, (2, 4, 8, 16, 32)),
+                   "highmem": (8, (2, 4, 8, 16)),
+                   "highcpu": (1, (2, 4, 8, 16, 32))}),
+    "t2d": (0.95, {"standard": (4, (1, 2, 4, 8, 16, 32))}),
+}
+for _family, (_multiplier, _shapes) in _MACHINE_FAMILIES.items():
+    for _shape, (_gb_per_vcpu, _sizes) in _shapes.items():
+        for _vcpu in _sizes:
+            MACHINE_TYPES[f"{_family}-{_shape}-{_vcpu}"] = {
+                "vcpu": _vcpu,
+                "memory_gb": _vcpu * _gb_per_vcpu,
+                "shared_core": False,
+                "monthly_cost": round(_multiplier * (
+                    _vcpu * CPU_CORE_MONTHLY_COST
+                    + _vcpu * _gb_per_vcpu * MEMORY_GB_MONTHLY_COST), 2),
+            }
+
+DEFAULT_MAX_PODS_PER_NODE = 110
+NODE_POOL_LABEL = "cloud.google.com/gke-nodepool"
+INSTANCE_TYPE_LABELS = ("node.kubernetes.io/instance-type",
+                        "beta.kubernetes.io/instance-type")
+HOT_NODE_PERCENT = 85.0         # Node usage above this share of allocatable is "hot"
+# Below this much free, a node's other resources are stranded
+STRANDED_FREE_PERCENT = 10.0
+NODE_MATRIX_COLUMNS = (
+    "node", "pool", "machine_type", "pods", "max_pods",
+    "cpu_allocatable_millicores", "cpu_allocated_percent", "cpu_used_percent",
+    "memory_allocatable_mi", "memory_allocated_percent", "memory_used_percent",
+)
+
+
+def node_allocatable(machine_type: str) -> Tuple[int, int]:
+    """Allocatable (cpu millicores, memory Mi) of a GKE node of this type
+
+    Applies the GKE kube-reserved formula plus the 100Mi eviction threshold.
+    Shared-core E2 machines expose a fixed 940m of CPU.
+    """
+    spec = MACHINE_TYPES[machine_type]
+    cores = spec["vcpu"]
+
+    if spec["shared_core"]:
+        cpu = 940
+    else:
+        reserved = 60 + 10 * min(max(cores - 1, 0), 1)
+        reserved += 5 * min(max(cores - 2, 0), 2) + 2.5 * max(cores - 4, 0)
+        cpu = int(cores * 1000 - reserved)
+
+    memory = spec["memory_gb"] * 1024
+    if memory < 1024:
+        reserved_memory = 255
+    else:
+        reserved_memory = 0.25 * min(memory, 4096)
+        for start, end, rate in ((4096, 8192, 0.20), (8192, 16384, 0.10),
+                                 (16384, 131072, 0.06), (131072, float("inf"), 0.02)):
+            if memory > start:
+                reserved_memory += rate * (min(memory, end) - start)
+    return cpu, int(memory - reserved_memory - 100)
+
+
+def run_kubectl_json(args: List[str]) -> Dict[str, Any]:
+    """Run a kubectl command and parse its JSON output"""
+    if args[:2] != ["get", "--raw"]:
+        args = args + ["--output=json"]
+    result = subprocess.run(
+        kubectl_command(*args), capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def run_kubectl_parallel(
+        queries: Dict[str, Union[List[str], Callable[[], Dict[str, Any]]]],
+        optional: Tuple[str, ...] = ()) -> Dict[str, Dict[str, Any]]:
+    """Run several kubectl queries concurrently, keyed like queries
+
+    A query is a list of kubectl arguments or a function returning a list
+    object. A cycle then takes as long as its slowest query instead of
+    their sum. Failures of optional queries yield an empty list; others
+    are raised. Each query runs in a copy of the caller's context, so it
+    talks to the caller's cluster (see gke_kubectl.use_kubeconfig).
+    """
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        futures = {key: pool.submit(copy_context().run, query) if callable(query)
+                   else pool.submit(copy_context().run, run_kubectl_json, query)
+                   for key, query in queries.items()}
+    results = {}
+    for key, future in futures.items():
+        try:
+            results[key] = future.result()
+        except Exception:
+            if key not in optional:
+                raise
+            results[key] = {"items": []}
+    return results
+
+
+METRICS_API = "/apis/metrics.k8s.io/v1beta1"
+POD_LIST_PHASES = ("Running", "Pending")        # Listed: these pods hold requests
+POD_COUNT_PHASES = ("Succeeded", "Failed")      # Only counted
+WORKLOAD_TEMPLATE_LISTS = {
+    "ReplicaSet": ("/apis/apps/v1", "replicasets"),
+    "StatefulSet": ("/apis/apps/v1", "statefulsets"),
+    "DaemonSet": ("/apis/apps/v1", "daemonsets"),
+    "Job": ("/apis/batch/v1", "jobs"),
+}
+
+
+def _requests_only(containers: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Containers reduced to their resource requests"""
+    return [{"resources": {"requests": c.get("resources", {}).get("requests", {})}}
+            for c in containers or []]
+
+
+def _compact_spec(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Pod spec reduced to the node and container requests"""
+    return {"nodeName": spec.get("nodeName"),
+            "containers": _requests_only(spec.get("containers")),
+            "initContainers": _requests_only(spec.get("initContainers"))}
+
+
+def collect_workload_templates(namespaces: Optional[List[str]] = None
+                               ) -> Dict[Tuple[str, str, str], Dict[str, Any]]:
+    """Container requests of each workload's pod template, keyed (ns, kind, name)"""
+    templates = {}
+    for kind, (api, resource) in WORKLOAD_TEMPLATE_LISTS.items():
+        for namespace in namespaces or [None]:
+            templates.update(consume_list(
+                namespaced_path(api, resource, namespace),
+                lambda items, kind=kind: {
+                    (item["metadata"].get("namespace"), kind,
+                     item["metadata"].get("name")):
+                        _compact_spec(item.get("spec", {}).get("template", {})
+                                      .get("spec", {}))
+                    for item in items}))
+    return templates
+
+
+def _compact_pod(item: Dict[str, Any], phase: str,
+                 templates: Callable[[], Dict[Tuple[str, str, str], Dict[str, Any]]]
+                 ) -> Dict[str, Any]:
+    """Pod reduced to the fields compute_utilization reads
+
+    Full objects keep their own requests. Metadata-only Table rows take the
+    requests of the owning workload's pod template (pods mutated after
+    creation, e.g. by an in-place resize, show their template's requests)
+    and fall back to fetching the pod when there is no template.
+    """
+    metadata = item.get("metadata", {})
+    if "spec" in item:
+        spec = item["spec"]
+    else:
+        owners = metadata.get("ownerReferences") or [{}]
+        key = (metadata.get("namespace"), owners[0].get("kind"), owners[0].get("name"))
+        spec = templates().get(key)
+        if spec is None:
+            spec = get_raw(namespaced_path("/api/v1", "pods", key[0])
+                           + f"/{metadata.get('name')}").get("spec", {})
+        node = item.get("columns", {}).get("Node")
+        spec = dict(spec, nodeName=node if node and node != "<none>" else None)
+    return {
+        "metadata": {k: metadata[k]
+                     for k in ("name", "namespace", "labels", "ownerReferences")
+                     if k in metadata},
+        "spec": _compact_spec(spec),
+        "status": {"phase": phase},
+    }
+
+
+def collect_pods(namespaces: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Running and pending pods (compacted) plus counts of finished pods
+
+    Pods are selected by phase on the server. When the kubernetes client is
+    available they arrive as Table rows with metadata only and take their
+    requests from workload templates, which are far fewer objects than
+    pods; otherwise full pods are listed and compacted page by page.
+    Finished pods are only counted, from Table rows without objects.
+    """
+    trimmed = supports_trimmed_responses()
+    scopes = namespaces or [None]
+    extra = {"includeObject": "Metadata"} if trimmed else {}
+    tasks = 1 + len(scopes) * (len(POD_LIST_PHASES) + len(POD_COUNT_PHASES))
+
+    with ThreadPoolExecutor(max_workers=tasks) as pool:
+        templates = (pool.submit(collect_workload_templates, namespaces)
+                     if trimmed else None)
+        lookup = templates.result if templates else dict
+        listings = [
+            pool.submit(
+                consume_list, namespaced_path("/api/v1", "pods", namespace),
+                lambda items, phase=phase: [_compact_pod(i, phase, lookup)
+                                            for i in items],
+                params=dict(extra, fieldSelector=f"status.phase={phase}"),
+                accept=TABLE_ACCEPT if trimmed else None)
+            for phase in POD_LIST_PHASES for namespace in scopes
+        ]
+        counts = {
+            (phase, namespace): pool.submit(
+                count_items, namespaced_path("/api/v1", "pods", namespace),
+                {"fieldSelector": f"status.phase={phase}"})
+            for phase in POD_COUNT_PHASES for namespace in scopes
+        }
+
+    phase_counts: Dict[str, int] = {}
+    for (phase, _), future in counts.items():
+        phase_counts[phase] = phase_counts.get(phase, 0) + future.result()
+    return {"items": [pod for future in listings for pod in future.result()],
+            "counts": phase_counts}
+
+
+def collect_nodes() -> List[Dict[str, Any]]:
+    """Nodes reduced to name, labels and allocatable (no image lists)"""
+    return consume_list(NODES_PATH, lambda items: [
+        {"metadata": {"name": n["metadata"].get("name"),
+                      "labels": n["metadata"].get("labels", {})},
+         "status": {"allocatable": n.get("status", {}).get("allocatable", {})}}
+        for n in items])
+
+
+def collect_metrics(resource: str, namespaces: Optional[List[str]] = None
+                    ) -> Dict[str, Any]:
+    """Pod or node metrics, scoped to namespaces for pods"""
+    if resource == "nodes":
+        return get_raw(f"{METRICS_API}/nodes")
+    return {"items": [item for namespace in namespaces or [None]
+                      for item in get_raw(
+                          namespaced_path(METRICS_API, "pods", namespace))
+                      .get("items", [])]}
+
+
+def collect_cluster_usage(namespaces: Optional[List[str]] = None
+                          ) -> Dict[str, Dict[str, Any]]:
+    """Pods, nodes and pod and node metrics, fetched concurrently
+
+    Metrics come from the metrics API; a cluster without metrics-server
+    still gets request and allocatable figures.
+    """
+    return run_kubectl_parallel({
+        "pods": lambda: collect_pods(namespaces),
+        "nodes": lambda: {"items": collect_nodes()},
+        "pod_metrics": lambda: collect_metrics("pods", namespaces),
+        "node_metrics": lambda: collect_metrics("nodes"),
+    }, optional=("pod_metrics", "node_metrics"))
+
+
+def collect_node_filesystems(node_names: Iterable[str]
+                             ) -> Dict[str, Tuple[float, float]]:
+    """(used, capacity) bytes of each node's filesystem from the kubelet summary API
+
+    Nodes are read concurrently; nodes whose summary cannot be read are
+    left out.
+    """
+    names = list(node_names)
+    if not names:
+        return {}
+
+    def read(name: str) -> Tuple[float, float]:
+        summary = get_raw(f"{NODES_PATH}/{name}/proxy/stats/summary")
+        fs = summary.get("node", {}).get("fs", {})
+        return float(fs.get("usedBytes", 0)), float(fs.get("capacityBytes", 0))
+
+    with ThreadPoolExecutor(max_workers=min(len(names), 16)) as pool:
+        futures = {name: pool.submit(copy_context().run, read, name) for name in names}
+    usage = {}
+    for name, future in futures.items():
+        try:
+            usage[name] = future.result()
+        except Exception:
+            continue
+    return usage
+
+
+def pod_requests(pod: Dict[str, Any]) -> Tuple[float, float]:
+    """Effective (cpu millicores, memory Mi) requests of a pod
+
+    Follows the scheduler: the sum over app containers, or the largest init
+    container request when that is bigger.
+    """
+    spec = pod.get("spec", {})
+    cpu = memory = 0.0
+    for container in spec.get("containers", []):
+        requests = container.get("resources", {}).get("requests", {})
+        cpu += parse_cpu_millicores(requests.get("cpu"))
+        memory += parse_memory_mi(requests.get("memory"))
+    for container in spec.get("initContainers", []):
+        requests = container.get("resources", {}).get("requests", {})
+        cpu = max(cpu, parse_cpu_millicores(requests.get("cpu")))
+        memory = max(memory, parse_memory_mi(requests.get("memory")))
+    return cpu, memory
+
+
+def pod_workload(pod: Dict[str, Any]) -> str:
+    """Name the workload that owns a pod as Kind/name"""
+    metadata = pod.get("metadata", {})
+    owners = metadata.get("ownerReferences", [])
+    if not owners:
+        return f"Pod/{metadata.get('name')}"
+
+    owner = owners[0]
+    kind, name = owner.get("kind"), owner.get("name", "")
+    template_hash = metadata.get("labels", {}).get("pod-template-hash")
+    if kind == "ReplicaSet" and template_hash and name.endswith(f"-{template_hash}"):
+        return f"Deployment/{name[:-len(template_hash) - 1]}"
+    return f"{kind}/{name}"
+
+
+def pod_usage_index(pod_metrics: Iterable[Dict[str, Any]]
+                    ) -> Dict[Tuple[str, str], Tuple[float, float]]:
+    """(cpu millicores, memory Mi) usage of each pod keyed by (namespace, name)"""
+    usage_index = {}
+    for item in pod_metrics:
+        metadata = item.get("metadata", {})
+        cpu = memory = 0.0
+        for container in item.get("containers", []):
+            usage = container.get("usage", {})
+            cpu += parse_cpu_millicores(usage.get("cpu"))
+            memory += parse_memory_mi(usage.get("memory"))
+        usage_index[(metadata.get("namespace"), metadata.get("name"))] = (cpu, memory)
+    return usage_index
+
+
+def _new_bucket() -> Dict[str, float]:
+    """Accumulator for requests and usage of a group of pods"""
+    return {
+        "pods": 0,
+        "pods_with_metrics": 0,
+        "cpu_requests_millicores": 0.0,
+        "memory_requests_mi": 0.0,
+        "cpu_usage_millicores": 0.0,
+        "memory_usage_mi": 0.0,
+        # Requests and usage of the pods that have both, used for the ratio
+        "_cpu_measured_requests": 0.0,
+        "_cpu_measured_usage": 0.0,
+        "_memory_measured_requests": 0.0,
+        "_memory_measured_usage": 0.0,
+    }
+
+
+def _percent(part: float, whole: float) -> float:
+    """Percentage rounded for reporting, 0 when the whole is empty"""
+    return round(part / whole * 100, 1) if whole > 0 else 0
+
+
+def _finish_bucket(bucket: Dict[str, float]) -> Dict[str, float]:
+    """Turn an accumulator into a report entry with utilization ratios"""
+    result = {k: (round(v, 1) if isinstance(v, float) else v)
+              for k, v in bucket.items() if not k.startswith("_")}
+    result["cpu_utilization_percent"] = _percent(
+        bucket["_cpu_measured_usage"], bucket["_cpu_measured_requests"])
+    result["memory_utilization_percent"] = _percent(
+        bucket["_memory_measured_usage"], bucket["_memory_measured_requests"])
+    return result
+
+
+def _pool_report(pool: Dict[str, Any]) -> Dict[str, Any]:
+    """Efficiency scores of a node pool from its summed node figures
+
+    The scores weight CPU and memory by price: allocation_score is the share
+    of the pool's paid allocatable capacity that pods request, usage_score
+    the share actually used.
+    """
+    paid = requests_monthly_cost(pool["allocatable_cpu_millicores"],
+                                 pool["allocatable_memory_mi"])
+    report = dict(pool, machine_types=sorted(pool["machine_types"]))
+    report["allocation_score"] = _percent(requests_monthly_cost(
+        pool["requested_cpu_millicores"], pool["requested_memory_mi"]), paid)
+    report["usage_score"] = _percent(requests_monthly_cost(
+        pool["used_cpu_millicores"], pool["used_memory_mi"]), paid)
+    report["stranded_monthly_cost"] = round(requests_monthly_cost(
+        pool["stranded_cpu_millicores"], pool["stranded_memory_mi"]), 2)
+    for key in ("allocatable_cpu_millicores", "allocatable_memory_mi",
+                "requested_cpu_millicores", "requested_memory_mi",
+                "used_cpu_millicores", "used_memory_mi",
+                "stranded_cpu_millicores", "stranded_memory_mi"):
+        report[key] = round(report[key], 1)
+    return report
+
+
+def compute_utilization(pods: Iterable[Dict[str, Any]],
+                        pod_metrics: List[Dict[str, Any]],
+                        nodes: List[Dict[str, Any]],
+                        node_metrics: Optional[List[Dict[str, Any]]] = None,
+                        phase_counts: Optional[Dict[str, int]] = None
+                        ) -> Dict[str, Any]:
+    """Utilization against declared requests and node allocatable capacity
+
+    Usage is joined to pods through an index keyed by namespace/pod. The
+    request-based ratios only count pods that have both metrics and a
+    request for that resource, so pods without metrics do not dilute them.
+    Terminated pods are counted but hold no requests. Pods are read in one
+    pass, so they can be streamed from a paginated listing; phase_counts
+    adds pods that were counted but not listed.
+
+    Node metrics, when given, measure whole-node usage (including system
+    daemons) and drive the per-node matrix, hot nodes and pool scores;
+    without them node usage falls back to the sum of its pods' usage.
+    """
+    usage_index = pod_usage_index(pod_metrics)
+
+    node_usage_index: Dict[str, Tuple[float, float]] = {}
+    for item in node_metrics or []:
+        usage = item.get("usage", {})
+        node_usage_index[item.get("metadata", {}).get("name")] = (
+            parse_cpu_millicores(usage.get("cpu")),
+            parse_memory_mi(usage.get("memory")))
+
+    phases: Dict[str, int] = dict(phase_counts or {})
+    cluster = _new_bucket()
+    by_node: Dict[str, Dict[str, float]] = {}
+    by_namespace: Dict[str, Dict[str, float]] = {}
+    by_workload: Dict[str, Dict[str, float]] = {}
+
+    for pod in pods:
+        metadata = pod.get("metadata", {})
+        namespace = metadata.get("namespace", "default")
+        phase = pod.get("status", {}).get("phase", "Unknown")
+        phases[phase] = phases.get(phase, 0) + 1
+
+        if phase in ("Succeeded", "Failed"):
+            cpu_req = memory_req = 0.0
+        else:
+            cpu_req, memory_req = pod_requests(pod)
+        usage = usage_index.get((namespace, metadata.get("name")))
+
+        buckets = [
+            cluster,
+            by_namespace.setdefault(namespace, _new_bucket()),
+            by_workload.setdefault(f"{namespace}/{pod_workload(pod)}", _new_bucket()),
+        ]
+        node_name = pod.get("spec", {}).get("nodeName")
+        if node_name:
+            buckets.append(by_node.setdefault(node_name, _new_bucket()))
+
+        for bucket in buckets:
+            bucket["pods"] += 1
+            bucket["cpu_requests_millicores"] += cpu_req
+            bucket["memory_requests_mi"] += memory_req
+            if usage is None:
+                continue
+            bucket["pods_with_metrics"] += 1
+            bucket["cpu_usage_millicores"] += usage[0]
+            bucket["memory_usage_mi"] += usage[1]
+            if cpu_req > 0:
+                bucket["_cpu_measured_requests"] += cpu_req
+                bucket["_cpu_measured_usage"] += usage[0]
+            if memory_req > 0:
+                bucket["_memory_measured_requests"] += memory_req
+                bucket["_memory_measured_usage"] += usage[1]
+
+    allocatable_cpu = allocatable_memory = 0.0
+    node_report = {}
+    node_matrix = []
+    pools: Dict[str, Dict[str, Any]] = {}
+    hot_nodes = []
+    for node in nodes:
+        metadata = node.get("metadata", {})
+        name = metadata.get("name")
+        labels = metadata.get("labels", {})
+        allocatable = node.get("status", {}).get("allocatable", {})
+        cpu = parse_cpu_millicores(allocatable.get("cpu"))
+        memory = parse_memory_mi(allocatable.get("memory"))
+        max_pods = int(allocatable.get("pods", DEFAULT_MAX_PODS_PER_NODE))
+        allocatable_cpu += cpu
+        allocatable_memory += memory
+
+        entry = _finish_bucket(by_node.get(name, _new_bucket()))
+        entry["pool"] = labels.get(NODE_POOL_LABEL, "unknown")
+        entry["machine_type"] = next(
+            (labels[key] for key in INSTANCE_TYPE_LABELS if key in labels), "unknown")
+        entry["max_pods"] = max_pods
+        entry["allocatable_cpu_millicores"] = round(cpu, 1)
+        entry["allocatable_memory_mi"] = round(memory, 1)
+        entry["cpu_allocated_percent"] = _percent(entry["cpu_requests_millicores"], cpu)
+        entry["memory_allocated_percent"] = _percent(
+            entry["memory_requests_mi"], memory)
+        entry["cpu_allocatable_used_percent"] = _percent(
+            entry["cpu_usage_millicores"], cpu)
+        entry["memory_allocatable_used_percent"] = _percent(
+            entry["memory_usage_mi"], memory)
+
+        # Whole-node usage from node metrics, else the sum over its pods
+        used_cpu, used_memory = node_usage_index.get(
+            name, (entry["cpu_usage_millicores"], entry["memory_usage_mi"]))
+        entry["node_cpu_usage_millicores"] = round(used_cpu, 1)
+        entry["node_memory_usage_mi"] = round(used_memory, 1)
+        entry["cpu_used_percent"] = _percent(used_cpu, cpu)
+        entry["memory_used_percent"] = _percent(used_memory, memory)
+
+        # Capacity nobody can request because another resource is exhausted
+        free_cpu = max(cpu - entry["cpu_requests_millicores"], 0.0)
+        free_memory = max(memory - entry["memory_requests_mi"], 0.0)
+        pods_full = entry["pods"] >= max_pods
+        entry["stranded_cpu_millicores"] = round(free_cpu if pods_full or _percent(
+            free_memory, memory) < STRANDED_FREE_PERCENT else 0.0, 1)
+        entry["stranded_memory_mi"] = round(free_memory if pods_full or _percent(
+            free_cpu, cpu) < STRANDED_FREE_PERCENT else 0.0, 1)
+        node_report[name] = entry
+
+        hot = max(entry["cpu_used_percent"],
+                  entry["memory_used_percent"]) >= HOT_NODE_PERCENT
+        if hot:
+            hot_nodes.append(name)
+        node_matrix.append([
+            name, entry["pool"], entry["machine_type"], entry["pods"], max_pods,
+            entry["allocatable_cpu_millicores"], entry["cpu_allocated_percent"],
+            entry["cpu_used_percent"], entry["allocatable_memory_mi"],
+            entry["memory_allocated_percent"], entry["memory_used_percent"],
+        ])
+
+        pool = pools.setdefault(entry["pool"], {
+            "nodes": 0, "machine_types": set(), "pods": 0,
+            "allocatable_cpu_millicores": 0.0, "allocatable_memory_mi": 0.0,
+            "requested_cpu_millicores": 0.0, "requested_memory_mi": 0.0,
+            "used_cpu_millicores": 0.0, "used_memory_mi": 0.0,
+            "stranded_cpu_millicores": 0.0, "stranded_memory_mi": 0.0,
+            "hot_nodes": 0,
+        })
+        pool["nodes"] += 1
+        pool["machine_types"].add(entry["machine_type"])
+        pool["pods"] += entry["pods"]
+        pool["allocatable_cpu_millicores"] += cpu
+        pool["allocatable_memory_mi"] += memory
+        pool["requested_cpu_millicores"] += entry["cpu_requests_millicores"]
+        pool["requested_memory_mi"] += entry["memory_requests_mi"]
+        pool["used_cpu_millicores"] += used_cpu
+        pool["used_memory_mi"] += used_memory
+        pool["stranded_cpu_millicores"] += entry["stranded_cpu_millicores"]
+        pool["stranded_memory_mi"] += entry["stranded_memory_mi"]
+        pool["hot_nodes"] += int(hot)
+
+    # Pods bound to nodes that were not listed (e.g. being deleted)
+    for name, bucket in by_node.items():
+        node_report.setdefault(name, _finish_bucket(bucket))
+
+    summary = _finish_bucket(cluster)
+    return {
+        "total_pods": sum(phases.values()),
+        "running_pods": phases.get("Running", 0),
+        "pending_pods": phases.get("Pending", 0),
+        "failed_pods": phases.get("Failed", 0),
+        "succeeded_pods": phases.get("Succeeded", 0),
+        "pods_without_metrics": summary["pods"] - summary["pods_with_metrics"],
+        "total_cpu_millicores": summary["cpu_usage_millicores"],
+        "total_memory_mi": summary["memory_usage_mi"],
+        "requested_cpu_millicores": summary["cpu_requests_millicores"],
+        "requested_memory_mi": summary["memory_requests_mi"],
+        "allocatable_cpu_millicores": round(allocatable_cpu, 1),
+        "allocatable_memory_mi": round(allocatable_memory, 1),
+        "cpu_utilization_percent": summary["cpu_utilization_percent"],
+        "memory_utilization_percent": summary["memory_utilization_percent"],
+        "cpu_allocated_percent": _percent(
+            summary["cpu_requests_millicores"], allocatable_cpu),
+        "memory_allocated_percent": _percent(
+            summary["memory_requests_mi"], allocatable_memory),
+        "by_node": node_report,
+        "node_matrix": {"columns": list(NODE_MATRIX_COLUMNS), "rows": node_matrix},
+        "by_pool": {k: _pool_report(v) for k, v in sorted(pools.items())},
+        "hot_nodes": hot_nodes,
+        "nodes_without_metrics": sum(
+            1 for node in nodes
+            if node.get("metadata", {}).get("name") not in node_usage_index),
+        "by_namespace": {k: _finish_bucket(v) for k, v in sorted(by_namespace.items())},
+        "by_workload": {k: _finish_bucket(v) for k, v in sorted(by_workload.items())},
+    }
+
+
+def attribute_costs(pod_status: Dict[str, Any]) -> Dict[str, float]:
+    """Daily cost attributed to each namespace and workload
+
+    A group is charged for the larger of what it requests and what it uses,
+    so both scale-ups and pods bursting past their requests show up.
+    """
+    costs = {}
+    for prefix in ("namespace", "workload"):
+        for name, entry in pod_status.get(f"by_{prefix}", {}).items():
+            cpu = max(entry["cpu_requests_millicores"], entry["cpu_usage_millicores"])
+            memory = max(entry["memory_requests_mi"], entry["memory_usage_mi"])
+            costs[f"{prefix}/{name}"] = round(
+                requests_monthly_cost(cpu, memory) / 30, 4)
+    return costs
+
+
+POD_PHASES = ("Pending", "Running", "Succeeded", "Failed", "Unknown")
+_PHASE_CODES = {phase: code for code, phase in enumerate(POD_PHASES)}
+POD_TABLE_COLUMNS = ("cpu_requests_millicores", "memory_requests_mi",
+                     "cpu_usage_millicores", "memory_usage_mi")
+POD_TABLE_HISTORY = 6   # Pod tables the monitor keeps for diffing
+
+
+class StringTable:
+    """Interned strings referenced by integer code
+
+    Each distinct namespace, node, workload and label string is stored once.
+    Sharing one table between PodTables keeps codes comparable across
+    snapshots; it only grows with new distinct values, not with pods, so
+    long-lived owners rebuild it from the tables they still hold.
+    """
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self):
+        """Initialize an empty table"""
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        """Code of a string, adding it on first sight"""
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return code
+
+    def find(self, value: str) -> Optional[int]:
+        """Code of a known string, or None"""
+        return self._codes.get(value)
+
+    def __getitem__(self, code: int) -> str:
+        """String of a code"""
+        return self.values[code]
+
+    def __len__(self) -> int:
+        """Number of distinct strings"""
+        return len(self.values)
+
+
+class PodTable:
+    """Struct-of-arrays pod snapshot
+
+    One typed array per field instead of a dict per pod: float32 requests
+    and usage, an int8 phase code, and int32 codes into a StringTable for
+    namespace, node (-1 when unscheduled), workload and label set. Pod names
+    are packed into one UTF-8 buffer with offsets. A 50k-pod cluster takes
+    a few MB, and scans run over flat arrays.
+    """
+
+    __slots__ = ("strings", "phase", "namespace", "node", "workload", "labels",
+                 "cpu_requests_millicores", "memory_requests_mi",
+                 "cpu_usage_millicores", "memory_usage_mi",
+                 "label_sets", "_label_set_codes", "_names", "_name_offsets")
+
+    def __init__(self, strings: Optional[StringTable] = None):
+        """Initialize an empty table, optionally sharing another table's strings"""
+        self.strings = strings if strings is not None else StringTable()
+        self.phase = array("b")
+        self.namespace = array("i")
+        self.node = array("i")
+        self.workload = array("i")
+        self.labels = array("i")
+        self.cpu_requests_millicores = array("f")
+        self.memory_requests_mi = array("f")
+        self.cpu_usage_millicores = array("f")
+        self.memory_usage_mi = array("f")
+        # Distinct label sets as sorted (key code, value code) pairs; pods
+        # of one workload share a set
+        self.label_sets: List[Tuple[Tuple[int, int], ...]] = []
+        self._label_set_codes: Dict[Tuple[Tuple[int, int], ...], int] = {}
+        self._names = bytearray()
+        self._name_offsets = array("I", [0])
+
+    @classmethod
+    def from_pods(cls, pods: Iterable[Dict[str, Any]],
+                  pod_metrics: Iterable[Dict[str, Any]] = (),
+                  strings: Optional[StringTable] = None) -> "PodTable":
+        """Build a table from pod objects (full or compacted) and pod metrics"""
+        table = cls(strings)
+        usage_index = pod_usage_index(pod_metrics)
+        for pod in pods:
+            metadata = pod.get("metadata", {})
+            namespace = metadata.get("namespace", "default")
+            name = metadata.get("name", "")
+            phase = pod.get("status", {}).get("phase", "Unknown")
+            if phase in ("Succeeded", "Failed"):
+                cpu_req = memory_req = 0.0
+            else:
+                cpu_req, memory_req = pod_requests(pod)
+            cpu_use, memory_use = usage_index.get((namespace, name), (0.0, 0.0))
+            table.append(namespace, name, phase, pod.get("spec", {}).get("nodeName"),
+                         pod_workload(pod), metadata.get("labels") or {},
+                         cpu_req, memory_req, cpu_use, memory_use)
+        return table
+
+    def append(self, namespace: str, name: str, phase: str, node: Optional[str],
+               workload: str, labels: Mapping[str, str], cpu_requests: float,
+               memory_requests: float, cpu_usage: float = 0.0,
+               memory_usage: float = 0.0) -> None:
+        """Add one pod row"""
+        code = self.strings.code
+        label_set = tuple(sorted((code(k), code(v)) for k, v in labels.items()))
+        label_code = self._label_set_codes.get(label_set)
+        if label_code is None:
+            label_code = self._label_set_codes[label_set] = len(self.label_sets)
+            self.label_sets.append(label_set)
+
+        self.phase.append(_PHASE_CODES.get(phase, _PHASE_CODES["Unknown"]))
+        self.namespace.append(code(namespace))
+        self.node.append(code(node) if node else -1)
+        self.workload.append(code(workload))
+        self.labels.append(label_code)
+        self.cpu_requests_millicores.append(cpu_requests)
+        self.memory_requests_mi.append(memory_requests)
+        self.cpu_usage_millicores.append(cpu_usage)
+        self.memory_usage_mi.append(memory_usage)
+        self._names += name.encode()
+        self._name_offsets.append(len(self._names))
+
+    def __len__(self) -> int:
+        """Number of pod rows"""
+        return len(self.phase)
+
+    def rebase(self, strings: StringTable) -> "PodTable":
+        """Copy of the table with its codes moved into another StringTable"""
+        table = PodTable(strings)
+        mapping: Dict[int, int] = {}
+
+        def code(old: int) -> int:
+            new = mapping.get(old)
+            if new is None:
+                new = mapping[old] = strings.code(self.strings[old])
+            return new
+
+        for column in ("namespace", "node", "workload"):
+            setattr(table, column, array("i", (code(c) if c >= 0 else -1
+                                               for c in getattr(self, column))))
+        table.label_sets = [tuple(sorted((code(k), code(v)) for k, v in label_set))
+                            for label_set in self.label_sets]
+        table._label_set_codes = {s: i for i, s in enumerate(table.label_sets)}
+        for column in ("phase", "labels", "cpu_requests_millicores",
+                       "memory_requests_mi", "cpu_usage_millicores",
+                       "memory_usage_mi", "_name_offsets"):
+            setattr(table, column, array(getattr(self, column).typecode,
+                                         getattr(self, column)))
+        table._names = bytearray(self._names)
+        return table
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the columns and the name buffer (strings are shared)"""
+        columns = (self.phase, self.namespace, self.node, self.workload, self.labels,
+                   self.cpu_requests_millicores, self.memory_requests_mi,
+                   self.cpu_usage_millicores, self.memory_usage_mi, self._name_offsets)
+        return sum(c.itemsize * len(c) for c in columns) + len(self._names)
+
+    def name(self, row: int) -> str:
+        """Name of the pod in a row"""
+        offsets = self._name_offsets
+        return self._names[offsets[row]:offsets[row + 1]].decode()
+
+    def key(self, row: int) -> Tuple[str, str]:
+        """(namespace, name) of the pod in a row"""
+        return self.strings[self.namespace[row]], self.name(row)
+
+    def rows(self, phase: Optional[str] = None, namespace: Optional[str] = None,
+             node: Optional[str] = None, label: Optional[Tuple[str, str]] = None
+             ) -> List[int]:
+        """Indexes of the rows matching every given filter"""
+        filters = []
+        if phase is not None:
+            filters.append((self.phase, _PHASE_CODES.get(phase)))
+        if namespace is not None:
+            filters.append((self.namespace, self.strings.find(namespace)))
+        if node is not None:
+            filters.append((self.node, self.strings.find(node)))
+
+        selected: Iterable[int] = range(len(self))
+        for column, code in filters:
+            if code is None:
+                return []
+            selected = [i for i in selected if column[i] == code]
+        if label is not None:
+            pair = (self.strings.find(label[0]), self.strings.find(label[1]))
+            sets = {i for i, s in enumerate(self.label_sets) if pair in s}
+            selected = [i for i in selected if self.labels[i] in sets]
+        return list(selected)
+
+    def total(self, column: str, rows: Optional[Iterable[int]] = None) -> float:
+        """Sum of a numeric column, over all rows or the given ones"""
+        values = getattr(self, column)
+        return sum(values) if rows is None else sum(values[i] for i in rows)
+
+    def group_sum(self, column: str, by: str = "namespace",
+                  rows: Optional[Iterable[int]] = None) -> Dict[str, float]:
+        """Sum of a numeric column per namespace, node or workload"""
+        values = getattr(self, column)
+        groups = getattr(self, by)
+        sums: Dict[int, float] = {}
+        for i in range(len(self)) if rows is None else rows:
+            sums[groups[i]] = sums.get(groups[i], 0.0) + values[i]
+        return {self.strings[code] if code >= 0 else None: round(total, 1)
+                for code, total in sorted(sums.items())}
+
+    def phase_counts(self) -> Dict[str, int]:
+        """Number of pods in each phase"""
+        counts = [0] * len(POD_PHASES)
+        for code in self.phase:
+            counts[code] += 1
+        return {phase: n for phase, n in zip(POD_PHASES, counts) if n}
+
+    def diff(self, older: "PodTable") -> Dict[str, Any]:
+        """Pods added, removed and changed since an older table
+
+        A pod changed when its phase, node or requests differ. Request
+        deltas per namespace cover all three kinds of change.
+        """
+        before = {older.key(i): i for i in range(len(older))}
+        added, changed = [], []
+        cpu_delta: Dict[str, float] = {}
+        memory_delta: Dict[str, float] = {}
+
+        def shift(namespace: str, cpu: float, memory: float) -> None:
+            cpu_delta[namespace] = cpu_delta.get(namespace, 0.0) + cpu
+            memory_delta[namespace] = memory_delta.get(namespace, 0.0) + memory
+
+        for i in range(len(self)):
+            key = self.key(i)
+            cpu, memory = self.cpu_requests_millicores[i], self.memory_requests_mi[i]
+            j = before.pop(key, None)
+            if j is None:
+                added.append(key)
+                shift(key[0], cpu, memory)
+                continue
+            old_node = older.strings[older.node[j]] if older.node[j] >= 0 else None
+            node = self.strings[self.node[i]] if self.node[i] >= 0 else None
+            old_cpu = older.cpu_requests_millicores[j]
+            old_memory = older.memory_requests_mi[j]
+            if (self.phase[i], node, cpu, memory) != (older.phase[j], old_node,
+                                                     old_cpu, old_memory):
+                changed.append(key)
+                shift(key[0], cpu - old_cpu, memory - old_memory)
+
+        removed = sorted(before)
+        for key in removed:
+            j = before[key]
+            shift(key[0], -older.cpu_requests_millicores[j],
+                  -older.memory_requests_mi[j])
+
+        return {
+            "added": sorted(added),
+            "removed": removed,
+            "changed": sorted(changed),
+            "cpu_requests_delta_millicores": {
+                k: round(v, 1) for k, v in sorted(cpu_delta.items()) if v},
+            "memory_requests_delta_mi": {
+                k: round(v, 1) for k, v in sorted(memory_delta.items()) if v},
+        }
+
+
+def node_pool_costs(machine_type: str, node_count: int, preemptible: bool = False,
+                    disk_size_gb: float = 20) -> Dict[str, Any]:
+    """Daily, weekly and monthly cost of a node pool configuration"""
+    # Get base cost for machine type (approximate monthly price)
+    machine = MACHINE_TYPES.get(machine_type, MACHINE_TYPES["e2-micro"])
+    base_cost = machine["monthly_cost"]
+    
+    # Apply preemptible discount (50% off)
+    if preemptible:
+        base_cost *= PREEMPTIBLE_DISCOUNT
+    
+    # Calculate daily cost
+    daily_cost = (base_cost * node_count) / 30
+    
+    # Add storage costs (approximate)
+    daily_storage_cost = (disk_size_gb * DISK_GB_MONTHLY_COST) / 30
+    
+    total_daily_cost = daily_cost + daily_storage_cost + NETWORK_DAILY_COST
+    
+    return {
+        "daily_cost": round(total_daily_cost, 2),
+        "weekly_cost": round(total_daily_cost * 7, 2),
+        "monthly_cost": round(total_daily_cost * 30, 2),
+        "node_cost": round(daily_cost, 2),
+        "storage_cost": round(daily_storage_cost, 2),
+        "network_cost": round(NETWORK_DAILY_COST, 2),
+        "preemptible_savings": "50%" if preemptible else "0%"
+    }
+
+
+def freeze(value: Any) -> Any:
+    """Deep read-only copy: dicts become mapping proxies, lists become tuples"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Deep mutable copy of a frozen value (e.g. for JSON serialization)"""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+class MonitorSnapshot(NamedTuple):
+    """Immutable view of one monitoring pass, every field from the same collection"""
+
+    version: int
+    taken_at: float
+    phase: str
+    thresholds: Mapping[str, float]
+    cluster_status: Mapping[str, Any]
+    pod_status: Mapping[str, Any]
+    costs: Mapping[str, Any]
+    threshold_check: Mapping[str, Any]
+    recommendations: Tuple[str, ...]
+    cost_attribution: Mapping[str, float]
+    pod_changes: Mapping[str, Any] = MappingProxyType({})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict copy of the snapshot"""
+        return {field: thaw(getattr(self, field)) for field in self._fields}
 
 
 class GKECostMonitor:
@@ -23,32 +1060,52 @@ class GKECostMonitor:
         self.project_id = self._get_project_id()
         self.billing_account = self._get_billing_account()
         
-        # Cost thresholds for different phases
-        self.cost_thresholds = {
-            "development": {
-                "daily": 0.20,      # $0.20/day = ~$6/month
-                "weekly": 1.40,     # $1.40/week
-                "monthly": 5.00     # $5/month
-            },
-            "testing": {
-                "daily": 0.50,      # $0.50/day = ~$15/month
-                "weekly": 3.50,     # $3.50/week
-                "monthly": 15.00    # $15/month
-            },
-            "demo": {
-                "daily": 0.83,      # $0.83/day = ~$25/month
-                "weekly": 5.83,     # $5.83/week
-                "monthly": 25.00    # $25/month
-            }
-        }
+        # Current phase (start with development) and thresholds live in one
+        # immutable tuple that is replaced, never mutated, so a reader always
+        # sees a matching pair without taking a lock
+        self._config = ("development", freeze(DEFAULT_COST_THRESHOLDS))
+        self._config_lock = threading.Lock()    # Serializes writers only
+        
+        # Namespaces to collect pods from (None for the whole cluster)
+        self.namespaces: Optional[List[str]] = None
         
-        # Current phase (start with development)
-        self.current_phase = "development"
+        # Compact pod tables of the last collections, newest last, for diffing
+        self.pod_strings = StringTable()
+        self.pod_tables: "deque[PodTable]" = deque(maxlen=POD_TABLE_HISTORY)
+        self._live_strings = 0    # Size of pod_strings after the last rebuild
         
         # Data directory for cost reports
         self.data_dir = Path("cost_reports")
         self.data_dir.mkdir(exist_ok=True)
 
+    @property
+    def current_phase(self) -> str:
+        """Current development phase"""
+        return self._config[0]
+
+    @current_phase.setter
+    def current_phase(self, phase: str) -> None:
+        with self._config_lock:
+            self._config = (phase, self._config[1])
+
+    @property
+    def cost_thresholds(self) -> Mapping[str, Mapping[str, float]]:
+        """Read-only cost thresholds by phase"""
+        return self._config[1]
+
+    @cost_thresholds.setter
+    def cost_thresholds(self, thresholds: Dict[str, Dict[str, float]]) -> None:
+        with self._config_lock:
+            self._config = (self._config[0], freeze(thresholds))
+
+    def update_thresholds(self, phase: str, thresholds: Dict[str, float]) -> None:
+        """Replace some thresholds of a phase (copy-on-write)"""
+        with self._config_lock:
+            current_phase, current = self._config
+            updated = thaw(current)
+            updated.setdefault(phase, {}).update(thresholds)
+            self._config = (current_phase, freeze(updated))
+
     def _get_project_id(self) -> str:
         """Get current GCP project ID"""
         try:
@@ -109,133 +1166,84 @@ class GKECostMonitor:
     def get_gke_pod_status(self) -> Dict[str, Any]:
         """Get current GKE pod status and resource usage"""
         try:
-            # Get pod information
-            result = subprocess.run([
-                "kubectl", "get", "pods", "--all-namespaces", "--output=json"
-            ], capture_output=True, text=True, check=True)
-            
-            pods_info = json.loads(result.stdout)
-            
-            # Get resource usage
-            result = subprocess.run([
-                "kubectl", "top", "pods", "--all-namespaces", "--output=json"
-            ], capture_output=True, text=True, check=True)
-            
-            try:
-                usage_info = json.loads(result.stdout)
-            except Exception:
-                usage_info = {"items": []}
-            
-            # Analyze pod status
-            total_pods = len(pods_info.get("items", []))
-            running_pods = sum(1 for pod in pods_info.get("items", []) 
-                             if pod.get("status", {}).get("phase") == "Running")
-            pending_pods = sum(1 for pod in pods_info.get("items", []) 
-                             if pod.get("status", {}).get("phase") == "Pending")
-            failed_pods = sum(1 for pod in pods_info.get("items", []) 
-                            if pod.get("status", {}).get("phase") == "Failed")
-            
-            # Calculate resource usage
-            total_cpu = 0
-            total_memory = 0
-            
-            for usage in usage_info.get("items", []):
-                cpu_str = usage.get("usage", {}).get("cpu", "0m")
-                memory_str = usage.get("usage", {}).get("memory", "0Mi")
-                
-                            # Convert CPU to millicores
-            if cpu_str.endswith('m'):
-                total_cpu += int(cpu_str[:-1])
-            else:
-                total_cpu += int(float(cpu_str) * 1000)
-
-            # Convert memory to Mi
-            if memory_str.endswith('Ki'):
-                total_memory += int(memory_str[:-2]) // 1024
-            elif memory_str.endswith('Mi'):
-                total_memory += int(memory_str[:-2])
-            elif memory_str.endswith('Gi'):
-                total_memory += int(float(memory_str[:-2]) * 1024)
-            
-            return {
-                "total_pods": total_pods,
-                "running_pods": running_pods,
-                "pending_pods": pending_pods,
-                "failed_pods": failed_pods,
-                "total_cpu_millicores": total_cpu,
-                "total_memory_mi": total_memory,
-                "cpu_utilization_percent": min( \
-    100, (total_cpu / (total_pods * 100)) * 100) if total_pods > 0 else 0,
-                "memory_utilization_percent": min( \
-    100, (total_memory / (total_pods * 256)) * 100) if total_pods > 0 else 0
-            }
+            results = collect_cluster_usage(self.namespaces)
+
+            self._add_pod_table(PodTable.from_pods(
+                results["pods"]["items"], results["pod_metrics"].get("items", []),
+                self.pod_strings))
+            return compute_utilization(
+                results["pods"]["items"],
+                results["pod_metrics"].get("items", []),
+                results["nodes"]["items"],
+                results["node_metrics"].get("items", []),
+                results["pods"]["counts"]
+            )
         except Exception as e:
             print(f"❌ Failed to get pod status: {e}")
             return {}
 
-    def estimate_gke_costs(self) -> Dict[str, float]:
+    def _add_pod_table(self, table: PodTable) -> None:
+        """Keep a pod table, rebuilding the shared strings as old tables leave
+
+        Labels such as pod-template-hash or controller-uid take new values
+        on every rollout or Job, so the StringTable is rebuilt from the
+        retained tables once it is twice its last rebuilt size.
+        """
+        evicting = len(self.pod_tables) == self.pod_tables.maxlen
+        self.pod_tables.append(table)
+        if evicting and len(self.pod_strings) > 2 * self._live_strings:
+            strings = StringTable()
+            self.pod_tables = deque((t.rebase(strings) for t in self.pod_tables),
+                                    maxlen=self.pod_tables.maxlen)
+            self.pod_strings = strings
+            self._live_strings = len(strings)
+
+    def _collect_pod_status(self) -> Tuple[Dict[str, Any], Optional[PodTable]]:
+        """Pod status plus the PodTable built from the same listing, if one was"""
+        previous = self.pod_tables[-1] if self.pod_tables else None
+        pod_status = self.get_gke_pod_status()
+        table = self.pod_tables[-1] if self.pod_tables else None
+        return pod_status, table if table is not previous else None
+
+    def pod_changes(self) -> Dict[str, Any]:
+        """Pods added, removed and changed between the last two collections"""
+        if len(self.pod_tables) < 2:
+            return {}
+        return self.pod_tables[-1].diff(self.pod_tables[-2])
+
+    def estimate_gke_costs(self, cluster_status: Optional[Dict[str, Any]] = None,
+                           pod_status: Optional[Dict[str, Any]] = None
+                           ) -> Dict[str, float]:
         """Estimate current GKE costs based on resource usage"""
         try:
-            cluster_status = self.get_gke_cluster_status()
-            pod_status = self.get_gke_pod_status()
+            if cluster_status is None:
+                cluster_status = self.get_gke_cluster_status()
+            if pod_status is None:
+                pod_status = self.get_gke_pod_status()
             
             if not cluster_status or not pod_status:
                 return {}
             
-            # Cost estimates (approximate GCP pricing)
-            node_count = cluster_status.get("node_count", 0)
-            machine_type = cluster_status.get("machine_type", "e2-micro")
-            preemptible = cluster_status.get("preemptible", False)
-            
-            # Machine type costs per month (approximate)
-            machine_costs = {
-                "e2-micro": 4.50,      # $4.50/month
-                "e2-small": 9.00,      # $9.00/month
-                "e2-medium": 18.00,    # $18.00/month
-                "e2-standard-2": 36.00, # $36.00/month
-            }
-            
-            # Get base cost for machine type
-            base_cost = machine_costs.get(machine_type, 4.50)
-            
-            # Apply preemptible discount (50% off)
-            if preemptible:
-                base_cost *= 0.5
-            
-            # Calculate daily cost
-            daily_cost = (base_cost * node_count) / 30
-            
-            # Add storage costs (approximate)
-            disk_size_gb = cluster_status.get("disk_size_gb", 20)
-            storage_cost_per_gb_month = 0.08  # $0.08/GB/month
-            daily_storage_cost = (disk_size_gb * storage_cost_per_gb_month) / 30
-            
-            # Add network costs (approximate)
-            daily_network_cost = 0.10  # $0.10/day base network cost
-            
-            total_daily_cost = daily_cost + daily_storage_cost + daily_network_cost
-            
-            return {
-                "daily_cost": round(total_daily_cost, 2),
-                "weekly_cost": round(total_daily_cost * 7, 2),
-                "monthly_cost": round(total_daily_cost * 30, 2),
-                "node_cost": round(daily_cost, 2),
-                "storage_cost": round(daily_storage_cost, 2),
-                "network_cost": round(daily_network_cost, 2),
-                "preemptible_savings": "50%" if preemptible else "0%"
-            }
+            return node_pool_costs(
+                cluster_status.get("machine_type", "e2-micro"),
+                cluster_status.get("node_count", 0),
+                cluster_status.get("preemptible", False),
+                cluster_status.get("disk_size_gb", 20))
         except Exception as e:
             print(f"❌ Failed to estimate costs: {e}")
             return {}
 
-    def check_cost_thresholds(self) -> Dict[str, Any]:
+    def check_cost_thresholds(self, costs: Optional[Dict[str, Any]] = None
+                              ) -> Dict[str, Any]:
         """Check if current costs exceed thresholds"""
-        costs = self.estimate_gke_costs()
+        if costs is None:
+            costs = self.estimate_gke_costs()
         if not costs:
             return {"error": "Could not estimate costs"}
         
-        current_phase = self.current_phase
-        thresholds = self.cost_thresholds.get(current_phase, {})
+        # One read of the config keeps phase and thresholds consistent
+        current_phase, all_thresholds = self._config
+        thresholds = all_thresholds.get(current_phase, {})
         
         alerts = []
         warnings = []
@@ -279,21 +1287,40 @@ class GKECostMonitor:
             "status": "critical" if alerts else "warning" if warnings else "healthy"
         }
 
-    def get_cost_optimization_recommendations(self) -> List[str]:
+    def get_cost_optimization_recommendations(
+            self, cluster_status: Optional[Dict[str, Any]] = None,
+            pod_status: Optional[Dict[str, Any]] = None,
+            pod_table: Optional[PodTable] = None) -> List[str]:
         """Get recommendations for cost optimization"""
         recommendations = []
         
-        cluster_status = self.get_gke_cluster_status()
-        pod_status = self.get_gke_pod_status()
+        if cluster_status is None:
+            cluster_status = self.get_gke_cluster_status()
+        if pod_status is None:
+            pod_status, pod_table = self._collect_pod_status()
         
         if not cluster_status or not pod_status:
             return ["Unable to analyze cluster status"]
         
-        # Check machine type
+        # Check machine type against a packing of the current workloads
         machine_type = cluster_status.get("machine_type", "")
-        if machine_type != "e2-micro":
-            recommendations.append( \
-    "💡 Consider using e2-micro machine type for development (cheaper)")
+        preemptible = cluster_status.get("preemptible", False)
+        current_pool_cost = (MACHINE_TYPES.get(machine_type, {}).get("monthly_cost", 0)
+                             * cluster_status.get("node_count", 0)
+                             * (0.5 if preemptible else 1))
+        best_pool = None
+        if pod_table is not None:
+            # Pack the pods of the collection pod_status came from
+            from gke_binpacking import simulate_node_pools, split_table_requests
+            best_pool = simulate_node_pools(*split_table_requests(pod_table),
+                                            preemptible=preemptible)["best"]
+
+        if best_pool and best_pool["monthly_cost"] < current_pool_cost:
+            recommendations.append(
+                f"💡 {best_pool['node_count']} x {best_pool['machine_type']} nodes "
+                f"would fit current workloads for "
+                f"${best_pool['monthly_cost']:.2f}/month "
+                f"(now ${current_pool_cost:.2f}/month)")
         
         # Check preemptible instances
         if not cluster_status.get("preemptible", False):
@@ -325,17 +1352,87 @@ class GKECostMonitor:
         
         return recommendations
 
-    def generate_cost_report(self) -> str:
+    def take_snapshot(self, version: int = 0) -> MonitorSnapshot:
+        """Collect cluster state once and derive every analysis from it"""
+        taken_at = time.time()
+        cluster_status = self.get_gke_cluster_status()
+        pod_status, pod_table = self._collect_pod_status()
+        costs = self.estimate_gke_costs(cluster_status, pod_status)
+        threshold_check = self.check_cost_thresholds(costs)
+        recommendations = self.get_cost_optimization_recommendations(
+            cluster_status, pod_status, pod_table)
+
+        phase, all_thresholds = self._config
+        phase = threshold_check.get("current_phase", phase)
+        return MonitorSnapshot(
+            version=version,
+            taken_at=taken_at,
+            phase=phase,
+            thresholds=freeze(threshold_check.get("thresholds",
+                                                  all_thresholds.get(phase, {}))),
+            cluster_status=freeze(cluster_status),
+            pod_status=freeze(pod_status),
+            costs=freeze(costs),
+            threshold_check=freeze(threshold_check),
+            recommendations=tuple(recommendations),
+            cost_attribution=freeze(attribute_costs(pod_status)),
+            pod_changes=freeze(self.pod_changes()),
+        )
+
+    def generate_cost_report(self, snapshot: Optional[MonitorSnapshot] = None) -> str:
         """Generate comprehensive cost report"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
         # Get all cost information
-        cluster_status = self.get_gke_cluster_status()
-        pod_status = self.get_gke_pod_status()
-        costs = self.estimate_gke_costs()
-        threshold_check = self.check_cost_thresholds()
-        recommendations = self.get_cost_optimization_recommendations()
+        if snapshot is None:
+            snapshot = self.take_snapshot()
+        taken_at = datetime.fromtimestamp(snapshot.taken_at)
+        timestamp = taken_at.strftime("%Y-%m-%d %H:%M:%S")
+        cluster_status = snapshot.cluster_status
+        pod_status = snapshot.pod_status
+        costs = snapshot.costs
+        threshold_check = snapshot.threshold_check
+        recommendations = snapshot.recommendations
         
+        namespace_rows = "".join(
+            f"- **{namespace}**: {entry['pods']} pods, "
+            f"CPU {entry['cpu_usage_millicores']:.0f}m/"
+            f"{entry['cpu_requests_millicores']:.0f}m "
+            f"({entry['cpu_utilization_percent']:.1f}%), "
+            f"memory {entry['memory_usage_mi']:.0f}Mi/"
+            f"{entry['memory_requests_mi']:.0f}Mi "
+            f"({entry['memory_utilization_percent']:.1f}%)\n"
+            for namespace, entry in pod_status.get("by_namespace", {}).items()
+        ) or "- No pods found\n"
+
+        pool_rows = "".join(
+            f"- **{name}** ({', '.join(pool['machine_types'])} x{pool['nodes']}): "
+            f"allocation score {pool['allocation_score']:.1f}%, "
+            f"usage score {pool['usage_score']:.1f}%, "
+            f"stranded ~${pool['stranded_monthly_cost']:.2f}/month, "
+            f"{pool['hot_nodes']} hot node(s)\n"
+            for name, pool in pod_status.get("by_pool", {}).items()
+        ) or "- No nodes found\n"
+        if pod_status.get("hot_nodes"):
+            pool_rows += f"- 🔥 Hot nodes: {', '.join(pod_status['hot_nodes'])}\n"
+
+        changes = snapshot.pod_changes
+        change_rows = "".join(
+            f"- **{namespace}**: CPU requests {delta:+.0f}m\n"
+            for namespace, delta in changes.get(
+                "cpu_requests_delta_millicores", {}).items())
+        change_rows += "".join(
+            f"- **{namespace}**: memory requests {delta:+.0f}Mi\n"
+            for namespace, delta in changes.get("memory_requests_delta_mi", {}).items())
+        if changes:
+            change_rows = (f"- {len(changes['added'])} added, "
+                           f"{len(changes['removed'])} removed, "
+                           f"{len(changes['changed'])} changed since the last "
+                           f"collection\n") + change_rows
+        else:
+            change_rows = "- No earlier collection to compare\n"
+
+        def percent(name: str) -> str:
+            return f"{pod_status.get(name + '_percent', 0):.1f}"
+
         # Generate report
         report = f"""# 💰 GKE Cost Report
 Generated: {timestamp}
@@ -344,7 +1441,7 @@ Generated: {timestamp}
 - **Project ID**: {self.project_id}
 - **Billing Account**: {self.billing_account}
 - **Cluster Name**: {self.cluster_name}
-- **Current Phase**: {self.current_phase}
+- **Current Phase**: {snapshot.phase}
 
 ## 🏗️ Cluster Status
 - **Status**: {cluster_status.get('status', 'Unknown')}
@@ -358,9 +1455,18 @@ Generated: {timestamp}
 - **Running Pods**: {pod_status.get('running_pods', 0)}
 - **Pending Pods**: {pod_status.get('pending_pods', 0)}
 - **Failed Pods**: {pod_status.get('failed_pods', 0)}
-- **CPU Utilization**: {pod_status.get('cpu_utilization_percent', 0):.1f}%
-- **Memory Utilization**: {pod_status.get('memory_utilization_percent', 0):.1f}%
+- **CPU Utilization**: {percent('cpu_utilization')}% of requests
+- **Memory Utilization**: {percent('memory_utilization')}% of requests
+- **CPU Allocated**: {percent('cpu_allocated')}% of node allocatable
+- **Memory Allocated**: {percent('memory_allocated')}% of node allocatable
+- **Pods Without Metrics**: {pod_status.get('pods_without_metrics', 0)}
 
+## 📦 Utilization by Namespace
+{namespace_rows}
+## 🖥️ Node Pools
+{pool_rows}
+## 🔄 Pod Changes
+{change_rows}
 ## 💰 Cost Analysis
 - **Daily Cost**: ${costs.get('daily_cost', 0):.2f}
 - **Weekly Cost**: ${costs.get('weekly_cost', 0):.2f}
@@ -403,7 +1509,7 @@ Generated: {timestamp}
         report += f"""
 ---
 **Report Status**: {threshold_check.get('status', 'Unknown').upper()}
-**Budget Status**: {'✅ Within Budget' if threshold_check.get( \
+**Budget Status**: {'✅ Within Budget' if threshold_check.get(
     'within_budget') else '❌ Over Budget'}
 **Generated**: {timestamp}
 """
@@ -474,15 +1580,21 @@ Generated: {timestamp}
         """Run continuous cost monitoring"""
         print(f"💰 Starting GKE cost monitoring (checking every {interval_minutes} minutes)")
         print(f"📊 Current phase: {self.current_phase}")
-        
+
+        detector = CostAnomalyDetector()
+        alerts = AlertManager()
+        history = CostHistory(self.data_dir / "cost_history.db")
+
         try:
             while True:
-                # Generate and save report
-                report = self.generate_cost_report()
+                # Collect once, then report and check from the same snapshot
+                snapshot = self.take_snapshot()
+                report = self.generate_cost_report(snapshot)
                 self.save_cost_report(report)
+                history.record(snapshot)
                 
                 # Check thresholds
-                threshold_check = self.check_cost_thresholds()
+                threshold_check = snapshot.threshold_check
                 
                 # Display status
                 status_emoji = {
@@ -497,12 +1609,32 @@ Generated: {timestamp}
                 print(f"{emoji} Cost Status: {status.upper()}")
                 print(f"💰 Daily Cost: ${threshold_check.get('costs', {}).get('daily_cost', 0):.2f}")
                 
-                # Show alerts
-                for alert in threshold_check.get("alerts", []):
-                    print(f"  {alert}")
-                
-                # Emergency control if critical
-                if status == "critical":
+                # Update alert state; only changes are notified
+                changes = alerts.evaluate_thresholds(
+                    threshold_check.get("costs", {}),
+                    threshold_check.get("thresholds", {}),
+                    threshold_check.get("current_phase", self.current_phase))
+
+                # Check attributed cost series for sudden spikes
+                samples = dict(snapshot.cost_attribution)
+                samples["cluster"] = threshold_check.get("costs", {}).get(
+                    "daily_cost", 0)
+                detector.retain(samples)
+                for anomaly in detector.update_many(samples):
+                    alerts.record_event(
+                        "cost_spike", {"series": anomaly["series"]}, "warning",
+                        f"Cost spike in {anomaly['series']}: "
+                        f"${anomaly['value']:.2f}/day "
+                        f"vs ${anomaly['baseline']:.2f}/day baseline")
+                alerts.expire_events()
+                alerts.flush(force=True)
+
+                # Emergency control when costs newly turn critical (not if silenced)
+                newly_critical = any(
+                    c["state"] == "firing" and c["severity"] == "critical"
+                    and not c["repeat"] and c.get("state_shown") != "silenced"
+                    for c in changes)
+                if newly_critical:
                     print("🚨 CRITICAL COSTS DETECTED!")
                     response = input("Activate emergency cost control? (y/N): ")
                     if response.lower() == 'y':
@@ -517,6 +1649,101 @@ Generated: {timestamp}
             print(f"❌ Cost monitoring failed: {e}")
 
 
+class SnapshotRefresher:
+    """Refresh monitor snapshots in one background thread for any number of readers
+
+    Only the refresher thread talks to the cluster. Each pass builds a new
+    immutable MonitorSnapshot and publishes it by replacing a single
+    reference, so readers (threads or coroutines) call latest() without
+    locks and always get a complete, consistent snapshot.
+    """
+
+    def __init__(self, monitor: GKECostMonitor, interval_seconds: float = 60.0):
+        """Initialize the refresher for a monitor"""
+        self.monitor = monitor
+        self.interval_seconds = interval_seconds
+        self.last_error: Optional[str] = None
+
+        self._snapshot: Optional[MonitorSnapshot] = None
+        self._listeners: Tuple[Callable[[MonitorSnapshot], None], ...] = ()
+        self._refresh_lock = threading.Lock()   # One collection at a time
+        self._published = threading.Condition()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def latest(self) -> Optional[MonitorSnapshot]:
+        """Most recently published snapshot, or None before the first pass"""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        """Version of the latest snapshot (0 before the first pass)"""
+        snapshot = self._snapshot
+        return snapshot.version if snapshot else 0
+
+    def subscribe(self, listener: Callable[[MonitorSnapshot], None]) -> None:
+        """Call listener with every newly published snapshot"""
+        self._listeners = self._listeners + (listener,)
+
+    def refresh(self) -> Optional[MonitorSnapshot]:
+        """Collect and publish one snapshot now; keeps the previous one on failure"""
+        with self._refresh_lock:
+            try:
+                snapshot = self.monitor.take_snapshot(self.version + 1)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"❌ Snapshot refresh failed: {e}")
+                return None
+
+            self.last_error = None
+            self._snapshot = snapshot    # The atomic swap readers rely on
+            with self._published:
+                self._published.notify_all()
+
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print(f"⚠️ Snapshot listener failed: {e}")
+        return snapshot
+
+    def wait_for(self, version: int, timeout: Optional[float] = None
+                 ) -> Optional[MonitorSnapshot]:
+        """Block until a snapshot newer than version exists (for callers that wait)"""
+        with self._published:
+            self._published.wait_for(lambda: self.version > version, timeout)
+        return self._snapshot
+
+    def request_refresh(self) -> None:
+        """Ask the background thread to refresh before its next interval"""
+        self._wake.set()
+
+    def _run(self) -> None:
+        """Refresher loop"""
+        while not self._stop.is_set():
+            self.refresh()
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
+
+    def start(self) -> "SnapshotRefresher":
+        """Start the background refresher thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="gke-cost-snapshot", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the refresher thread after its current pass"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
 def main():
     """Main function for GKE cost monitoring"""
     print("💰 GKE Cost Monitor")
@@ -538,15 +1765,16 @@ def main():
     
     # Generate initial report
     print("📊 Generating initial cost report...")
-    report = monitor.generate_cost_report()
+    snapshot = monitor.take_snapshot()
+    report = monitor.generate_cost_report(snapshot)
     monitor.save_cost_report(report)
     
     # Check current status
-    threshold_check = monitor.check_cost_thresholds()
+    threshold_check = snapshot.threshold_check
     print(f"💰 Current cost status: {threshold_check.get('status', 'Unknown').upper()}")
     
     # Show recommendations
-    recommendations = monitor.get_cost_optimization_recommendations()
+    recommendations = snapshot.recommendations
     print("\n💡 Cost optimization recommendations:")
     for rec in recommendations:
         print(f"  {rec}")
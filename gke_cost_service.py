@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+🌐 GKE Cost Service
+
+HTTP API over the cost monitor. A SnapshotRefresher is the only component
+that queries the cluster; each published snapshot is serialized once into
+JSON and gzip bytes with a content ETag, and request handlers only look up
+those cached responses. Polling clients that send If-None-Match get a 304.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import time
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from gke_cost_history import CostHistory
+from gke_cost_monitor import GKECostMonitor, MonitorSnapshot, SnapshotRefresher
+
+DEFAULT_HISTORY_HOURS = 24
+GZIP_MIN_BYTES = 512    # Smaller bodies are not worth compressing
+
+
+class CachedResponse(NamedTuple):
+    """Pre-serialized response body"""
+
+    body: bytes
+    gzip_body: Optional[bytes]
+    etag: str
+
+
+def encode_response(payload: Any) -> CachedResponse:
+    """Serialize a payload once to JSON, gzip and a content ETag"""
+    body = json.dumps(payload, separators=(",", ":"), sort_keys=True,
+                      default=str).encode()
+    etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+    gzip_body = (gzip.compress(body, compresslevel=6)
+                 if len(body) >= GZIP_MIN_BYTES else None)
+    return CachedResponse(body, gzip_body, etag)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def build_payloads(snapshot: MonitorSnapshot,
+                   history: Optional[CostHistory] = None) -> Dict[str, Any]:
+    """Endpoint payloads for one snapshot"""
+    data = snapshot.to_dict()
+    meta = {"version": snapshot.version, "taken_at": snapshot.taken_at,
+            "phase": snapshot.phase}
+    check = data["threshold_check"]
+
+    payloads = {
+        "snapshot": data,
+        "costs": dict(meta, costs=data["costs"],
+                      cost_attribution=data["cost_attribution"]),
+        "thresholds": dict(meta, thresholds=data["thresholds"],
+                           status=check.get("status", "unknown"),
+                           within_budget=check.get("within_budget"),
+                           alerts=check.get("alerts", []),
+                           warnings=check.get("warnings", [])),
+        "recommendations": dict(meta, recommendations=data["recommendations"]),
+    }
+    if history is not None:
+        payloads["history"] = dict(
+            meta, hours=DEFAULT_HISTORY_HOURS,
+            samples=history.samples(DEFAULT_HISTORY_HOURS, now=snapshot.taken_at))
+    return payloads
+
+
+class ResponseCache:
+    """Cached responses of the latest snapshot, replaced as a whole on publish"""
+
+    def __init__(self, history: Optional[CostHistory] = None):
+        """Initialize an empty cache"""
+        self.history = history
+        self._entries: Dict[str, CachedResponse] = {}
+        self.version = 0
+
+    def publish(self, snapshot: MonitorSnapshot) -> None:
+        """Record a snapshot in history and rebuild every cached response"""
+        if self.history is not None:
+            self.history.record(snapshot)
+        entries = {name: encode_response(payload)
+                   for name, payload in build_payloads(snapshot, self.history).items()}
+        self._entries = entries     # Swap the whole map; handlers never see a mix
+        self.version = snapshot.version
+
+    def get(self, name: str) -> Optional[CachedResponse]:
+        """Cached response of an endpoint, or None before the first snapshot"""
+        return self._entries.get(name)
+
+
+def render(cached: CachedResponse, if_none_match: Optional[str],
+           accept_encoding: Optional[str]) -> Tuple[int, bytes, Dict[str, str]]:
+    """Status, body and headers for a cached response"""
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache",
+               "Vary": "Accept-Encoding"}
+    if etag_matches(if_none_match, cached.etag):
+        return 304, b"", headers
+    if cached.gzip_body is not None and "gzip" in (accept_encoding or ""):
+        headers["Content-Encoding"] = "gzip"
+        return 200, cached.gzip_body, headers
+    return 200, cached.body, headers
+
+
+def create_app(monitor: Optional[GKECostMonitor] = None,
+               interval_seconds: float = 60.0,
+               history: Optional[CostHistory] = None):
+    """Build the FastAPI application and its background refresher"""
+    from contextlib import asynccontextmanager
+
+    from fastapi import FastAPI, Query, Request, Response
+
+    monitor = monitor or GKECostMonitor()
+    history = history or CostHistory(monitor.data_dir / "cost_history.db")
+    refresher = SnapshotRefresher(monitor, interval_seconds)
+    cache = ResponseCache(history)
+    refresher.subscribe(cache.publish)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        refresher.start()
+        yield
+        refresher.stop(timeout=5)
+
+    app = FastAPI(title="GKE Cost Service", lifespan=lifespan)
+    app.state.refresher = refresher
+    app.state.cache = cache
+    history_windows: Dict[Tuple[int, float], CachedResponse] = {}
+
+    def send(cached: Optional[CachedResponse], request: Request) -> Response:
+        if cached is None:
+            return Response(
+                content=json.dumps({"error": "No snapshot collected yet"}),
+                status_code=503, media_type="application/json",
+                headers={"Retry-After": "5"})
+        status, body, headers = render(
+            cached, request.headers.get("if-none-match"),
+            request.headers.get("accept-encoding"))
+        return Response(content=body, status_code=status,
+                        media_type="application/json" if status == 200 else None,
+                        headers=headers)
+
+    def respond(name: str, request: Request) -> Response:
+        return send(cache.get(name), request)
+
+    @app.get("/snapshot")
+    async def snapshot(request: Request):
+        return respond("snapshot", request)
+
+    @app.get("/costs")
+    async def costs(request: Request):
+        return respond("costs", request)
+
+    @app.get("/thresholds")
+    async def thresholds(request: Request):
+        return respond("thresholds", request)
+
+    @app.get("/recommendations")
+    async def recommendations(request: Request):
+        return respond("recommendations", request)
+
+    # A plain def: FastAPI runs it in its threadpool, so the SQLite read for
+    # a non-default window never blocks the event loop
+    @app.get("/history")
+    def cost_history(request: Request,
+                     hours: float = Query(DEFAULT_HISTORY_HOURS, gt=0, le=24 * 90)):
+        if hours == DEFAULT_HISTORY_HOURS:
+            return respond("history", request)
+        # Other windows read the local store once per snapshot, never the cluster
+        latest = refresher.latest()
+        if latest is None:
+            return send(None, request)
+        key = (latest.version, hours)
+        cached = history_windows.get(key)
+        if cached is None:
+            if len(history_windows) > 32:
+                history_windows.clear()
+            cached = history_windows[key] = encode_response(
+                {"version": latest.version, "taken_at": latest.taken_at,
+                 "phase": latest.phase, "hours": hours,
+                 "samples": history.samples(hours, now=latest.taken_at)})
+        return send(cached, request)
+
+    @app.get("/healthz")
+    async def healthz():
+        latest = refresher.latest()
+        return {"version": refresher.version,
+                "age_seconds": (round(time.time() - latest.taken_at, 1)
+                                if latest else None),
+                "last_error": refresher.last_error}
+
+    return app
+
+
+def main():
+    """Run the cost service with uvicorn"""
+    parser = argparse.ArgumentParser(description="Serve GKE cost data over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--interval", type=float, default=60.0,
+                        help="Seconds between cluster snapshots")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    print(f"🌐 Serving GKE cost data on http://{args.host}:{args.port} "
+          f"(refresh every {args.interval:.0f}s)")
+    uvicorn.run(create_app(interval_seconds=args.interval),
+                host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
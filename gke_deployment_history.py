@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+📜 GKE Deployment History
+
+Append-only SQLite log of per-service status transitions (Pending,
+Running, Mixed, Absent), recorded from each deployment_state update. Only
+changes are appended. Every CHECKPOINT_EVERY transitions the full state
+is folded into a checkpoint, so "state of all services at T" replays at
+most that many rows after the nearest checkpoint. A (service, at) index
+answers per-service questions such as "how long was quality-agent
+unavailable this week" from that service's rows alone. Compaction drops
+transitions older than the retention window once a checkpoint covers
+them.
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from gke_model_registry import REGISTRY_PATH
+
+# Logged next to the registry whose deployment_state it follows
+DEFAULT_HISTORY_PATH = REGISTRY_PATH.with_name("deployment_history.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transitions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    at REAL NOT NULL,
+    service TEXT NOT NULL,
+    status TEXT NOT NULL,
+    ready_pods INTEGER,
+    total_pods INTEGER
+);
+CREATE INDEX IF NOT EXISTS transitions_service_at ON transitions (service, at);
+CREATE INDEX IF NOT EXISTS transitions_at ON transitions (at);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    at REAL NOT NULL,
+    last_transition INTEGER NOT NULL,
+    state TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS checkpoints_at ON checkpoints (at);
+"""
+
+CHECKPOINT_EVERY = 200
+DEFAULT_RETENTION_DAYS = 90.0
+
+# A service that disappeared from the cluster
+ABSENT = "Absent"
+# Statuses with no ready pods
+UNAVAILABLE_STATUSES = ("Pending", ABSENT)
+
+TRANSITION_COLUMNS = ("at", "service", "status", "ready_pods", "total_pods")
+
+
+def service_key(service: Dict[str, Any]) -> str:
+    """Log key of a deployment_state service entry: namespace/name"""
+    return f"{service.get('namespace')}/{service.get('name')}"
+
+
+class DeploymentHistory:
+    """Append-only service transition log backed by SQLite"""
+
+    def __init__(self, path: Optional[Path] = None,
+                 checkpoint_every: int = CHECKPOINT_EVERY,
+                 retention_days: Optional[float] = DEFAULT_RETENTION_DAYS):
+        """Open (and create if needed) the history database"""
+        self.path = Path(path) if path else DEFAULT_HISTORY_PATH
+        self.checkpoint_every = checkpoint_every
+        self.retention_days = retention_days
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Short-lived connection in one transaction (WAL: reads run during writes)"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _checkpoint_before(conn: sqlite3.Connection,
+                           at: float) -> Tuple[int, Dict[str, List[Any]]]:
+        """Newest checkpoint <= at: last transition id, {service: [status, since]}"""
+        row = conn.execute(
+            "SELECT last_transition, state FROM checkpoints WHERE at <= ? "
+            "ORDER BY at DESC, id DESC LIMIT 1", (at,)).fetchone()
+        return (row[0], json.loads(row[1])) if row else (0, {})
+
+    def _state_at(self, conn: sqlite3.Connection,
+                  at: float) -> Tuple[int, Dict[str, List[Any]]]:
+        """Newest checkpoint before at, replayed forward to at"""
+        last_id, state = self._checkpoint_before(conn, at)
+        for row_id, when, service, status in conn.execute(
+                "SELECT id, at, service, status FROM transitions "
+                "WHERE id > ? AND at <= ? ORDER BY id", (last_id, at)):
+            state[service] = [status, when]
+            last_id = row_id
+        return last_id, state
+
+    def state_at(self, at: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Status of every service present at time at, with when it took that status"""
+        at = time.time() if at is None else at
+        with self._connect() as conn:
+            _, state = self._state_at(conn, at)
+        return {service: {"status": status, "since": since}
+                for service, (status, since) in sorted(state.items())
+                if status != ABSENT}
+
+    def status_at(self, service: str, at: Optional[float] = None) -> Optional[str]:
+        """Status of one service at time at (None when it was never seen)"""
+        at = time.time() if at is None else at
+        with self._connect() as conn:
+            return self._status_at(conn, service, at)
+
+    def _status_at(self, conn: sqlite3.Connection, service: str,
+                   at: float) -> Optional[str]:
+        """Index lookup of a service's last transition at or before at"""
+        row = conn.execute(
+            "SELECT status FROM transitions WHERE service = ? AND at <= ? "
+            "ORDER BY at DESC, id DESC LIMIT 1", (service, at)).fetchone()
+        if row:
+            return row[0]
+        # Compacted away: the checkpoint covering that time still has it
+        _, state = self._checkpoint_before(conn, at)
+        return state[service][0] if service in state else None
+
+    def record(self, deployment_state: Dict[str, Any], at: Optional[float] = None,
+               scope: Optional[str] = None) -> int:
+        """Append the status changes of one deployment_state; returns how many
+
+        With a scope (a cluster name) services are logged as scope/namespace/name
+        and only that scope's services can become Absent.
+        """
+        at = time.time() if at is None else at
+        prefix = f"{scope}/" if scope else ""
+        services = {prefix + service_key(s): s
+                    for s in (deployment_state.get("deployed_services", [])
+                              + deployment_state.get("system_services", []))}
+        with self._connect() as conn:
+            _, state = self._state_at(conn, at)
+            if prefix:
+                state = {key: value for key, value in state.items()
+                         if key.startswith(prefix)}
+            rows = [(at, key, s.get("status", "Unknown"), s.get("ready_pods"),
+                     s.get("total_pods"))
+                    for key, s in sorted(services.items())
+                    if state.get(key, [None])[0] != s.get("status", "Unknown")]
+            rows += [(at, key, ABSENT, 0, 0)
+                     for key, (status, _) in sorted(state.items())
+                     if key not in services and status != ABSENT]
+            conn.executemany(
+                f"INSERT INTO transitions ({', '.join(TRANSITION_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(TRANSITION_COLUMNS))})", rows)
+
+            last_checkpoint = conn.execute(
+                "SELECT COALESCE(MAX(last_transition), 0) FROM checkpoints"
+            ).fetchone()[0]
+            pending = conn.execute("SELECT COUNT(*) FROM transitions WHERE id > ?",
+                                   (last_checkpoint,)).fetchone()[0]
+            if pending >= self.checkpoint_every:
+                self._checkpoint(conn, at)
+                if self.retention_days is not None:
+                    self._compact(conn, at - self.retention_days * 86400)
+        return len(rows)
+
+    def _checkpoint(self, conn: sqlite3.Connection, at: float) -> None:
+        """Fold the log up to at into a checkpoint row"""
+        last_id, state = self._state_at(conn, at)
+        conn.execute(
+            "INSERT INTO checkpoints (at, last_transition, state) VALUES (?, ?, ?)",
+            (at, last_id, json.dumps(state, sort_keys=True)))
+
+    def checkpoint(self, at: Optional[float] = None) -> None:
+        """Write a checkpoint of the state at time at"""
+        with self._connect() as conn:
+            self._checkpoint(conn, time.time() if at is None else at)
+
+    def _compact(self, conn: sqlite3.Connection, before: float) -> int:
+        """Drop transitions before a checkpoint at before, and older checkpoints"""
+        if conn.execute("SELECT COUNT(*) FROM transitions WHERE at < ?",
+                        (before,)).fetchone()[0] == 0:
+            return 0
+        self._checkpoint(conn, before)
+        last_id = conn.execute(
+            "SELECT MAX(last_transition) FROM checkpoints WHERE at = ?",
+            (before,)).fetchone()[0]
+        dropped = conn.execute("DELETE FROM transitions WHERE id <= ?",
+                               (last_id,)).rowcount
+        conn.execute("DELETE FROM checkpoints WHERE at < ?", (before,))
+        return dropped
+
+    def compact(self, before: float) -> int:
+        """Fold transitions older than before into a checkpoint; returns rows dropped"""
+        with self._connect() as conn:
+            return self._compact(conn, before)
+
+    def transitions(self, service: Optional[str] = None, since: float = 0,
+                    until: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Logged transitions in [since, until], of one service or all"""
+        until = time.time() if until is None else until
+        query = (f"SELECT {', '.join(TRANSITION_COLUMNS)} FROM transitions "
+                 "WHERE at >= ? AND at <= ?")
+        params: Tuple[Any, ...] = (since, until)
+        if service is not None:
+            query += " AND service = ?"
+            params += (service,)
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY at, id", params).fetchall()
+        return [dict(zip(TRANSITION_COLUMNS, row)) for row in rows]
+
+    def unavailable_seconds(self, service: str, since: float,
+                            until: Optional[float] = None,
+                            unavailable: Iterable[str] = UNAVAILABLE_STATUSES
+                            ) -> float:
+        """Seconds in [since, until] the service spent in an unavailable status"""
+        until = time.time() if until is None else until
+        unavailable = set(unavailable)
+        with self._connect() as conn:
+            status = self._status_at(conn, service, since)
+            changes = conn.execute(
+                "SELECT at, status FROM transitions "
+                "WHERE service = ? AND at > ? AND at <= ? "
+                "ORDER BY at, id", (service, since, until)).fetchall()
+        total, start = 0.0, since
+        for when, next_status in changes + [(until, None)]:
+            if status in unavailable:
+                total += when - start
+            start, status = when, next_status
+        return total
+
+
+def _parse_time(value: str) -> float:
+    """Epoch seconds from an ISO timestamp or a number"""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Query the deployment transition log")
+    parser.add_argument("--db", type=Path, default=DEFAULT_HISTORY_PATH)
+    parser.add_argument("--at", help="Show every service's state at this time")
+    parser.add_argument("--cluster", help="Cluster the services were recorded under")
+    parser.add_argument("--service", help="namespace/name of one service in --cluster")
+    parser.add_argument("--days", type=float, default=7.0,
+                        help="Window for the service's downtime and transitions")
+    args = parser.parse_args()
+
+    if args.service and not args.cluster:
+        print("❌ --service needs --cluster: services are logged as "
+              "cluster/namespace/name")
+        return 1
+    if not args.db.exists():
+        print(f"❌ No deployment history at {args.db}")
+        return 1
+    history = DeploymentHistory(args.db)
+
+    if args.service:
+        key = f"{args.cluster}/{args.service}"
+        now = time.time()
+        since = now - args.days * 86400
+        down = history.unavailable_seconds(key, since, now)
+        print(f"📜 {key}: unavailable {down / 3600:.2f}h "
+              f"in the last {args.days:g} days")
+        for row in history.transitions(key, since, now):
+            when = datetime.fromtimestamp(row["at"]).isoformat(timespec="seconds")
+            print(f"   {when} {row['status']} "
+                  f"({row['ready_pods']}/{row['total_pods']})")
+        return 0
+
+    at = _parse_time(args.at) if args.at else None
+    prefix = f"{args.cluster}/" if args.cluster else ""
+    for service, entry in history.state_at(at).items():
+        if not service.startswith(prefix):
+            continue
+        since = datetime.fromtimestamp(entry["since"]).isoformat(timespec="seconds")
+        print(f"   {service}: {entry['status']} since {since}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+☸️ Paginated Kubernetes Listing
+
+Chunked list calls through `kubectl get --raw` with limit/continue. Pages
+are handed to the caller as they arrive, so no single response holds the
+whole cluster. All pages of one list share the resourceVersion of the
+first page; when the API server expires a continue token (HTTP 410) or a
+page comes from a different resourceVersion, the list restarts from the
+beginning and the consumer starts over, so results are never a mix of
+two cluster states.
+
+Callers can ask for server-side trimmed responses (Table rows or
+metadata-only objects) with an Accept header. kubectl --raw cannot send
+one, so those requests go through the kubernetes client when it is
+installed and configured; otherwise they fall back to kubectl and full
+objects, and field selectors and namespace scoping still apply.
+
+Calls go to the cluster of the kubeconfig selected with use_kubeconfig()
+in the current context (thread or task), falling back to $KUBECONFIG, so
+several clusters can be read concurrently from one process.
+
+Long-running callers list once and then watch from the listing's
+resourceVersion, resuming from the last version seen when the server
+closes the stream and listing again when that version has expired.
+"""
+
+import json
+import os
+import re
+import subprocess
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+from urllib.parse import parse_qsl, urlencode
+
+DEFAULT_PAGE_SIZE = 500
+MAX_LIST_RESTARTS = 3
+WATCH_TIMEOUT_SECONDS = 300
+
+PODS_PATH = "/api/v1/pods"
+NODES_PATH = "/api/v1/nodes"
+DEPLOYMENTS_PATH = "/apis/apps/v1/deployments"
+
+TABLE_ACCEPT = "application/json;as=Table;v=1;g=meta.k8s.io,application/json"
+METADATA_ACCEPT = ("application/json;as=PartialObjectMetadataList;v=1;g=meta.k8s.io,"
+                   "application/json")
+
+# kubectl's rendering of a 410 Status: its reason, its code, or the HTTP line
+_EXPIRED_ERROR = re.compile(
+    r'\((?:Expired|Gone)\)|"code":\s*410\b|\b410 Gone\b|too old resource version')
+
+# Bytes received from the API server, to measure what trimming saves; the
+# listing and node-filesystem pools update it from many threads
+transfer_stats = {"requests": 0, "bytes": 0}
+_transfer_lock = threading.Lock()
+
+# kubernetes ApiClient per kubeconfig; False when the client is unusable
+_api_clients: Dict[Optional[str], Any] = {}
+
+# Kubeconfig selected for the current context by use_kubeconfig()
+_kubeconfig: ContextVar[Optional[str]] = ContextVar("kubeconfig", default=None)
+
+T = TypeVar("T")
+
+
+class ListExpired(Exception):
+    """A paginated list can no longer be continued consistently"""
+
+
+class ListPage(NamedTuple):
+    """One chunk of a list response"""
+
+    items: List[Dict[str, Any]]
+    resource_version: Optional[str]
+    remaining: Optional[int]
+
+
+def namespaced_path(api: str, resource: str, namespace: Optional[str] = None) -> str:
+    """Collection path of a resource, scoped to a namespace when given"""
+    if namespace:
+        return f"{api}/namespaces/{namespace}/{resource}"
+    return f"{api}/{resource}"
+
+
+@contextmanager
+def use_kubeconfig(path: Optional[str]) -> Iterator[None]:
+    """Send the calls made in this context to the cluster of a kubeconfig file"""
+    token = _kubeconfig.set(str(path) if path else None)
+    try:
+        yield
+    finally:
+        _kubeconfig.reset(token)
+
+
+def current_kubeconfig() -> Optional[str]:
+    """Kubeconfig of the current context: use_kubeconfig()'s, else $KUBECONFIG"""
+    return _kubeconfig.get() or os.environ.get("KUBECONFIG")
+
+
+def kubectl_command(*args: str) -> List[str]:
+    """kubectl command line for the current context's kubeconfig"""
+    selected = _kubeconfig.get()
+    return ["kubectl"] + (["--kubeconfig", selected] if selected else []) + list(args)
+
+
+def _record_transfer(body: bytes) -> None:
+    """Count one response in transfer_stats"""
+    with _transfer_lock:
+        transfer_stats["requests"] += 1
+        transfer_stats["bytes"] += len(body)
+
+
+def _kubernetes_client() -> Optional[Any]:
+    """Configured kubernetes ApiClient, or None when it cannot be used"""
+    key = current_kubeconfig()
+    if key not in _api_clients:
+        try:
+            from kubernetes import client, config
+            if _kubeconfig.get():
+                _api_clients[key] = config.new_client_from_config(config_file=key)
+            else:
+                try:
+                    config.load_incluster_config()
+                except config.ConfigException:
+                    config.load_kube_config()
+                _api_clients[key] = client.ApiClient()
+        except Exception:
+            _api_clients[key] = False
+    return _api_clients[key] or None
+
+
+def supports_trimmed_responses() -> bool:
+    """Whether Accept-header requests (Table, metadata-only) can be made"""
+    return _kubernetes_client() is not None
+
+
+def _client_get(api_client: Any, path: str, accept: str) -> Dict[str, Any]:
+    """GET an API path through the kubernetes client with an Accept header"""
+    from kubernetes.client.rest import ApiException
+
+    resource_path, _, query = path.partition("?")
+    try:
+        response = api_client.call_api(
+            resource_path, "GET", query_params=parse_qsl(query),
+            header_params={"Accept": accept}, auth_settings=["BearerToken"],
+            _return_http_data_only=True, _preload_content=False)
+    except ApiException as e:
+        if e.status == 410:
+            raise ListExpired(str(e.reason)) from e
+        raise
+    body = response.data
+    _record_transfer(body)
+    return json.loads(body)
+
+
+def get_raw(path: str, accept: Optional[str] = None) -> Dict[str, Any]:
+    """GET an API path and parse the JSON response
+
+    With an Accept header the request goes through the kubernetes client
+    when available; otherwise through kubectl get --raw.
+    """
+    if accept:
+        api_client = _kubernetes_client()
+        if api_client is not None:
+            return _client_get(api_client, path, accept)
+
+    command = kubectl_command("get", "--raw", path)
+    result = subprocess.run(command, capture_output=True)
+    if result.returncode != 0:
+        stderr = result.stderr.decode(errors="replace")
+        if _EXPIRED_ERROR.search(stderr):
+            raise ListExpired(stderr.strip())
+        raise subprocess.CalledProcessError(
+            result.returncode, command, result.stdout, stderr)
+    _record_transfer(result.stdout)
+    return json.loads(result.stdout)
+
+
+def _page_items(response: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Items of a list response; Table rows become {"metadata", "columns"} dicts"""
+    if response.get("kind") != "Table":
+        return response.get("items", [])
+    names = [column["name"] for column in response.get("columnDefinitions", [])]
+    return [
+        {"metadata": (row.get("object") or {}).get("metadata", {}),
+         "columns": dict(zip(names, row.get("cells", [])))}
+        for row in response.get("rows", [])
+    ]
+
+
+def iter_list_pages(path: str, limit: int = DEFAULT_PAGE_SIZE,
+                    params: Optional[Dict[str, str]] = None,
+                    accept: Optional[str] = None) -> Iterator[ListPage]:
+    """Yield the pages of a list call until the server has no continue token"""
+    token = None
+    resource_version = None
+    while True:
+        query = dict(params or {}, limit=limit)
+        if token:
+            query["continue"] = token
+        response = get_raw(f"{path}?{urlencode(query)}", accept)
+        metadata = response.get("metadata", {})
+
+        page_version = metadata.get("resourceVersion")
+        if resource_version is None:
+            resource_version = page_version
+        elif page_version and page_version != resource_version:
+            raise ListExpired(
+                f"{path} moved from resourceVersion {resource_version} "
+                f"to {page_version}")
+
+        yield ListPage(_page_items(response), resource_version,
+                       metadata.get("remainingItemCount"))
+        token = metadata.get("continue")
+        if not token:
+            return
+
+
+def iter_list_items(path: str, limit: int = DEFAULT_PAGE_SIZE,
+                    params: Optional[Dict[str, str]] = None,
+                    accept: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yield the items of a list call page by page"""
+    for page in iter_list_pages(path, limit, params, accept):
+        yield from page.items
+
+
+def consume_list(path: str, consumer: Callable[[Iterator[Dict[str, Any]]], T],
+                 limit: int = DEFAULT_PAGE_SIZE,
+                 params: Optional[Dict[str, str]] = None,
+                 max_restarts: int = MAX_LIST_RESTARTS,
+                 accept: Optional[str] = None) -> T:
+    """Stream every item of a list into consumer and return its result
+
+    The consumer must build its result only from the iterator it is given:
+    when the list expires mid-way it is called again with a fresh iterator
+    over a new, consistent listing.
+    """
+    restarts = 0
+    while True:
+        try:
+            return consumer(iter_list_items(path, limit, params, accept))
+        except ListExpired as e:
+            restarts += 1
+            if restarts > max_restarts:
+                raise
+            print(f"⚠️ Listing {path} expired ({e}); restarting "
+                  f"({restarts}/{max_restarts})")
+
+
+def _versioned_items(path: str, versions: List[Optional[str]], limit: int,
+                     params: Optional[Dict[str, str]]) -> Iterator[Dict[str, Any]]:
+    """iter_list_items(), appending each page's resourceVersion to versions"""
+    for page in iter_list_pages(path, limit, params):
+        versions.append(page.resource_version)
+        yield from page.items
+
+
+def list_with_version(path: str, consumer: Callable[[Iterator[Dict[str, Any]]], T],
+                      limit: int = DEFAULT_PAGE_SIZE,
+                      params: Optional[Dict[str, str]] = None,
+                      max_restarts: int = MAX_LIST_RESTARTS
+                      ) -> Tuple[T, Optional[str]]:
+    """consume_list(), also returning the resourceVersion the listing was read at
+
+    A watch started from that version delivers every change made after the
+    listing, with none missed or repeated.
+    """
+    restarts = 0
+    while True:
+        versions: List[Optional[str]] = []
+        try:
+            result = consumer(_versioned_items(path, versions, limit, params))
+            return result, versions[0] if versions else None
+        except ListExpired as e:
+            restarts += 1
+            if restarts > max_restarts:
+                raise
+            print(f"⚠️ Listing {path} expired ({e}); restarting "
+                  f"({restarts}/{max_restarts})")
+
+
+def watch_events(path: str, resource_version: Optional[str],
+                 timeout_seconds: int = WATCH_TIMEOUT_SECONDS,
+                 params: Optional[Dict[str, str]] = None) -> Iterator[Dict[str, Any]]:
+    """Yield the watch events of a collection after resource_version
+
+    Events are ADDED, MODIFIED, DELETED and BOOKMARK dicts as the API server
+    streams them. The stream ends when the server closes it after
+    timeout_seconds; the caller resumes from the last resourceVersion it
+    saw. ListExpired means that version is gone and the caller must list
+    again.
+    """
+    query = dict(params or {}, watch="1", allowWatchBookmarks="true",
+                 timeoutSeconds=str(timeout_seconds))
+    if resource_version:
+        query["resourceVersion"] = resource_version
+    command = kubectl_command("get", "--raw", f"{path}?{urlencode(query)}")
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        for line in process.stdout:
+            if not line.strip():
+                continue
+            _record_transfer(line)
+            event = json.loads(line)
+            if event.get("type") == "ERROR":
+                status = event.get("object", {})
+                if status.get("code") == 410:
+                    raise ListExpired(status.get("message", f"{path} watch expired"))
+                raise subprocess.CalledProcessError(
+                    status.get("code", 1), command, None, status.get("message"))
+            yield event
+
+        stderr = process.stderr.read().decode(errors="replace")
+        if process.wait() != 0:
+            if _EXPIRED_ERROR.search(stderr):
+                raise ListExpired(stderr.strip())
+            raise subprocess.CalledProcessError(
+                process.returncode, command, None, stderr)
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def list_all(path: str, limit: int = DEFAULT_PAGE_SIZE,
+             params: Optional[Dict[str, str]] = None,
+             accept: Optional[str] = None) -> List[Dict[str, Any]]:
+    """All items of a list call, fetched in pages"""
+    return consume_list(path, list, limit, params, accept=accept)
+
+
+def count_items(path: str, params: Optional[Dict[str, str]] = None) -> int:
+    """Number of objects a list call matches, transferring Table rows only"""
+    params = dict(params or {}, includeObject="None")
+    return consume_list(path, lambda items: sum(1 for _ in items), params=params,
+                        accept=TABLE_ACCEPT)
@@ -0,0 +1,636 @@
+#!/usr/bin/env python3
+"""
+📚 Project Model Registry
+
+Reads and writes project_model_registry.json for the scripts in scripts/.
+Updates are JSON-patch style operations on a path of keys: only the text
+of the changed subtree is re-serialized and spliced into the file, the
+result is written to a temporary file and renamed over the registry, and
+nothing is written when the subtree did not change apart from timestamps.
+
+The registry can also be split into a sharded store next to it (one file
+per domain plus a root file, and an index of the byte span of every
+subtree down to INDEX_DEPTH). When the store exists it is the registry:
+readers seek to the span of the subtree they ask for and parse only that,
+and writers splice into one shard. Split and export with:
+
+    python gke_model_registry.py split
+    python gke_model_registry.py export
+
+A single registry file is parsed at most once per change: the parsed model
+is kept as a pickle cache next to the registry, valid while the file's
+mtime and size match, or while its sha256 matches after they changed. The
+cache is only as trusted as the directory holding the registry.
+
+Generated scripts are versioned by a Merkle hash of only the subtrees they
+were generated from (SubtreeHasher), so unrelated edits such as a
+deployment_state update do not mark them stale.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+REGISTRY_PATH = Path(__file__).parent.parent / "project_model_registry.json"
+INDEX_DEPTH = 4     # Levels below a shard's top whose spans are indexed
+CACHE_FORMAT = 1    # Bump when the parse cache layout changes
+CACHE_PROTOCOL = 4  # Pickle protocol readable by every supported Python
+GCP_SETUP_PATH = ("domains", "hackathon", "hackathon_mapping", "gke_turns_10",
+                  "gcp_project_setup")
+DEPLOYMENT_STATE_PATH = GCP_SETUP_PATH + ("deployment_state",)
+DEPLOYMENT_STATES_PATH = GCP_SETUP_PATH + ("deployment_states",)   # Per cluster
+DEPLOY_TEMPLATE_PATH = GCP_SETUP_PATH + ("deploy_template",)
+
+VERSION_LENGTH = 16     # Hex digits of a script's MODEL VERSION
+
+# Keys that change on every refresh and do not make a subtree "changed"
+VOLATILE_KEYS = ("last_updated", "deployment_timestamp")
+
+INDENT = 2
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+def parse_pointer(pointer: str) -> Tuple[str, ...]:
+    """Keys of a JSON pointer ("/domains/hackathon" -> ("domains", "hackathon"))"""
+    if not pointer:
+        return ()
+    if not pointer.startswith("/"):
+        raise ValueError(f"Invalid JSON pointer: {pointer}")
+    return tuple(part.replace("~1", "/").replace("~0", "~")
+                 for part in pointer[1:].split("/"))
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    """Position of the next non-whitespace character"""
+    return _WHITESPACE.match(text, pos).end()
+
+
+def _member(text: str, pos: int, key: str) -> int:
+    """Start of the value of key in the object starting at pos
+
+    Sibling values are skipped with the C decoder; raises KeyError when the
+    object has no such member.
+    """
+    if text[pos] != "{":
+        raise KeyError(key)
+    pos = _skip_whitespace(text, pos + 1)
+    while text[pos] != "}":
+        name, pos = _decoder.raw_decode(text, pos)
+        pos = _skip_whitespace(text, _skip_whitespace(text, pos) + 1)   # past ':'
+        if name == key:
+            return pos
+        _, pos = _decoder.raw_decode(text, pos)
+        pos = _skip_whitespace(text, pos)
+        if text[pos] == ",":
+            pos = _skip_whitespace(text, pos + 1)
+    raise KeyError(key)
+
+
+def _members(text: str, pos: int) -> Iterator[Tuple[str, int, int]]:
+    """(key, value start, value end) of each member of the object at pos"""
+    if text[pos] != "{":
+        return
+    pos = _skip_whitespace(text, pos + 1)
+    while text[pos] != "}":
+        name, pos = _decoder.raw_decode(text, pos)
+        start = _skip_whitespace(text, _skip_whitespace(text, pos) + 1)
+        _, end = _decoder.raw_decode(text, start)
+        yield name, start, end
+        pos = _skip_whitespace(text, end)
+        if text[pos] == ",":
+            pos = _skip_whitespace(text, pos + 1)
+
+
+def to_pointer(keys: Sequence[str]) -> str:
+    """JSON pointer of a path of keys"""
+    return "".join("/" + k.replace("~", "~0").replace("/", "~1") for k in keys)
+
+
+def locate(text: str, keys: Sequence[str]) -> Tuple[int, int]:
+    """Span [start, end) of the value at a path of keys in JSON text"""
+    start = _skip_whitespace(text, 0)
+    for key in keys:
+        start = _member(text, start, key)
+    _, end = _decoder.raw_decode(text, start)
+    return start, end
+
+
+def _line_indent(text: str, pos: int) -> str:
+    """Leading whitespace of the line containing pos"""
+    line_start = text.rfind("\n", 0, pos) + 1
+    return text[line_start:_skip_whitespace(text, line_start)]
+
+
+def _dump(value: Any, indent: str) -> str:
+    """Serialize a value as json.dump(indent=2) would at this nesting"""
+    return json.dumps(value, indent=INDENT).replace("\n", "\n" + indent)
+
+
+def _without(value: Any, ignore: Iterable[str]) -> Any:
+    """Copy of a value without the ignored keys at any depth"""
+    ignore = frozenset(ignore)
+    if isinstance(value, dict):
+        return {k: _without(v, ignore) for k, v in value.items() if k not in ignore}
+    if isinstance(value, list):
+        return [_without(v, ignore) for v in value]
+    return value
+
+
+def splice(text: str, keys: Sequence[str], value: Any) -> str:
+    """JSON text with the value at keys replaced, or added to its parent object"""
+    try:
+        start, end = locate(text, keys)
+        return text[:start] + _dump(value, _line_indent(text, start)) + text[end:]
+    except KeyError:
+        if not keys:
+            raise
+    # New member: insert it before the parent's closing brace
+    _, parent_end = locate(text, keys[:-1])
+    close = parent_end - 1
+    indent = _line_indent(text, close)
+    member = f'{json.dumps(keys[-1])}: {_dump(value, indent + " " * INDENT)}'
+    before = text[:close].rstrip()
+    separator = "" if before.endswith("{") else ","
+    return (f"{before}{separator}\n{indent}{' ' * INDENT}{member}\n"
+            f"{indent}{text[close:]}")
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Write a file through a temporary file in the same directory and a rename"""
+    atomic_write_bytes(path, text.encode())
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write bytes through a temporary file in the same directory and a rename"""
+    path = Path(path)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.",
+                                     suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            os.chmod(temp_path, path.stat().st_mode & 0o777)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def apply_patch(operations: List[Dict[str, Any]], path: Path = REGISTRY_PATH,
+                ignore: Iterable[str] = VOLATILE_KEYS) -> bool:
+    """Apply "add"/"replace" operations to the registry; True when it was rewritten
+
+    Each operation is {"op", "path" (JSON pointer), "value"}. Operations
+    whose value equals the current one (ignoring the volatile keys) are
+    dropped; when none remain the file is left untouched.
+    """
+    text = Path(path).read_text()
+    changed = False
+    for operation in operations:
+        op = operation.get("op")
+        if op not in ("add", "replace"):
+            raise ValueError(f"Unsupported patch operation: {op}")
+        keys = parse_pointer(operation["path"])
+        value = operation["value"]
+        try:
+            start, end = locate(text, keys)
+        except KeyError:
+            if op == "replace":
+                raise
+        else:
+            current = _decoder.decode(text[start:end])
+            if _without(current, ignore) == _without(value, ignore):
+                continue
+        text = splice(text, keys, value)
+        changed = True
+
+    if changed:
+        atomic_write_text(path, text)
+    return changed
+
+
+def update_subtrees(updates: Iterable[Tuple[Sequence[str], Any]],
+                    path: Path = REGISTRY_PATH,
+                    ignore: Iterable[str] = VOLATILE_KEYS) -> bool:
+    """Replace (or add) several subtrees in one write; True when rewritten"""
+    store = shard_root(path)
+    if store.is_dir():
+        return ShardedRegistry(store).update_subtrees(updates, ignore)
+    return apply_patch([{"op": "add", "path": to_pointer(keys), "value": value}
+                        for keys, value in updates], path, ignore)
+
+
+def update_subtree(keys: Sequence[str], value: Any, path: Path = REGISTRY_PATH,
+                   ignore: Iterable[str] = VOLATILE_KEYS) -> bool:
+    """Replace (or add) the subtree at keys; True when the registry was rewritten"""
+    return update_subtrees([(keys, value)], path, ignore)
+
+
+def cache_path(path: Path = REGISTRY_PATH) -> Path:
+    """Parse cache file of a registry file"""
+    path = Path(path)
+    return path.with_name(f".{path.name}.pickle")
+
+
+def _open_cache(cache: Path) -> Tuple[Optional[Tuple], Any]:
+    """Header and open reader of a parse cache, or (None, None) when unusable"""
+    try:
+        f = open(cache, "rb")
+    except OSError:
+        return None, None
+    try:
+        header = pickle.load(f)
+        if isinstance(header, tuple) and len(header) == 4 and header[0] == CACHE_FORMAT:
+            return header, f
+    except (EOFError, pickle.UnpicklingError, ValueError, TypeError):
+        pass
+    f.close()
+    return None, None
+
+
+def load_project_model(path: Path = REGISTRY_PATH) -> Dict[str, Any]:
+    """The whole registry, parsed at most once per change of the file
+
+    The cache header holds (format, mtime_ns, size, sha256). A matching
+    mtime and size is trusted; otherwise the file is hashed, and a matching
+    hash (e.g. after a touch or a checkout) still reuses the parsed model.
+    """
+    path = Path(path)
+    store = shard_root(path)
+    if store.is_dir():
+        return ShardedRegistry(store).load()
+
+    stat = path.stat()
+    cache = cache_path(path)
+    header, reader = _open_cache(cache)
+    model = data = None
+    if reader is not None:
+        with reader:
+            if header[1:3] == (stat.st_mtime_ns, stat.st_size):
+                try:
+                    return pickle.load(reader)
+                except (EOFError, pickle.UnpicklingError):
+                    pass    # Truncated cache: parse again
+            else:
+                data = path.read_bytes()
+                digest = hashlib.sha256(data).hexdigest()
+                if header[3] == digest:
+                    try:
+                        model = pickle.load(reader)
+                    except (EOFError, pickle.UnpicklingError):
+                        pass
+    if data is None:
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+    if model is None:
+        model = json.loads(data)
+
+    try:
+        header = (CACHE_FORMAT, stat.st_mtime_ns, stat.st_size, digest)
+        atomic_write_bytes(cache, pickle.dumps(header, CACHE_PROTOCOL)
+                           + pickle.dumps(model, CACHE_PROTOCOL))
+    except OSError:
+        pass    # A read-only checkout just goes without the cache
+    return model
+
+
+def load_subtree(keys: Sequence[str] = (), path: Path = REGISTRY_PATH) -> Any:
+    """Value at a path of keys; a sharded registry parses only that subtree"""
+    store = shard_root(path)
+    if store.is_dir():
+        return ShardedRegistry(store).load(keys)
+    value = load_project_model(path)
+    for key in keys:
+        value = value[key]
+    return value
+
+
+def load_or_exit(keys: Sequence[str] = (), path: Path = REGISTRY_PATH) -> Any:
+    """load_subtree() for the scripts: report a problem and exit(1)"""
+    try:
+        return load_subtree(keys, path)
+    except FileNotFoundError:
+        print(f"❌ Project model registry not found at: {path}")
+    except json.JSONDecodeError as e:
+        print(f"❌ Failed to parse project model registry: {e}")
+    except KeyError as e:
+        print(f"❌ Project model registry has no {to_pointer(keys)} ({e})")
+    sys.exit(1)
+
+
+def shard_root(path: Path = REGISTRY_PATH) -> Path:
+    """Directory of the sharded store of a registry file"""
+    path = Path(path)
+    return path.with_name(path.stem + ".shards")
+
+
+def index_spans(text: str, depth: int = INDEX_DEPTH) -> Dict[str, List[int]]:
+    """[start, end) span of every object member down to depth, by JSON pointer"""
+    spans: Dict[str, List[int]] = {}
+
+    def walk(pos: int, prefix: str, level: int) -> None:
+        for name, start, end in _members(text, pos):
+            pointer = prefix + to_pointer((name,))
+            spans[pointer] = [start, end]
+            if level < depth:
+                walk(start, pointer, level + 1)
+
+    walk(_skip_whitespace(text, 0), "", 1)
+    return spans
+
+
+class ShardedRegistry:
+    """Registry stored as one JSON file per domain plus a path index
+
+    index.json records, for the root shard and each domain shard, its file,
+    the size and mtime it was indexed at, and the span of each subtree. A
+    shard whose size or mtime no longer match is re-indexed on first use.
+    Shards are written ASCII-only, so character spans are byte offsets.
+    """
+
+    def __init__(self, root: Path):
+        """Open a sharded store (see split() to create one)"""
+        self.root = Path(root)
+        self.index_path = self.root / "index.json"
+        self._index: Optional[Dict[str, Any]] = None
+        self._index_mtime: Optional[int] = None
+
+    @classmethod
+    def split(cls, registry_path: Path = REGISTRY_PATH,
+              root: Optional[Path] = None) -> "ShardedRegistry":
+        """Create a sharded store from a registry file"""
+        model = json.loads(Path(registry_path).read_text())
+        store = cls(root or shard_root(registry_path))
+        (store.root / "domains").mkdir(parents=True, exist_ok=True)
+
+        index: Dict[str, Any] = {"root": None, "domains": {}}
+        rest = {k: v for k, v in model.items() if k != "domains"}
+        index["root"] = store._write_shard("root.json", rest)
+        used = set()
+        for domain, value in model.get("domains", {}).items():
+            name = re.sub(r"[^A-Za-z0-9_.-]", "_", domain) or "_"
+            while name in used:
+                name += "_"
+            used.add(name)
+            index["domains"][domain] = store._write_shard(f"domains/{name}.json", value)
+        store._save_index(index)
+        return store
+
+    def _write_shard(self, file: str, value: Any) -> Dict[str, Any]:
+        """Write a shard and return its index entry"""
+        path = self.root / file
+        atomic_write_text(path, json.dumps(value, indent=INDENT))
+        return self._entry(file, path.read_text())
+
+    def _entry(self, file: str, text: str) -> Dict[str, Any]:
+        """Index entry of a shard's current content"""
+        stat = (self.root / file).stat()
+        return {"file": file, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                "paths": index_spans(text)}
+
+    def _save_index(self, index: Dict[str, Any]) -> None:
+        """Write the index and keep it as the cached copy"""
+        atomic_write_text(self.index_path, json.dumps(index, indent=INDENT))
+        self._index = index
+        self._index_mtime = self.index_path.stat().st_mtime_ns
+
+    def index(self) -> Dict[str, Any]:
+        """The path index, re-read only when index.json changed"""
+        mtime = self.index_path.stat().st_mtime_ns
+        if self._index is None or mtime != self._index_mtime:
+            self._index = json.loads(self.index_path.read_text())
+            self._index_mtime = mtime
+        return self._index
+
+    def _fresh(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Entry of a shard, re-indexed if the shard changed since indexing"""
+        stat = (self.root / entry["file"]).stat()
+        if (stat.st_size, stat.st_mtime_ns) == (entry["size"], entry["mtime_ns"]):
+            return entry
+        index = self.index()
+        fresh = self._entry(entry["file"], (self.root / entry["file"]).read_text())
+        if index["root"]["file"] == entry["file"]:
+            index["root"] = fresh
+        else:
+            for domain, other in index["domains"].items():
+                if other["file"] == entry["file"]:
+                    index["domains"][domain] = fresh
+        self._save_index(index)
+        return fresh
+
+    def _shard(self, keys: Sequence[str]) -> Tuple[Dict[str, Any], Tuple[str, ...]]:
+        """Index entry of the shard holding keys, and keys relative to it"""
+        index = self.index()
+        if keys[0] != "domains":
+            return index["root"], tuple(keys)
+        if keys[1] not in index["domains"]:
+            raise KeyError(keys[1])
+        return index["domains"][keys[1]], tuple(keys[2:])
+
+    def _read(self, entry: Dict[str, Any], keys: Sequence[str]) -> Any:
+        """Parse the value at keys in one shard, reading only its span"""
+        entry = self._fresh(entry)
+        depth = min(len(keys), INDEX_DEPTH)
+        while depth and to_pointer(keys[:depth]) not in entry["paths"]:
+            depth -= 1
+        start, end = (entry["paths"][to_pointer(keys[:depth])] if depth
+                      else (0, entry["size"]))
+        with open(self.root / entry["file"], "rb") as f:
+            f.seek(start)
+            text = f.read(end - start).decode()
+        if depth < len(keys):
+            start, end = locate(text, keys[depth:])
+            text = text[start:end]
+        return json.loads(text)
+
+    def load(self, keys: Sequence[str] = ()) -> Any:
+        """Value at a path of keys; only the shards and spans it needs are read"""
+        keys = tuple(keys)
+        if not keys:
+            model = self._read(self.index()["root"], ())
+            model["domains"] = self.load(("domains",))
+            return model
+        if keys == ("domains",):
+            return {domain: self._read(entry, ())
+                    for domain, entry in self.index()["domains"].items()}
+        entry, relative = self._shard(keys)
+        return self._read(entry, relative)
+
+    def update_subtree(self, keys: Sequence[str], value: Any,
+                       ignore: Iterable[str] = VOLATILE_KEYS) -> bool:
+        """Replace (or add) the subtree at keys in its shard; True when written"""
+        return self.update_subtrees([(keys, value)], ignore)
+
+    def update_subtrees(self, updates: Iterable[Tuple[Sequence[str], Any]],
+                        ignore: Iterable[str] = VOLATILE_KEYS) -> bool:
+        """Replace (or add) several subtrees; True when any shard was written
+
+        Updates to one shard are applied as one patch, in one atomic write.
+        """
+        index = self.index()
+        patches: Dict[str, Tuple[Dict[str, Any], List[Dict[str, Any]]]] = {}
+        written = False
+        for keys, value in updates:
+            keys = tuple(keys)
+            if not keys or keys == ("domains",):
+                raise ValueError("Update a single domain or a path inside one")
+            if keys[0] == "domains" and keys[1] not in index["domains"]:
+                if len(keys) > 2:
+                    raise KeyError(keys[1])
+                file = f"domains/{re.sub(r'[^A-Za-z0-9_.-]', '_', keys[1])}.json"
+                index["domains"][keys[1]] = self._write_shard(file, value)
+                self._save_index(index)
+                written = True
+                continue
+            entry, relative = self._shard(keys)
+            patches.setdefault(entry["file"], (entry, []))[1].append(
+                {"op": "add", "path": to_pointer(relative), "value": value})
+
+        for entry, operations in patches.values():
+            entry = self._fresh(entry)
+            if apply_patch(operations, self.root / entry["file"], ignore):
+                self._fresh(entry)
+                written = True
+        return written
+
+    def export(self, path: Path = REGISTRY_PATH) -> None:
+        """Write the whole model back out as a single registry file"""
+        atomic_write_text(path, json.dumps(self.load(), indent=INDENT))
+
+
+def _hash(*parts: bytes) -> bytes:
+    """sha256 digest of the concatenated parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part)
+    return digest.digest()
+
+
+# Digest of a path that does not exist in the model
+MISSING_DIGEST = _hash(b"missing")
+
+
+class SubtreeHasher:
+    """Merkle digests of a model tree, memoized per node
+
+    A dict's digest covers its sorted keys and its children's digests, a
+    list's its items' digests, and a scalar's its JSON text, so a node's
+    digest depends only on its own content. Digests are kept in a tree of
+    memo nodes mirroring the model; update() replaces one subtree and drops
+    only the memos on its path, so rehashing after an edit recomputes the
+    changed path while every untouched sibling keeps its digest.
+    """
+
+    def __init__(self, model: Any):
+        """Initialize the hasher for a parsed model"""
+        self.model = model
+        self._memo: Dict[str, Any] = {}
+
+    def _digest(self, value: Any, memo: Dict[str, Any]) -> bytes:
+        """Digest of a value, filling its memo node"""
+        if "digest" in memo:
+            return memo["digest"]
+        children = memo.setdefault("children", {})
+        if isinstance(value, dict):
+            digest = _hash(b"d", *(
+                _hash(key.encode())
+                + self._digest(value[key], children.setdefault(key, {}))
+                for key in sorted(value)))
+        elif isinstance(value, list):
+            digest = _hash(b"l", *(self._digest(item, children.setdefault(index, {}))
+                                   for index, item in enumerate(value)))
+        else:
+            digest = _hash(b"s", json.dumps(value).encode())
+        memo["digest"] = digest
+        return digest
+
+    @staticmethod
+    def _index(container: Any, key: Any) -> Any:
+        """Key of a path step: list items are addressed by position"""
+        return int(key) if isinstance(container, list) and str(key).isdigit() else key
+
+    def digest(self, keys: Sequence[str] = ()) -> bytes:
+        """Digest of the subtree at a path of keys (MISSING_DIGEST when absent)"""
+        value, memo = self.model, self._memo
+        for key in keys:
+            key = self._index(value, key)
+            try:
+                value = value[key]
+            except (KeyError, IndexError, TypeError):
+                return MISSING_DIGEST
+            memo = memo.setdefault("children", {}).setdefault(key, {})
+        return self._digest(value, memo)
+
+    def update(self, keys: Sequence[str], value: Any) -> None:
+        """Set the subtree at keys and forget the digests on its path"""
+        if not keys:
+            self.model, self._memo = value, {}
+            return
+        parent, memo = self.model, self._memo
+        for key in keys[:-1]:
+            key = self._index(parent, key)
+            memo.pop("digest", None)
+            parent = parent[key]
+            memo = memo.setdefault("children", {}).setdefault(key, {})
+        key = self._index(parent, keys[-1])
+        memo.pop("digest", None)
+        parent[key] = value
+        memo.setdefault("children", {})[key] = {}
+
+    def version(self, paths: Iterable[Sequence[str]]) -> str:
+        """Version of a set of subtrees: a hash of each path and its digest"""
+        return version_of((path, self.digest(path)) for path in paths)
+
+
+def version_of(digests: Iterable[Tuple[Sequence[str], bytes]]) -> str:
+    """Short version string of (path, digest) pairs, independent of their order"""
+    return _hash(*sorted(to_pointer(path).encode() + b"\0" + digest
+                         for path, digest in digests)).hex()[:VERSION_LENGTH]
+
+
+def subtree_version(paths: Iterable[Sequence[str]], path: Path = REGISTRY_PATH) -> str:
+    """Version of some subtrees of the registry, loading only those subtrees"""
+    digests = []
+    for keys in paths:
+        try:
+            digests.append((keys, SubtreeHasher(load_subtree(keys, path)).digest()))
+        except KeyError:
+            digests.append((keys, MISSING_DIGEST))
+    return version_of(digests)
+
+
+def main():
+    """Split the registry into a sharded store, or export the store"""
+    parser = argparse.ArgumentParser(description="Manage the project model registry")
+    parser.add_argument("command", choices=["split", "export"])
+    parser.add_argument("--registry", type=Path, default=REGISTRY_PATH)
+    args = parser.parse_args()
+
+    try:
+        if args.command == "split":
+            store = ShardedRegistry.split(args.registry)
+            print(f"✅ Split {args.registry} into {len(store.index()['domains'])} "
+                  f"domain shards at {store.root}")
+        else:
+            ShardedRegistry(shard_root(args.registry)).export(args.registry)
+            print(f"✅ Exported {shard_root(args.registry)} to {args.registry}")
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+📐 GKE Rightsizing Manifest Patcher
+
+Apply per-container resource recommendations to copies of the service
+manifests. The YAML is patched line by line so comments and layout survive,
+and the projected monthly saving is reported alongside a unified diff.
+"""
+
+import difflib
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from gke_cost_monitor import (
+    parse_cpu_millicores,
+    parse_memory_mi,
+    requests_monthly_cost,
+)
+
+DEFAULT_MANIFESTS = [
+    Path("k8s/services/ai-agents.yaml"),
+    Path("k8s/services/orchestrator-service.yaml"),
+]
+DEFAULT_OUTPUT_DIR = Path("k8s/rightsized")
+
+SECTIONS = ("requests", "limits")
+RESOURCES = ("cpu", "memory")
+CONTAINERS_PATH = ("spec", "template", "spec", "containers")
+
+_KEY_LINE = re.compile(
+    r"^(?P<indent> *)(?P<dash>- +)?(?P<key>[A-Za-z0-9_.\-/]+):(?P<rest>.*)$")
+_VALUE = re.compile(
+    r"^(?P<lead>\s*)(?P<value>\"[^\"]*\"|'[^']*'|[^\s#]+)?(?P<tail>.*)$")
+
+
+def load_recommendations(path: Path
+                         ) -> Dict[Tuple[str, str], Dict[str, Dict[str, str]]]:
+    """Load per-container recommendations keyed by (deployment, container)
+
+    The file is a JSON list of entries such as::
+
+        {"deployment": "ghostbusters-security-agent",
+         "container": "security-agent",
+         "requests": {"cpu": "50m", "memory": "96Mi"},
+         "limits": {"cpu": "100m", "memory": "192Mi"}}
+    """
+    with open(path, 'r') as f:
+        entries = json.load(f)
+
+    recommendations = {}
+    for entry in entries:
+        key = (entry["deployment"], entry["container"])
+        recommendations[key] = {
+            section: dict(entry.get(section, {})) for section in SECTIONS
+            if entry.get(section)
+        }
+    return recommendations
+
+
+def _split_documents(lines: List[str]) -> List[Tuple[int, int]]:
+    """Return (start, end) line ranges of the YAML documents in a file"""
+    ranges = []
+    start = 0
+    for i, line in enumerate(lines):
+        if line.rstrip() == "---":
+            ranges.append((start, i))
+            start = i + 1
+    ranges.append((start, len(lines)))
+    return ranges
+
+
+def _scan_document(lines: List[str], start: int, end: int) -> Dict[str, Any]:
+    """Locate kind, name, replicas and container resource lines in one document"""
+    doc = {"kind": None, "name": None, "replicas": 1, "containers": {}}
+    stack: List[Tuple[int, str]] = []
+    container = None
+
+    for i in range(start, end):
+        line = lines[i]
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+
+        match = _KEY_LINE.match(line)
+        if not match:
+            continue
+
+        indent = len(match.group("indent"))
+        key_indent = indent + (len(match.group("dash")) if match.group("dash") else 0)
+        key = match.group("key")
+        value = _VALUE.match(match.group("rest")).group("value")
+        value = value.strip("\"'") if value else None
+
+        while stack and stack[-1][0] >= key_indent:
+            stack.pop()
+        path = tuple(k for _, k in stack)
+
+        if match.group("dash") and path == CONTAINERS_PATH:
+            container = None
+            if key == "name":
+                container = value
+                doc["containers"][container] = {
+                    "item_indent": key_indent,
+                    "anchor": i,
+                    "resources": None,
+                    "sections": {},
+                    "values": {},
+                }
+
+        if not path and key == "kind":
+            doc["kind"] = value
+        elif path == ("metadata",) and key == "name":
+            doc["name"] = value
+        elif path == ("spec",) and key == "replicas" and value:
+            doc["replicas"] = int(value)
+        elif container and path[:len(CONTAINERS_PATH)] == CONTAINERS_PATH:
+            info = doc["containers"][container]
+            inner = path[len(CONTAINERS_PATH):]
+            if not inner and key in ("name", "image"):
+                info["anchor"] = i
+            elif not inner and key == "resources":
+                info["resources"] = (i, key_indent)
+            elif inner == ("resources",) and key in SECTIONS:
+                info["sections"][key] = (i, key_indent)
+            elif len(inner) == 2 and inner[0] == "resources" and key in RESOURCES:
+                info["values"][(inner[1], key)] = i
+
+        stack.append((key_indent, key))
+
+    return doc
+
+
+def _replace_value(line: str, new_value: str) -> Tuple[str, Optional[str]]:
+    """Swap the scalar on a ``key: value`` line, keeping quotes and comment column"""
+    match = _KEY_LINE.match(line)
+    prefix = line[:match.start("rest")]
+    parts = _VALUE.match(match.group("rest"))
+    old = parts.group("value")
+    quote = old[0] if old and old[0] in "\"'" else ""
+    new_token = f"{quote}{new_value}{quote}"
+    tail = parts.group("tail")
+
+    if tail.lstrip().startswith("#"):
+        # Keep the comment in the same column where the new value allows it
+        padding = len(tail) - len(tail.lstrip())
+        padding = max(1, padding + len(old or "") - len(new_token))
+        tail = " " * padding + tail.lstrip()
+
+    line = f"{prefix}{parts.group('lead') or ' '}{new_token}{tail}"
+    return line, (old or "").strip("\"'")
+
+
+def _cost_delta(old: Optional[str], new: str, resource: str) -> float:
+    """Monthly cost difference for one replica when a request changes"""
+    if resource == "cpu":
+        return requests_monthly_cost(
+            parse_cpu_millicores(new) - parse_cpu_millicores(old), 0)
+    return requests_monthly_cost(0, parse_memory_mi(new) - parse_memory_mi(old))
+
+
+def patch_manifest(text: str,
+                   recommendations: Dict[Tuple[str, str], Dict[str, Dict[str, str]]],
+                   matched: Optional[Set[Tuple[str, str]]] = None
+                   ) -> Tuple[str, List[Dict[str, Any]]]:
+    """Apply recommendations to Deployment containers in a manifest
+
+    Returns the patched text and a list of applied changes. Lines that are
+    not touched are copied verbatim, so comments, ordering and other
+    resources in the file are preserved. Every recommended (deployment,
+    container) found in the manifest is added to matched, including those
+    already at the recommended values.
+    """
+    lines = text.split("\n")
+    edits: List[Tuple[int, str, List[str]]] = []   # (line, "replace"|"insert", lines)
+    changes = []
+
+    for start, end in _split_documents(lines):
+        doc = _scan_document(lines, start, end)
+        if doc["kind"] != "Deployment":
+            continue
+
+        for container, info in doc["containers"].items():
+            rec = recommendations.get((doc["name"], container))
+            if not rec:
+                continue
+            if matched is not None:
+                matched.add((doc["name"], container))
+
+            item_indent = info["item_indent"]
+            missing_sections: Dict[str, List[str]] = {}
+
+            for section in SECTIONS:
+                for resource, new_value in rec.get(section, {}).items():
+                    if resource not in RESOURCES:
+                        continue
+                    new_value = str(new_value)
+                    line_no = info["values"].get((section, resource))
+
+                    if line_no is not None:
+                        new_line, old_value = _replace_value(lines[line_no], new_value)
+                        if old_value == new_value:
+                            continue
+                        edits.append((line_no, "replace", [new_line]))
+                    else:
+                        old_value = None
+                        missing_sections.setdefault(section, []).append(
+                            f'{resource}: "{new_value}"')
+
+                    change = {
+                        "deployment": doc["name"],
+                        "container": container,
+                        "section": section,
+                        "resource": resource,
+                        "old": old_value,
+                        "new": new_value,
+                        "replicas": doc["replicas"],
+                        "monthly_delta": 0.0,
+                    }
+                    if section == "requests":
+                        change["monthly_delta"] = round(
+                            _cost_delta(old_value, new_value, resource)
+                            * doc["replicas"], 4)
+                    changes.append(change)
+
+            # Insert keys or whole blocks that the manifest does not have yet.
+            # Missing sections go in as one block, so they stay together
+            # under resources: instead of landing under the next key
+            new_sections: List[str] = []
+            if info["resources"]:
+                resources_line, indent = info["resources"]
+            else:
+                resources_line, indent = info["anchor"], item_indent
+                if missing_sections:
+                    new_sections.append(" " * indent + "resources:")
+            for section, entries in missing_sections.items():
+                if section in info["sections"]:
+                    line_no, section_indent = info["sections"][section]
+                    block = [" " * (section_indent + 2) + e for e in entries]
+                    edits.append((line_no + 1, "insert", block))
+                else:
+                    new_sections.append(" " * (indent + 2) + f"{section}:")
+                    new_sections += [" " * (indent + 4) + e for e in entries]
+            if new_sections:
+                edits.append((resources_line + 1, "insert", new_sections))
+
+    # Apply bottom-up so earlier line numbers stay valid
+    for line_no, action, new_lines in sorted(edits, key=lambda e: e[0], reverse=True):
+        if action == "replace":
+            lines[line_no] = new_lines[0]
+        else:
+            lines[line_no:line_no] = new_lines
+
+    return "\n".join(lines), changes
+
+
+def rightsize_manifests(recommendations: Dict[Tuple[str, str],
+                                              Dict[str, Dict[str, str]]],
+                        manifests: Optional[List[Path]] = None,
+                        output_dir: Path = DEFAULT_OUTPUT_DIR) -> Dict[str, Any]:
+    """Write patched copies of the manifests and summarise the result"""
+    manifests = manifests or DEFAULT_MANIFESTS
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    diffs = []
+    changes = []
+    written = []
+    matched: Set[Tuple[str, str]] = set()
+
+    for manifest in manifests:
+        original = manifest.read_text()
+        patched, manifest_changes = patch_manifest(original, recommendations, matched)
+
+        target = output_dir / manifest.name
+        target.write_text(patched)
+        written.append(str(target))
+        changes.extend(manifest_changes)
+
+        diffs.extend(difflib.unified_diff(
+            original.splitlines(keepends=True),
+            patched.splitlines(keepends=True),
+            fromfile=str(manifest),
+            tofile=str(target),
+        ))
+
+    monthly_delta = sum(c["monthly_delta"] for c in changes)
+
+    return {
+        "written": written,
+        "diff": "".join(diffs),
+        "changes": changes,
+        "unmatched": sorted(set(recommendations) - matched),
+        "monthly_saving": round(-monthly_delta, 2),
+    }
+
+
+def main():
+    """Main function"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Apply rightsizing recommendations to the service manifests")
+    parser.add_argument("recommendations", type=Path,
+                        help="JSON file with per-container requests/limits")
+    parser.add_argument("--manifest", type=Path, action="append", dest="manifests",
+                        help="Manifest to patch (repeatable, defaults to k8s/services)")
+    parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR,
+                        help="Directory for patched copies "
+                             f"(default {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("--apply", action="store_true",
+                        help="Run kubectl apply on the patched copies")
+    args = parser.parse_args()
+
+    print("📐 GKE Rightsizing")
+    print("=" * 50)
+
+    try:
+        recommendations = load_recommendations(args.recommendations)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Failed to load recommendations: {e}")
+        return 1
+
+    result = rightsize_manifests(recommendations, args.manifests, args.output_dir)
+
+    if result["diff"]:
+        print(result["diff"])
+    else:
+        print("✅ Manifests already match the recommendations")
+
+    for deployment, container in result["unmatched"]:
+        print(f"⚠️ No container '{container}' in Deployment '{deployment}' (skipped)")
+
+    print(f"📝 Patched manifests: {', '.join(result['written'])}")
+    print(f"💰 Projected monthly saving: ${result['monthly_saving']:.2f}")
+
+    if args.apply and result["changes"]:
+        try:
+            # Only this run's copies: the output directory may hold older ones
+            files = [arg for path in result["written"] for arg in ("-f", path)]
+            subprocess.run(["kubectl", "apply"] + files, check=True)
+            print("✅ Rightsized manifests applied")
+        except Exception as e:
+            print(f"❌ Failed to apply manifests: {e}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
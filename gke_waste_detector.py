@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+🗑️ GKE Idle and Orphaned Resource Detector
+
+Scan one cluster snapshot for resources that cost money without doing
+useful work, and attach an estimated daily cost to each finding.
+"""
+
+import json
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from gke_cost_monitor import (
+    DISK_GB_MONTHLY_COST,
+    collect_metrics,
+    parse_cpu_millicores,
+    parse_k8s_timestamp,
+    parse_memory_mi,
+    pod_requests,
+    pod_workload,
+    requests_monthly_cost,
+)
+from gke_kubectl import consume_list, namespaced_path
+
+# Kinds the scanner reads, listed page by page
+SNAPSHOT_LISTS = {
+    "Pod": ("/api/v1", "pods"),
+    "PersistentVolumeClaim": ("/api/v1", "persistentvolumeclaims"),
+    "Service": ("/api/v1", "services"),
+    "Endpoints": ("/api/v1", "endpoints"),
+    "Deployment": ("/apis/apps/v1", "deployments"),
+}
+
+# Persistent disk list prices by GKE storage class ($/GB/month)
+STORAGE_CLASS_GB_MONTHLY_COST = {
+    "standard": 0.04,        # pd-standard
+    "standard-rwo": 0.10,    # pd-balanced
+    "premium-rwo": 0.17,     # pd-ssd
+}
+LOAD_BALANCER_DAILY_COST = 0.60     # forwarding rule at ~$0.025/hour
+
+# A Deployment whose pods together stay under this CPU use is treated as
+# getting no traffic (there is no request metric to go on)
+IDLE_CPU_MILLICORES_PER_POD = 5.0
+
+
+def collect_snapshot() -> Dict[str, Any]:
+    """List every kind the scanner needs in pages, plus pod metrics"""
+    items: List[Dict[str, Any]] = []
+    for kind, (api, resource) in SNAPSHOT_LISTS.items():
+        # List responses leave kind off their items
+        items += consume_list(namespaced_path(api, resource),
+                              lambda page, kind=kind: [dict(item, kind=kind)
+                                                       for item in page])
+    try:
+        metrics = collect_metrics("pods")["items"]
+    except Exception:
+        metrics = None
+    return {"items": items, "pod_metrics": metrics}
+
+
+def _age_hours(timestamp: Optional[str], now: datetime) -> float:
+    """Hours since a Kubernetes timestamp, 0 when it is missing"""
+    parsed = parse_k8s_timestamp(timestamp)
+    return (now - parsed).total_seconds() / 3600 if parsed else 0.0
+
+
+def _finished_at(pod: Dict[str, Any]) -> Optional[str]:
+    """Latest container termination time of a finished pod"""
+    times = [
+        status.get("state", {}).get("terminated", {}).get("finishedAt")
+        for status in pod.get("status", {}).get("containerStatuses", [])
+    ]
+    times = [t for t in times if t]
+    return max(times) if times else pod.get("metadata", {}).get("creationTimestamp")
+
+
+def _is_unschedulable(pod: Dict[str, Any]) -> bool:
+    """Whether a pending pod is waiting for capacity (and so for scale-up)"""
+    for condition in pod.get("status", {}).get("conditions", []):
+        if (condition.get("type") == "PodScheduled"
+                and condition.get("status") == "False"):
+            return condition.get("reason") == "Unschedulable"
+    return False
+
+
+def _pod_daily_cost(pod: Dict[str, Any]) -> float:
+    """Daily cost of the requests a pod reserves"""
+    return requests_monthly_cost(*pod_requests(pod)) / 30
+
+
+def _finding(kind: str, namespace: str, name: str, reason: str,
+             daily_cost: float) -> Dict[str, Any]:
+    """Build one waste finding"""
+    return {
+        "type": kind,
+        "namespace": namespace,
+        "name": name,
+        "reason": reason,
+        "daily_cost": round(daily_cost, 4),
+    }
+
+
+def find_waste(snapshot: Dict[str, Any], now: Optional[datetime] = None,
+               finished_pod_grace_hours: float = 1.0,
+               pending_grace_minutes: float = 10.0) -> Dict[str, Any]:
+    """Flag idle and orphaned resources in one pass over a snapshot
+
+    Items are read once and sorted into small indexes; the checks that need
+    joins (claims to pods, services to endpoints, deployments to usage) run
+    against those indexes afterwards.
+    """
+    now = now or datetime.now(timezone.utc)
+    findings = []
+
+    usage: Dict[Tuple[str, str], float] = {}
+    for item in snapshot.get("pod_metrics") or []:
+        metadata = item.get("metadata", {})
+        usage[(metadata.get("namespace"), metadata.get("name"))] = sum(
+            parse_cpu_millicores(c.get("usage", {}).get("cpu"))
+            for c in item.get("containers", []))
+
+    mounted_claims: Set[Tuple[str, str]] = set()
+    claims: List[Dict[str, Any]] = []
+    load_balancers: List[Dict[str, Any]] = []
+    ready_endpoints: Dict[Tuple[str, str], int] = {}
+    deployments: List[Dict[str, Any]] = []
+    workload_cpu: Dict[Tuple[str, str], List[float]] = {}
+
+    for item in snapshot.get("items", []):
+        kind = item.get("kind")
+        metadata = item.get("metadata", {})
+        namespace, name = metadata.get("namespace", "default"), metadata.get("name")
+
+        if kind == "Pod":
+            phase = item.get("status", {}).get("phase")
+            if phase in ("Failed", "Succeeded"):
+                age = _age_hours(_finished_at(item), now)
+                if age >= finished_pod_grace_hours:
+                    label = "Failed" if phase == "Failed" else "Completed"
+                    # Terminated pods no longer reserve node capacity
+                    findings.append(_finding(
+                        "finished_pod", namespace, name,
+                        f"{label} {age:.0f}h ago and never cleaned up", 0.0))
+                continue
+
+            for volume in item.get("spec", {}).get("volumes", []):
+                claim = volume.get("persistentVolumeClaim", {}).get("claimName")
+                if claim:
+                    mounted_claims.add((namespace, claim))
+
+            if phase == "Pending" and _is_unschedulable(item):
+                age = _age_hours(metadata.get("creationTimestamp"), now) * 60
+                if age >= pending_grace_minutes:
+                    findings.append(_finding(
+                        "pending_pod", namespace, name,
+                        f"Unschedulable for {age:.0f}m, holding a node scale-up",
+                        _pod_daily_cost(item)))
+
+            workload = pod_workload(item)
+            if workload.startswith("Deployment/"):
+                samples = workload_cpu.setdefault((namespace, workload[11:]), [])
+                samples.append(usage.get((namespace, name), -1.0))
+
+        elif kind == "PersistentVolumeClaim":
+            claims.append(item)
+        elif kind == "Service" and item.get("spec", {}).get("type") == "LoadBalancer":
+            load_balancers.append(item)
+        elif kind == "Endpoints":
+            ready_endpoints[(namespace, name)] = sum(
+                len(subset.get("addresses", []))
+                for subset in item.get("subsets") or [])
+        elif kind == "Deployment":
+            deployments.append(item)
+
+    for claim in claims:
+        metadata = claim.get("metadata", {})
+        namespace, name = metadata.get("namespace", "default"), metadata.get("name")
+        phase = claim.get("status", {}).get("phase")
+        if phase != "Bound":
+            findings.append(_finding(
+                "unbound_pvc", namespace, name,
+                f"PersistentVolumeClaim is {phase or 'Unknown'} with no volume", 0.0))
+        elif (namespace, name) not in mounted_claims:
+            size_gb = parse_memory_mi(
+                claim.get("status", {}).get("capacity", {}).get("storage")) / 1024
+            price = STORAGE_CLASS_GB_MONTHLY_COST.get(
+                claim.get("spec", {}).get("storageClassName"), DISK_GB_MONTHLY_COST)
+            findings.append(_finding(
+                "unused_pvc", namespace, name,
+                f"Bound {size_gb:.0f}GB volume not mounted by any running pod",
+                size_gb * price / 30))
+
+    for service in load_balancers:
+        metadata = service.get("metadata", {})
+        namespace, name = metadata.get("namespace", "default"), metadata.get("name")
+        if not ready_endpoints.get((namespace, name)):
+            findings.append(_finding(
+                "idle_load_balancer", namespace, name,
+                "LoadBalancer Service has no ready endpoints",
+                LOAD_BALANCER_DAILY_COST))
+
+    if snapshot.get("pod_metrics") is not None:
+        for deployment in deployments:
+            metadata = deployment.get("metadata", {})
+            namespace, name = metadata.get("namespace", "default"), metadata.get("name")
+            replicas = deployment.get("spec", {}).get("replicas", 1)
+            samples = workload_cpu.get((namespace, name), [])
+            if replicas <= 1 or not samples or min(samples) < 0:
+                continue    # Not scaled up, or some pods have no metrics
+            if sum(samples) < IDLE_CPU_MILLICORES_PER_POD * len(samples):
+                template = {"spec": deployment.get("spec", {}).get("template", {}).get(
+                    "spec", {})}
+                findings.append(_finding(
+                    "idle_deployment", namespace, name,
+                    f"{replicas} replicas using {sum(samples):.0f}m CPU in total",
+                    _pod_daily_cost(template) * (replicas - 1)))
+
+    findings.sort(key=lambda f: f["daily_cost"], reverse=True)
+    by_type: Dict[str, Dict[str, float]] = {}
+    for finding in findings:
+        entry = by_type.setdefault(finding["type"], {"count": 0, "daily_cost": 0.0})
+        entry["count"] += 1
+        entry["daily_cost"] = round(entry["daily_cost"] + finding["daily_cost"], 4)
+
+    return {
+        "findings": findings,
+        "by_type": by_type,
+        "daily_cost": round(sum(f["daily_cost"] for f in findings), 2),
+        "scanned_at": now.isoformat(),
+    }
+
+
+def scan_cluster(**kwargs) -> Dict[str, Any]:
+    """Snapshot the cluster and scan it for waste"""
+    return find_waste(collect_snapshot(), **kwargs)
+
+
+def main():
+    """Main function"""
+    print("🗑️ GKE Waste Detector")
+    print("=" * 50)
+
+    try:
+        result = scan_cluster()
+    except Exception as e:
+        print(f"❌ Failed to scan cluster: {e}")
+        return 1
+
+    if "--json" in sys.argv:
+        print(json.dumps(result, indent=2))
+        return 0
+
+    if not result["findings"]:
+        print("✅ No idle or orphaned resources found")
+        return 0
+
+    for finding in result["findings"]:
+        print(f"  ${finding['daily_cost']:>6.2f}/day  {finding['type']:<20} "
+              f"{finding['namespace']}/{finding['name']}: {finding['reason']}")
+    print(f"💸 Estimated waste: ${result['daily_cost']:.2f}/day "
+          f"(${result['daily_cost'] * 30:.2f}/month)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
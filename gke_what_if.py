@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+🔮 GKE What-If Cost Engine
+
+Price a grid of cluster configurations (machine type x node count x spot x
+disk size x phase) without touching the cluster. The grid is evaluated
+column by column with the cost model of node_pool_costs(), the same model
+estimate_gke_costs() uses, so "spot e2-medium x3 vs on-demand
+e2-standard-2 x2" is one call.
+"""
+
+import argparse
+import itertools
+import json
+import sys
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from gke_cost_alerts import WARNING_RATIO
+from gke_cost_monitor import (
+    DEFAULT_COST_THRESHOLDS,
+    DISK_GB_MONTHLY_COST,
+    MACHINE_TYPES,
+    NETWORK_DAILY_COST,
+    PREEMPTIBLE_DISCOUNT,
+    node_allocatable,
+    parse_cpu_millicores,
+    parse_memory_mi,
+)
+
+STATUS_RANK = {"healthy": 0, "warning": 1, "critical": 2}
+
+
+def _status(daily: float, weekly: float, monthly: float,
+            thresholds: Dict[str, float]) -> str:
+    """Threshold status as check_cost_thresholds() reports it"""
+    status = "healthy"
+    for cost, window in ((daily, "daily"), (weekly, "weekly"), (monthly, "monthly")):
+        threshold = thresholds.get(window, float("inf"))
+        if cost > threshold:
+            return "critical"
+        if cost > threshold * WARNING_RATIO:
+            status = "warning"
+    return status
+
+
+def price_scenarios(machine_types: Sequence[str], node_counts: Sequence[int],
+                    spot: Sequence[bool] = (False, True),
+                    disk_sizes_gb: Sequence[float] = (20,),
+                    phases: Sequence[str] = ("development",),
+                    thresholds: Optional[Dict[str, Dict[str, float]]] = None,
+                    cpu_requests_millicores: float = 0.0,
+                    memory_requests_mi: float = 0.0) -> List[Dict[str, Any]]:
+    """Price every combination of the given dimensions, cheapest first
+
+    Costs are computed once per column: a per-node price for each (machine,
+    spot) pair, multiplied out by node count, then offset by the disk and
+    network cost. Phases only change the threshold status. A scenario "fits"
+    when the pool's total allocatable CPU and memory cover the requests
+    (an aggregate check; gke_binpacking.py does the per-pod packing).
+    """
+    unknown = [m for m in machine_types if m not in MACHINE_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown machine types: {', '.join(unknown)}")
+    thresholds = thresholds or DEFAULT_COST_THRESHOLDS
+    missing = [p for p in phases if p not in thresholds]
+    if missing:
+        raise ValueError(f"Unknown phases: {', '.join(missing)}")
+
+    # Column of per-node daily prices, one entry per (machine, spot) pair
+    pools = list(itertools.product(machine_types, spot))
+    node_daily = array("d", (
+        MACHINE_TYPES[m]["monthly_cost"] * (PREEMPTIBLE_DISCOUNT if s else 1.0) / 30
+        for m, s in pools))
+    counts = array("d", node_counts)
+    disk_daily = array("d", (gb * DISK_GB_MONTHLY_COST / 30 for gb in disk_sizes_gb))
+
+    # Broadcast to the (pool, count, disk) grid
+    node_cost = array("d", (price * n for price in node_daily for n in counts))
+    total = array("d", (c + d + NETWORK_DAILY_COST
+                        for c in node_cost for d in disk_daily))
+    daily = array("d", (round(t, 2) for t in total))
+    weekly = array("d", (round(t * 7, 2) for t in total))
+    monthly = array("d", (round(t * 30, 2) for t in total))
+
+    allocatable = {m: node_allocatable(m) for m in machine_types}
+    n_counts, n_disks = len(counts), len(disk_daily)
+
+    rows = []
+    for index, t in enumerate(total):
+        pool, rest = divmod(index, n_counts * n_disks)
+        count_index, disk_index = divmod(rest, n_disks)
+        machine_type, is_spot = pools[pool]
+        nodes = node_counts[count_index]
+        cpu, memory = allocatable[machine_type]
+        base = {
+            "machine_type": machine_type,
+            "node_count": nodes,
+            "spot": is_spot,
+            "disk_size_gb": disk_sizes_gb[disk_index],
+            "daily_cost": daily[index],
+            "weekly_cost": weekly[index],
+            "monthly_cost": monthly[index],
+            "node_cost": round(node_cost[pool * n_counts + count_index], 2),
+            "fits": (cpu * nodes >= cpu_requests_millicores
+                     and memory * nodes >= memory_requests_mi),
+            "_total": t,
+        }
+        for phase in phases:
+            rows.append(dict(base, phase=phase, status=_status(
+                daily[index], weekly[index], monthly[index], thresholds[phase])))
+
+    rows.sort(key=lambda r: (not r["fits"], r["_total"], STATUS_RANK[r["status"]]))
+    for rank, row in enumerate(rows, 1):
+        del row["_total"]
+        row["rank"] = rank
+    return rows
+
+
+def compare(scenarios: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Price a hand-picked list of scenarios, cheapest first"""
+    rows = []
+    for scenario in scenarios:
+        rows.extend(price_scenarios(
+            [scenario["machine_type"]], [scenario["node_count"]],
+            spot=[scenario.get("spot", False)],
+            disk_sizes_gb=[scenario.get("disk_size_gb", 20)],
+            phases=[scenario.get("phase", "development")]))
+    rows.sort(key=lambda r: r["daily_cost"])
+    for rank, row in enumerate(rows, 1):
+        row["rank"] = rank
+    return rows
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Price GKE cluster configurations")
+    parser.add_argument("--machine-types", nargs="+",
+                        default=["e2-medium", "e2-standard-2", "e2-standard-4"])
+    parser.add_argument("--nodes", nargs="+", type=int, default=[1, 2, 3])
+    parser.add_argument("--spot", choices=["on", "off", "both"], default="both")
+    parser.add_argument("--disk", nargs="+", type=float, default=[20])
+    parser.add_argument("--phase", nargs="+", default=["development"])
+    parser.add_argument("--cpu", default="0", help="Workload CPU requests, e.g. 1500m")
+    parser.add_argument("--memory", default="0",
+                        help="Workload memory requests, e.g. 4Gi")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    print("🔮 GKE What-If Cost Engine")
+    print("=" * 50)
+
+    spot = {"on": [True], "off": [False], "both": [False, True]}[args.spot]
+    try:
+        rows = price_scenarios(args.machine_types, args.nodes, spot, args.disk,
+                               args.phase,
+                               cpu_requests_millicores=parse_cpu_millicores(args.cpu),
+                               memory_requests_mi=parse_memory_mi(args.memory))
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    if args.json:
+        print(json.dumps(rows[:args.top], indent=2))
+        return 0
+
+    emoji = {"healthy": "✅", "warning": "⚠️", "critical": "🚨"}
+    print(f"📊 {len(rows)} scenarios priced, cheapest first:")
+    for row in rows[:args.top]:
+        pool = (f"{'spot ' if row['spot'] else ''}{row['machine_type']} "
+                f"x{row['node_count']}")
+        print(f"{row['rank']:>4}. {pool:<26} {row['disk_size_gb']:>5.0f} GB  "
+              f"${row['daily_cost']:>6.2f}/day  ${row['monthly_cost']:>8.2f}/month  "
+              f"{emoji[row['status']]} {row['phase']}"
+              f"{'' if row['fits'] else '  (does not fit requests)'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,32 +4,33 @@
 Generates deploy-ghostbusters.sh from the project model registry template
 """
 
-import json
 import os
 import sys
-import hashlib
 from pathlib import Path
 
+# Shared registry helpers live at the repository root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from gke_model_registry import (  # noqa: E402
+    DEPLOY_TEMPLATE_PATH,
+    SubtreeHasher,
+    load_or_exit,
+    to_pointer,
+)
+
+MODEL_PATH = Path(__file__).parent.parent.parent / "project_model_registry.json"
+
+# The only parts of the model the generated script depends on
+SOURCE_SUBTREES = (DEPLOY_TEMPLATE_PATH,)
+
 def load_project_model():
-    """Load the project model registry"""
-    model_path = Path(__file__).parent.parent.parent / "project_model_registry.json"
-    
-    if not model_path.exists():
-        print(f"❌ Project model registry not found at: {model_path}")
-        sys.exit(1)
-    
-    try:
-        with open(model_path, 'r') as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"❌ Failed to parse project model registry: {e}")
-        sys.exit(1)
+    """Load the project model registry (parsed once per change of the file)"""
+    return load_or_exit((), MODEL_PATH)
+
 
-def calculate_model_hash(model):
-    """Calculate a hash of the model for version tracking"""
-    # Create a stable representation of the model
-    model_str = json.dumps(model, sort_keys=True, indent=2)
-    return hashlib.sha256(model_str.encode()).hexdigest()[:16]
+def calculate_model_hash(model, subtrees=SOURCE_SUBTREES):
+    """Calculate a hash of the model subtrees the script is generated from"""
+    # Merkle hash: edits elsewhere in the model leave it unchanged
+    return SubtreeHasher(model).version(subtrees)
 
 
 def extract_deploy_template(model):
@@ -93,6 +94,7 @@ def generate_script(template_data, model_hash):
 # GKE Hackathon Implementation
 #
 # MODEL VERSION: {model_hash}
+# MODEL SUBTREES: {", ".join(to_pointer(keys) for keys in SOURCE_SUBTREES)}
 # GENERATED FROM: project_model_registry.json
 # GENERATION TIMESTAMP: {__import__("datetime").datetime.now().isoformat()}
 #
@@ -122,8 +124,30 @@ def generate_script(template_data, model_hash):
     
     # Replace the existing header
     script_content = script_content.replace(
-        '# 🚀 Ghostbusters AI Microservices Deployment Script\n# GKE Hackathon Implementation\n#\n# Dependencies:\n# - gcloud CLI ( \
-    Google Cloud SDK)\n# - kubectl (Kubernetes CLI) - install via: gcloud components install kubectl --quiet\n# - Note: Docker not required for GKE deployment (only needed for local container builds)\n#\n# Prerequisites:\n# - GCP project created and configured\n# - Required APIs enabled\n# - User authenticated and authorized\n#\n# Note: This script uses cost-effective GKE approaches:\n# - IPv4 stack type (no advanced datapath costs)\n# - Simplified cluster creation with essential flags only\n# - Accepts kubelet readonly port deprecation warnings (expected behavior)\n# - See Google docs: https://cloud.google.com/kubernetes-engine/docs/deprecations\n#\n# See GKE_DEPLOYMENT_DEPENDENCIES.md for detailed setup instructions\n\n',
+        '# 🚀 Ghostbusters AI Microservices Deployment Script\n'
+        '# GKE Hackathon Implementation\n'
+        '#\n'
+        '# Dependencies:\n'
+        '# - gcloud CLI (Google Cloud SDK)\n'
+        '# - kubectl (Kubernetes CLI) - install via: gcloud components install'
+        ' kubectl --quiet\n'
+        '# - Note: Docker not required for GKE deployment (only needed for local'
+        ' container builds)\n'
+        '#\n'
+        '# Prerequisites:\n'
+        '# - GCP project created and configured\n'
+        '# - Required APIs enabled\n'
+        '# - User authenticated and authorized\n'
+        '#\n'
+        '# Note: This script uses cost-effective GKE approaches:\n'
+        '# - IPv4 stack type (no advanced datapath costs)\n'
+        '# - Simplified cluster creation with essential flags only\n'
+        '# - Accepts kubelet readonly port deprecation warnings (expected behavior)\n'
+        '# - See Google docs:'
+        ' https://cloud.google.com/kubernetes-engine/docs/deprecations\n'
+        '#\n'
+        '# See GKE_DEPLOYMENT_DEPENDENCIES.md for detailed setup instructions\n'
+        '\n',
         version_header
     )
     
@@ -4,38 +4,20 @@
 Generates teardown-gcp-project.sh from the project model registry template
 """
 
-import json
 import os
 import sys
 from pathlib import Path
 
-def load_project_model():
-    """Load the project model registry"""
-    model_path = Path(__file__).parent.parent.parent / "project_model_registry.json"
-    
-    if not model_path.exists():
-        print(f"❌ Project model registry not found at: {model_path}")
-        sys.exit(1)
-    
-    try:
-        with open(model_path, 'r') as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"❌ Failed to parse project model registry: {e}")
-        sys.exit(1)
+# Shared registry helpers live at the repository root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from gke_model_registry import GCP_SETUP_PATH, load_or_exit  # noqa: E402
+
+MODEL_PATH = Path(__file__).parent.parent.parent / "project_model_registry.json"
 
-def extract_teardown_template(model):
-    """Extract the teardown script template from the GKE hackathon configuration"""
-    try:
-        # Navigate to the GKE hackathon configuration
-        hackathon_config = model['domains']['hackathon']['hackathon_mapping']['gke_turns_10']
-        teardown_template = hackathon_config['gcp_project_setup']['teardown_template']
-        return teardown_template
-    except KeyError as e:
-        print(f"❌ Failed to extract teardown template: {e}")
-        available_keys = list(model.keys()) if 'domains' in model else "No domains"
-        print("Available keys:", available_keys)
-        sys.exit(1)
+
+def extract_teardown_template():
+    """Load only the teardown script template from the GKE hackathon configuration"""
+    return load_or_exit(GCP_SETUP_PATH + ("teardown_template",), MODEL_PATH)
 
 def generate_script(template_data):
     """Generate the script from the template and variables"""
@@ -136,14 +118,9 @@ def main():
     print("=========================================")
     print("")
     
-    # Load project model
-    print("📖 Loading project model registry...")
-    model = load_project_model()
-    print("✅ Project model loaded successfully")
-    
-    # Extract teardown template
-    print("🔍 Extracting teardown template...")
-    template_data = extract_teardown_template(model)
+    # Extract teardown template (only that subtree of the model is parsed)
+    print("🔍 Extracting teardown template from project model registry...")
+    template_data = extract_teardown_template()
     print("✅ Teardown template extracted")
     
     # Generate script
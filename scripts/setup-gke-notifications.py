@@ -10,32 +10,16 @@ import sys
 from pathlib import Path
 from typing import Dict, Any
 
+# Shared registry helpers live at the repository root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from gke_model_registry import GCP_SETUP_PATH, load_or_exit  # noqa: E402
 
-def load_project_model():
-    """Load the project model registry"""
-    model_path = Path(__file__).parent.parent.parent / "project_model_registry.json"
-    
-    if not model_path.exists():
-        print(f"❌ Project model registry not found at: {model_path}")
-        sys.exit(1)
-    
-    try:
-        with open(model_path, 'r') as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"❌ Failed to parse project model registry: {e}")
-        sys.exit(1)
+MODEL_PATH = Path(__file__).parent.parent.parent / "project_model_registry.json"
 
 
 def get_project_config():
-    """Get GKE project configuration from model"""
-    try:
-        hackathon_config = model['domains']['hackathon']['hackathon_mapping']['gke_turns_10']
-        gcp_setup = hackathon_config['gcp_project_setup']
-        return gcp_setup
-    except KeyError as e:
-        print(f"❌ Failed to extract GKE configuration: {e}")
-        sys.exit(1)
+    """Get GKE project configuration from model (only that subtree is parsed)"""
+    return load_or_exit(GCP_SETUP_PATH, MODEL_PATH)
 
 
 def enable_required_apis(project_id: str):
@@ -417,7 +401,6 @@ def main():
     
     # Load project model
     print("📖 Loading project configuration...")
-    model = load_project_model()
     gcp_config = get_project_config()
     
     project_id = gcp_config['deploy_template']['variables']['project_id']
@@ -2,34 +2,118 @@
 """
 🔄 Deployment State Updater
 Updates the deployment state in the project model registry based on current GKE cluster status
+
+Run once, or with --watch to keep deployment_state current from watches on
+the tracked namespaces, with debounced, coalesced registry writes.
 """
 
+import argparse
 import json
+import os
+import queue
 import subprocess
 import sys
+import tempfile
+import threading
+import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+# Shared cluster helpers live at the repository root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from gke_cost_monitor import (  # noqa: E402
+    DEFAULT_COST_THRESHOLDS,
+    attribute_costs,
+    collect_cluster_usage,
+    collect_node_filesystems,
+    compute_utilization,
+    node_pool_costs,
+    parse_k8s_timestamp,
+    run_kubectl_parallel,
+)
+from gke_deployment_history import (  # noqa: E402
+    DEFAULT_HISTORY_PATH,
+    DeploymentHistory,
+)
+from gke_kubectl import (  # noqa: E402
+    ListExpired,
+    consume_list,
+    list_with_version,
+    namespaced_path,
+    use_kubeconfig,
+    watch_events,
+)
+from gke_model_registry import (  # noqa: E402
+    DEPLOYMENT_STATE_PATH,
+    DEPLOYMENT_STATES_PATH,
+    load_or_exit,
+    update_subtrees,
+)
+
+MODEL_PATH = Path(__file__).parent.parent.parent / "project_model_registry.json"
+# Service status transitions, where gke_deployment_history.py reads them
+HISTORY_PATH = DEFAULT_HISTORY_PATH
+
+# The only kinds the classifier reads, and the namespaces it reads them in
+# (system services need no Service join)
+WATCHED_KINDS = {
+    "Deployment": ("/apis/apps/v1", "deployments"),
+    "Service": ("/api/v1", "services"),
+    "DaemonSet": ("/apis/apps/v1", "daemonsets"),
+    "StatefulSet": ("/apis/apps/v1", "statefulsets"),
+}
+WATCHED_NAMESPACES = {
+    "ghostbusters-ai": ("Deployment", "Service"),
+    "kube-system": ("Deployment",),
+    # Google Managed Prometheus: operator and rule-evaluator deployments,
+    # collector daemonset, alertmanager statefulset
+    "gmp-system": ("Deployment", "DaemonSet", "StatefulSet"),
+}
+MONITORING_NAMESPACE = "gmp-system"
+SERVICE_TYPE_RANK = {"ClusterIP": 0, "NodePort": 1, "LoadBalancer": 2,
+                     "ExternalName": -1}
+# (ready, desired) status fields of each workload kind
+READY_FIELDS = {
+    "Deployment": ("readyReplicas", "replicas"),
+    "StatefulSet": ("readyReplicas", "replicas"),
+    "DaemonSet": ("numberReady", "desiredNumberScheduled"),
+}
+
+# Phase whose thresholds set the budget in cost_tracking
+COST_PHASE = "development"
+
+# Watch mode: write at most once per interval, once events have settled;
+# cluster status and usage are polled (they have no watch)
+WRITE_INTERVAL_SECONDS = 30.0
+SETTLE_SECONDS = 2.0
+USAGE_INTERVAL_SECONDS = 300.0
+WATCH_RETRY_SECONDS = 5.0
 
 
 def load_project_model():
-    """Load the project model registry"""
-    model_path = Path(__file__).parent.parent.parent / "project_model_registry.json"
-    
-    if not model_path.exists():
-        print(f"❌ Project model registry not found at: {model_path}")
-        sys.exit(1)
-    
-    try:
-        with open(model_path, 'r') as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"❌ Failed to parse project model registry: {e}")
-        sys.exit(1)
+    """Load the project model registry (parsed once per change of the file)"""
+    return load_or_exit((), MODEL_PATH)
 
 
-def get_gke_cluster_status(project_id: str) -> Dict[str, Any]:
-    """Get current GKE cluster status"""
+def _cluster_status(cluster: Dict[str, Any]) -> Dict[str, Any]:
+    """Status fields of one cluster as `gcloud container clusters list` reports it"""
+    pool_config = (cluster.get("nodePools") or [{}])[0].get("config", {})
+    return {
+        "name": cluster.get("name"),
+        "status": cluster.get("status"),
+        "version": cluster.get("currentMasterVersion"),
+        "node_count": cluster.get("currentNodeCount", 0),
+        "location": cluster.get("location"),
+        "machine_type": pool_config.get("machineType", "unknown"),
+        "disk_size_gb": pool_config.get("diskSizeGb", 20),
+        "preemptible": (pool_config.get("preemptible", False)
+                        or pool_config.get("spot", False))
+    }
+
+
+def get_gke_cluster_statuses(project_id: str) -> Dict[str, Any]:
+    """Get the status of every GKE cluster in the project"""
     try:
         # Get cluster info
         result = subprocess.run([
@@ -42,129 +126,332 @@ def get_gke_cluster_status(project_id: str) -> Dict[str, Any]:
         if not clusters:
             return {"error": "No clusters found"}
         
-        cluster = clusters[0]  # Assuming single cluster
-        return {
-            "name": cluster.get("name"),
-            "status": cluster.get("status"),
-            "version": cluster.get("currentMasterVersion"),
-            "node_count": cluster.get("currentNodeCount", 0),
-            "location": cluster.get("location")
-        }
+        return {"clusters": [_cluster_status(cluster) for cluster in clusters]}
     except subprocess.CalledProcessError as e:
         return {"error": f"Failed to get cluster status: {e}"}
     except json.JSONDecodeError as e:
         return {"error": f"Failed to parse cluster info: {e}"}
 
 
+def get_gke_cluster_status(project_id: str,
+                           name: Optional[str] = None) -> Dict[str, Any]:
+    """Get current GKE cluster status (of the named cluster, else the first)"""
+    statuses = get_gke_cluster_statuses(project_id)
+    if "error" in statuses:
+        return statuses
+    for status in statuses["clusters"]:
+        if name is None or status["name"] == name:
+            return status
+    return {"error": f"Cluster {name} not found"}
+
+
+def primary_cluster(clusters: List[Dict[str, Any]], variables: Dict[str, Any]) -> str:
+    """Cluster mirrored into deployment_state: the configured one, else the first"""
+    names = [cluster["name"] for cluster in clusters]
+    configured = variables.get("cluster_name")
+    return configured if configured in names else names[0]
+
+
+def cluster_credentials(project_id: str, cluster_status: Dict[str, Any],
+                        directory: Path) -> Path:
+    """Kubeconfig file holding only this cluster's credentials"""
+    path = directory / (f"{cluster_status['name']}.{cluster_status['location']}"
+                        ".kubeconfig")
+    subprocess.run([
+        'gcloud', 'container', 'clusters', 'get-credentials', cluster_status['name'],
+        '--location', cluster_status['location'],
+        '--project', project_id
+    ], capture_output=True, text=True, check=True,
+        env=dict(os.environ, KUBECONFIG=str(path)))
+    return path
+
+
+def collect_cluster(project_id: str, cluster_status: Dict[str, Any],
+                    directory: Path) -> Dict[str, Any]:
+    """Resources and usage of one cluster, read through its own kubeconfig"""
+    try:
+        kubeconfig = cluster_credentials(project_id, cluster_status, directory)
+    except subprocess.CalledProcessError as e:
+        return {"error": f"Failed to get credentials for {cluster_status['name']}: {e}"}
+    with use_kubeconfig(kubeconfig):
+        return run_kubectl_parallel({
+            "k8s_resources": get_k8s_resources,
+            "usage": collect_usage,
+        })
+
+
+def collect_clusters(project_id: str,
+                     clusters: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """collect_cluster() of every cluster, all at once, keyed by cluster name
+
+    Each cluster's listings run in its own context with its own kubeconfig,
+    so an update takes about as long as the slowest cluster.
+    """
+    with tempfile.TemporaryDirectory(prefix="gke-credentials-") as directory:
+        return run_kubectl_parallel({
+            status["name"]: lambda status=status: collect_cluster(
+                project_id, status, Path(directory))
+            for status in clusters
+        })
+
+
+def _keep_fields(kind: str
+                 ) -> Callable[[Iterator[Dict[str, Any]]], List[Dict[str, Any]]]:
+    """Consumer reducing each listed object to the fields the classifier reads"""
+    def keep(items: Iterator[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        kept = []
+        for item in items:
+            metadata = item.get("metadata", {})
+            spec = item.get("spec", {})
+            if kind == "Service":
+                spec = {k: spec[k] for k in ("selector", "ports", "type") if k in spec}
+            else:
+                labels = spec.get("template", {}).get("metadata", {}).get("labels", {})
+                spec = {"template": {"metadata": {"labels": labels}}}
+            kept.append({
+                "kind": kind,
+                "metadata": {k: metadata[k] for k in
+                             ("name", "namespace", "labels", "creationTimestamp")
+                             if k in metadata},
+                "spec": spec,
+                "status": {k: item["status"][k] for k in READY_FIELDS.get(kind, ())
+                           if k in item.get("status", {})},
+            })
+        return kept
+    return keep
+
+
 def get_k8s_resources() -> Dict[str, Any]:
     """Get current Kubernetes resources status"""
     try:
-        # Get all resources
-        result = subprocess.run([
-            'kubectl', 'get', 'all', '--all-namespaces',
-            '--output', 'json'
-        ], capture_output=True, text=True, check=True)
-        
-        resources = json.loads(result.stdout)
-        return resources
+        # One scoped, paginated listing per (namespace, kind) the classifier
+        # reads, all in flight at once
+        queries = {
+            (namespace, kind): lambda namespace=namespace, kind=kind: consume_list(
+                namespaced_path(*WATCHED_KINDS[kind], namespace), _keep_fields(kind))
+            for namespace, kinds in WATCHED_NAMESPACES.items() for kind in kinds
+        }
+        results = run_kubectl_parallel(queries)
+        return {"items": [item for listing in results.values() for item in listing]}
     except subprocess.CalledProcessError as e:
         return {"error": f"Failed to get k8s resources: {e}"}
+    except ListExpired as e:
+        return {"error": f"Resource listing kept expiring: {e}"}
     except json.JSONDecodeError as e:
         return {"error": f"Failed to parse k8s resources: {e}"}
 
 
-def parse_deployed_services(resources: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Parse deployed services from kubectl output"""
-    services = []
-    
-    try:
-        # Parse deployments
-        for item in resources.get("items", []):
-            if item.get("kind") == "Deployment":
-                metadata = item.get("metadata", {})
-                status = item.get("status", {})
-                
-                service_info = {
-                    "name": metadata.get("name"),
-                    "namespace": metadata.get("namespace"),
-                    "status": "Unknown",
-                    "ready_pods": status.get("readyReplicas", 0),
-                    "total_pods": status.get("replicas", 0),
-                    "age": "unknown",
-                    "service_type": "ClusterIP",
-                    "ports": [8080, 9090]  # Default ports
-                }
-                
-                # Determine status
-                if service_info["ready_pods"] == service_info["total_pods"]:
-                    service_info["status"] = "Running"
-                elif service_info["ready_pods"] > 0:
-                    service_info["status"] = "Mixed"
-                else:
-                    service_info["status"] = "Pending"
-                
-                services.append(service_info)
-        
-        # Filter for ghostbusters services
-        ghostbusters_services = [
-            s for s in services 
-            if s["namespace"] == "ghostbusters-ai" and "ghostbusters" in s["name"]
-        ]
-        
-        return ghostbusters_services
-        
-    except Exception as e:
-        print(f"⚠️  Warning: Failed to parse services: {e}")
-        return []
+def format_age(created: Optional[str], now: Optional[datetime] = None) -> str:
+    """Age of an object from its creationTimestamp, as kubectl shows it"""
+    created_at = parse_k8s_timestamp(created)
+    if created_at is None:
+        return "unknown"
+    seconds = int(((now or datetime.now(timezone.utc)) - created_at).total_seconds())
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{seconds // size}{unit}"
+    return f"{max(seconds, 0)}s"
 
 
-def parse_system_services(resources: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Parse system services from kubectl output"""
-    system_services = []
-    
+def _rollout_status(ready: int, total: int) -> str:
+    """Running, Mixed or Pending from ready and desired replicas"""
+    if ready == total:
+        return "Running"
+    if ready > 0:
+        return "Mixed"
+    return "Pending"
+
+
+def classify_resources(resources: Dict[str, Any], now: Optional[datetime] = None
+                       ) -> Dict[str, List[Dict[str, Any]]]:
+    """Deployed and system services from one pass over the listed items
+
+    Items are indexed by kind and namespace, and deployments by each label
+    of their pod template. A Service is joined to the deployments whose
+    template labels include every pair of its selector by intersecting
+    those label index entries, so the whole join is linear in the items.
+    """
+    by_kind: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    template_index: Dict[Tuple[str, str, str], Set[int]] = {}
+    deployments: List[Dict[str, Any]] = []
+    for item in resources.get("items", []):
+        kind = item.get("kind")
+        namespace = item.get("metadata", {}).get("namespace")
+        by_kind.setdefault(kind, {}).setdefault(namespace, []).append(item)
+        if kind == "Deployment":
+            labels = item.get("spec", {}).get("template", {}).get("metadata", {}) \
+                .get("labels") or {}
+            for pair in labels.items():
+                template_index.setdefault((namespace,) + pair, set()).add(
+                    len(deployments))
+            deployments.append(item)
+
+    # Ports and type of the services selecting each deployment
+    exposed: Dict[int, Dict[str, Any]] = {}
+    for namespace, services in by_kind.get("Service", {}).items():
+        for service in services:
+            spec = service.get("spec", {})
+            selector = spec.get("selector") or {}
+            if not selector:
+                continue
+            candidates = sorted((template_index.get((namespace,) + pair, set())
+                                 for pair in selector.items()), key=len)
+            for index in set.intersection(*candidates):
+                entry = exposed.setdefault(index, {"ports": set(), "types": set()})
+                entry["ports"].update(p["port"] for p in spec.get("ports", [])
+                                      if "port" in p)
+                entry["types"].add(spec.get("type", "ClusterIP"))
+
+    classified: Dict[str, Any] = {"deployed_services": [], "system_services": [],
+                                  "monitoring_stack": {}}
+    for index, item in enumerate(deployments):
+        metadata = item.get("metadata", {})
+        status = item.get("status", {})
+        namespace = metadata.get("namespace")
+        name = metadata.get("name") or ""
+        service_info = {
+            "name": name,
+            "namespace": namespace,
+            "status": "Unknown",
+            "ready_pods": status.get("readyReplicas", 0),
+            "total_pods": status.get("replicas", 0),
+            "age": format_age(metadata.get("creationTimestamp"), now),
+        }
+        service_info["status"] = _rollout_status(service_info["ready_pods"],
+                                                 service_info["total_pods"])
+
+        if namespace == "kube-system":
+            classified["system_services"].append(service_info)
+        elif namespace == "ghostbusters-ai" and "ghostbusters" in name:
+            entry = exposed.get(index)
+            # The most exposed type wins when several services select it
+            service_info["service_type"] = max(
+                entry["types"], key=lambda t: SERVICE_TYPE_RANK.get(t, 0)
+            ) if entry else None
+            service_info["ports"] = sorted(entry["ports"]) if entry else []
+            classified["deployed_services"].append(service_info)
+
+    # Monitoring components of every workload kind, from the same index
+    for kind, (ready_field, total_field) in READY_FIELDS.items():
+        for item in by_kind.get(kind, {}).get(MONITORING_NAMESPACE, []):
+            status = item.get("status", {})
+            ready, total = status.get(ready_field, 0), status.get(total_field, 0)
+            rollout = _rollout_status(ready, total)
+            classified["monitoring_stack"][item["metadata"].get("name")] = (
+                rollout if rollout == "Running"
+                else f"{rollout} ({ready}/{total} Running)")
+    classified["monitoring_stack"] = dict(
+        sorted(classified["monitoring_stack"].items()))
+    return classified
+
+
+def collect_usage() -> Dict[str, Any]:
+    """Pod status (requests, usage, per-node figures) and node filesystems
+
+    One collection of pods, nodes and metrics, shared by the utilization
+    and cost summaries.
+    """
     try:
-        # Parse deployments in kube-system namespace
-        for item in resources.get("items", []):
-            if (item.get("kind") == "Deployment" and 
-                item.get("metadata", {}).get("namespace") == "kube-system"):
-                
-                metadata = item.get("metadata", {})
-                status = item.get("status", {})
-                
-                service_info = {
-                    "name": metadata.get("name"),
-                    "namespace": "kube-system",
-                    "status": "Unknown",
-                    "ready_pods": status.get("readyReplicas", 0),
-                    "total_pods": status.get("replicas", 0),
-                    "age": "unknown"
-                }
-                
-                # Determine status
-                if service_info["ready_pods"] == service_info["total_pods"]:
-                    service_info["status"] = "Running"
-                elif service_info["ready_pods"] > 0:
-                    service_info["status"] = "Mixed"
-                else:
-                    service_info["status"] = "Pending"
-                
-                system_services.append(service_info)
-        
-        return system_services
-        
+        results = collect_cluster_usage()
+        pod_status = compute_utilization(
+            results["pods"]["items"],
+            results["pod_metrics"].get("items", []),
+            results["nodes"]["items"],
+            results["node_metrics"].get("items", []),
+            results["pods"]["counts"])
+        filesystems = collect_node_filesystems(
+            node["metadata"]["name"] for node in results["nodes"]["items"])
+        return {"pod_status": pod_status, "filesystems": filesystems}
     except Exception as e:
-        print(f"⚠️  Warning: Failed to parse system services: {e}")
-        return []
+        return {"error": f"Failed to collect resource usage: {e}"}
+
+
+def _share(part: float, whole: float) -> Any:
+    """Percentage rounded for the registry, "unknown" when nothing was measured"""
+    return round(part / whole * 100, 1) if whole > 0 else "unknown"
+
+
+def summarize_utilization(usage: Dict[str, Any]) -> Dict[str, Any]:
+    """resource_utilization of the deployment state"""
+    if "error" in usage:
+        return {"cpu_usage_percent": "unknown", "memory_usage_percent": "unknown",
+                "disk_usage_percent": "unknown"}
+    pod_status = usage["pod_status"]
+    pools = pod_status["by_pool"].values()
+    # Whole-node usage needs node metrics (metrics-server) for some node
+    measured = (pod_status["nodes_without_metrics"]
+                < len(pod_status["node_matrix"]["rows"]))
+    used_cpu = sum(p["used_cpu_millicores"] for p in pools)
+    used_memory = sum(p["used_memory_mi"] for p in pools)
+    used_disk = sum(used for used, _ in usage["filesystems"].values())
+    disk = sum(capacity for _, capacity in usage["filesystems"].values())
+    return {
+        "cpu_usage_percent": _share(used_cpu, pod_status["allocatable_cpu_millicores"])
+        if measured else "unknown",
+        "memory_usage_percent": _share(used_memory, pod_status["allocatable_memory_mi"])
+        if measured else "unknown",
+        "disk_usage_percent": _share(used_disk, disk),
+        "cpu_requested_percent": pod_status["cpu_allocated_percent"],
+        "memory_requested_percent": pod_status["memory_allocated_percent"],
+        "hot_nodes": list(pod_status.get("hot_nodes", [])),
+    }
+
+
+def summarize_costs(cluster_status: Dict[str, Any], usage: Dict[str, Any],
+                    previous: Dict[str, Any]) -> Dict[str, Any]:
+    """cost_tracking of the deployment state, with the trend since the last update"""
+    costs = node_pool_costs(
+        cluster_status.get("machine_type", "e2-micro"),
+        cluster_status.get("node_count", 0),
+        cluster_status.get("preemptible", False),
+        cluster_status.get("disk_size_gb", 20))
+    budget = DEFAULT_COST_THRESHOLDS[COST_PHASE]["monthly"]
+    monthly = costs["monthly_cost"]
+
+    last = previous.get("current_monthly_cost")
+    if not isinstance(last, (int, float)):
+        trend = "unknown"
+    elif abs(monthly - last) < 0.01:
+        trend = "stable"
+    else:
+        trend = "rising" if monthly > last else "falling"
+
+    tracking = {
+        "phase": COST_PHASE,
+        "current_daily_cost": costs["daily_cost"],
+        "current_monthly_cost": monthly,
+        "monthly_budget": budget,
+        "budget_remaining": round(budget - monthly, 2),
+        "within_budget": monthly <= budget,
+        "cost_trend": trend,
+    }
+    if "pod_status" in usage:
+        tracking["daily_cost_by_namespace"] = {
+            key[len("namespace/"):]: cost
+            for key, cost in attribute_costs(usage["pod_status"]).items()
+            if key.startswith("namespace/")}
+    return tracking
 
 
 def update_deployment_state(model: Dict[str, Any], cluster_status: Dict[str, Any], 
                            deployed_services: List[Dict[str, Any]], 
-                           system_services: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Update the deployment state in the model"""
+                           system_services: List[Dict[str, Any]],
+                           monitoring_stack: Optional[Dict[str, str]] = None,
+                           usage: Optional[Dict[str, Any]] = None,
+                           primary: bool = True) -> Dict[str, Any]:
+    """Update the cluster's deployment state in the model
+
+    Every cluster's state is kept under deployment_states by name; the
+    primary cluster's is also deployment_state, which the other scripts read.
+    """
     
     # Navigate to the deployment state section
     hackathon_config = model['domains']['hackathon']['hackathon_mapping']['gke_turns_10']
     gcp_setup = hackathon_config['gcp_project_setup']
+    cluster = cluster_status.get("name")
+    previous = gcp_setup.get("deployment_states", {}).get(cluster) or \
+        (gcp_setup.get("deployment_state", {}) if primary else {})
+    usage = usage if usage is not None else {"error": "Resource usage not collected"}
     
     # Create new deployment state
     current_time = datetime.now(timezone.utc).isoformat()
@@ -189,48 +476,352 @@ def update_deployment_state(model: Dict[str, Any], cluster_status: Dict[str, Any
         "deployment_timestamp": current_time,
         "deployed_services": deployed_services,
         "system_services": system_services,
-        "monitoring_stack": {
-            "gmp-operator": "Running",  # Default assumption
-            "collector": "Mixed (2/3 Running)",  # Default assumption
-            "alertmanager": "Pending"  # Default assumption
-        },
-        "resource_utilization": {
-            "cpu_usage_percent": "unknown",
-            "memory_usage_percent": "unknown",
-            "disk_usage_percent": "unknown"
-        },
-        "cost_tracking": {
-            "current_monthly_cost": "unknown",
-            "budget_remaining": "unknown",
-            "cost_trend": "unknown"
-        },
+        "monitoring_stack": monitoring_stack or {},
+        "resource_utilization": summarize_utilization(usage),
+        "cost_tracking": summarize_costs(
+            cluster_status, usage, previous.get("cost_tracking", {})),
         "last_updated": current_time,
         "deployment_health": health
     }
     
     # Update the model
-    gcp_setup["deployment_state"] = new_deployment_state
+    if cluster:
+        gcp_setup.setdefault("deployment_states", {})[cluster] = new_deployment_state
+    if primary:
+        gcp_setup["deployment_state"] = new_deployment_state
     
     return model
 
 
+def record_transitions(state: Dict[str, Any], path: Path = HISTORY_PATH,
+                       cluster: Optional[str] = None) -> None:
+    """Append the state's service status changes to the transition log"""
+    try:
+        changes = DeploymentHistory(path).record(state, scope=cluster)
+        if changes:
+            print(f"📜 Logged {changes} service status change(s): {path}")
+    except Exception as e:
+        print(f"⚠️  Failed to log service transitions: {e}")
+
+
+def write_states(model: Dict[str, Any], path: Path = MODEL_PATH) -> bool:
+    """Write deployment_states and deployment_state in one atomic write
+
+    True when the registry changed.
+    """
+    gcp_setup = model
+    for key in DEPLOYMENT_STATE_PATH[:-1]:
+        gcp_setup = gcp_setup[key]
+    return update_subtrees([(keys, gcp_setup[keys[-1]])
+                            for keys in (DEPLOYMENT_STATES_PATH, DEPLOYMENT_STATE_PATH)
+                            if keys[-1] in gcp_setup], path)
+
+
 def save_project_model(model: Dict[str, Any]):
-    """Save the updated project model registry"""
-    model_path = Path(__file__).parent.parent.parent / "project_model_registry.json"
-    
+    """Save the deployment states into the project model registry
+
+    Only the deployment_states and deployment_state subtrees are rewritten,
+    atomically, and only when they changed apart from their timestamps.
+    """
     try:
-        with open(model_path, 'w') as f:
-            json.dump(model, f, indent=2)
-        
-        print(f"✅ Updated project model registry: {model_path}")
+        if write_states(model):
+            print(f"✅ Updated project model registry: {MODEL_PATH}")
+        else:
+            print("⏭️  Deployment state unchanged; registry not rewritten: "
+                  f"{MODEL_PATH}")
+        states = model
+        for key in DEPLOYMENT_STATES_PATH:
+            states = states[key]
+        for cluster, state in states.items():
+            record_transitions(state, cluster=cluster)
         
     except Exception as e:
         print(f"❌ Failed to save model: {e}")
         sys.exit(1)
 
 
+class DeploymentStateReconciler:
+    """Keep deployment_state current from watches on the tracked namespaces
+
+    Every (namespace, kind) listing is listed once and then watched from its
+    resourceVersion by its own thread; the events land on one queue and only
+    the reconciler loop touches the object map. An event marks the state
+    dirty only when it changes a field the classifier reads, and dirty state
+    is written at most once per interval and only after events have settled,
+    so a rollout's burst of status updates becomes a single write.
+    update_subtrees() still skips the write when nothing but timestamps moved.
+    """
+
+    def __init__(self, model: Dict[str, Any], project_id: str,
+                 path: Path = MODEL_PATH, history_path: Path = HISTORY_PATH,
+                 cluster: Optional[str] = None, kubeconfig: Optional[Path] = None,
+                 interval_seconds: float = WRITE_INTERVAL_SECONDS,
+                 settle_seconds: float = SETTLE_SECONDS,
+                 usage_interval_seconds: float = USAGE_INTERVAL_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize the reconciler for a loaded model"""
+        self.model = model
+        self.project_id = project_id
+        self.path = path
+        self.history_path = history_path
+        self.cluster = cluster
+        self.kubeconfig = kubeconfig
+        self.interval_seconds = interval_seconds
+        self.settle_seconds = settle_seconds
+        self.usage_interval_seconds = usage_interval_seconds
+        self.clock = clock
+
+        self.objects: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        # Listings not yet synced; nothing is written before all have been,
+        # nor before a cluster status has been fetched
+        self.unsynced: Set[Tuple[str, str]] = {
+            (namespace, kind) for namespace, kinds in WATCHED_NAMESPACES.items()
+            for kind in kinds}
+        self.cluster_status: Dict[str, Any] = {}
+        self.usage: Dict[str, Any] = {"error": "Resource usage not collected"}
+        self.writes = 0
+        self.events: "queue.Queue[Tuple[str, str, Any]]" = queue.Queue()
+
+        self._dirty_since: Optional[float] = None
+        self._last_write = float("-inf")
+        self._last_poll = float("-inf")
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    @staticmethod
+    def _key(kind: str, item: Dict[str, Any]) -> Tuple[str, str, str]:
+        """Object map key of a kept item"""
+        metadata = item["metadata"]
+        return kind, metadata.get("namespace", ""), metadata.get("name", "")
+
+    def _mark_dirty(self) -> None:
+        """Start the settle timer unless a write is already pending"""
+        if self._dirty_since is None:
+            self._dirty_since = self.clock()
+
+    @property
+    def dirty(self) -> bool:
+        """Whether a write is pending"""
+        return self._dirty_since is not None
+
+    def write_due(self) -> Optional[float]:
+        """Clock time of the pending write, or None when there is nothing to write"""
+        if self._dirty_since is None or self.unsynced or not self.cluster_status:
+            return None
+        return max(self._dirty_since + self.settle_seconds,
+                   self._last_write + self.interval_seconds)
+
+    def sync(self, namespace: str, kind: str, items: List[Dict[str, Any]]) -> None:
+        """Replace the objects of one listing with a fresh (re)list"""
+        self.unsynced.discard((namespace, kind))
+        fresh = {self._key(kind, item): item for item in items}
+        stale = [key for key in self.objects
+                 if key[:2] == (kind, namespace) and key not in fresh]
+        for key in stale:
+            del self.objects[key]
+        changed = bool(stale)
+        for key, item in fresh.items():
+            if self.objects.get(key) != item:
+                self.objects[key] = item
+                changed = True
+        if changed:
+            self._mark_dirty()
+
+    def apply(self, kind: str, event: Dict[str, Any]) -> bool:
+        """Apply one watch event; True when it changed what the classifier sees"""
+        if event.get("type") not in ("ADDED", "MODIFIED", "DELETED"):
+            return False
+        item = _keep_fields(kind)(iter([event.get("object", {})]))[0]
+        key = self._key(kind, item)
+        if event["type"] == "DELETED":
+            if self.objects.pop(key, None) is None:
+                return False
+        elif self.objects.get(key) == item:
+            return False
+        else:
+            self.objects[key] = item
+        self._mark_dirty()
+        return True
+
+    def poll_status(self) -> None:
+        """Refresh cluster status and usage, which have no watch"""
+        with use_kubeconfig(self.kubeconfig):
+            fetched = run_kubectl_parallel({
+                "cluster_status": lambda: get_gke_cluster_status(
+                    self.project_id, self.cluster),
+                "usage": collect_usage,
+            })
+        self._last_poll = self.clock()
+        if "error" in fetched["cluster_status"]:
+            print(f"⚠️  {fetched['cluster_status']['error']}; "
+                  "keeping last cluster status")
+        elif fetched["cluster_status"] != self.cluster_status:
+            self.cluster_status = fetched["cluster_status"]
+            self._mark_dirty()
+        if "error" in fetched["usage"]:
+            print(f"⚠️  {fetched['usage']['error']}; keeping last resource usage")
+        else:
+            self.usage = fetched["usage"]
+            self._mark_dirty()
+
+    def state(self) -> Dict[str, Any]:
+        """deployment_state for the objects and usage seen so far"""
+        classified = classify_resources({"items": list(self.objects.values())})
+        update_deployment_state(
+            self.model, self.cluster_status, classified["deployed_services"],
+            classified["system_services"], classified["monitoring_stack"], self.usage)
+        state = self.model
+        for key in DEPLOYMENT_STATE_PATH:
+            state = state[key]
+        return state
+
+    def flush(self, force: bool = False) -> bool:
+        """Write the pending state when it is due (or now, with force)"""
+        due = self.write_due()
+        if due is None or (not force and self.clock() < due):
+            return False
+        state = self.state()
+        try:
+            written = write_states(self.model, self.path)
+        except Exception as e:
+            print(f"❌ Failed to save deployment state: {e}")
+            return False
+        self._dirty_since = None
+        self._last_write = self.clock()
+        record_transitions(state, self.history_path, self.cluster)
+        if written:
+            self.writes += 1
+            print(f"💾 {datetime.now().strftime('%H:%M:%S')} "
+                  f"{state['deployment_health']}")
+        return written
+
+    def _watch(self, namespace: str, kind: str) -> None:
+        """List then watch one (namespace, kind), relisting when the watch expires"""
+        with use_kubeconfig(self.kubeconfig):
+            self._watch_listing(namespace, kind)
+
+    def _watch_listing(self, namespace: str, kind: str) -> None:
+        """Watch loop of one listing, in the reconciler's kubeconfig context"""
+        path = namespaced_path(*WATCHED_KINDS[kind], namespace)
+        while not self._stop.is_set():
+            try:
+                items, version = list_with_version(path, _keep_fields(kind))
+                self.events.put(("sync", kind, (namespace, items)))
+                while not self._stop.is_set():
+                    for event in watch_events(path, version):
+                        version = event.get("object", {}).get("metadata", {}) \
+                            .get("resourceVersion", version)
+                        if event.get("type") != "BOOKMARK":
+                            self.events.put(("event", kind, event))
+                        if self._stop.is_set():
+                            return
+            except ListExpired:
+                continue
+            except Exception as e:
+                print(f"⚠️  Watch on {namespace}/{kind} failed ({e}); retrying")
+                self._stop.wait(WATCH_RETRY_SECONDS)
+
+    def start(self) -> "DeploymentStateReconciler":
+        """Start one watch thread per tracked (namespace, kind)"""
+        self._stop.clear()
+        for namespace, kinds in WATCHED_NAMESPACES.items():
+            for kind in kinds:
+                thread = threading.Thread(target=self._watch, args=(namespace, kind),
+                                          name=f"watch-{namespace}-{kind}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def step(self, timeout: float) -> None:
+        """Drain queued events for up to timeout seconds, then write if due"""
+        try:
+            message, kind, payload = self.events.get(timeout=max(timeout, 0))
+            while True:
+                if message == "sync":
+                    self.sync(payload[0], kind, payload[1])
+                else:
+                    self.apply(kind, payload)
+                message, kind, payload = self.events.get_nowait()
+        except queue.Empty:
+            pass
+        self.flush()
+
+    def run(self) -> None:
+        """Reconcile until interrupted, writing any pending state on the way out"""
+        self.start()
+        try:
+            while not self._stop.is_set():
+                if self.clock() >= self._last_poll + self.usage_interval_seconds:
+                    self.poll_status()
+                due = self.write_due()
+                wake = self._last_poll + self.usage_interval_seconds
+                if due is not None:
+                    wake = min(wake, due)
+                self.step(wake - self.clock())
+        except KeyboardInterrupt:
+            print("\n🛑 Reconciler stopped by user")
+        finally:
+            self._stop.set()
+            self.flush(force=True)
+
+
+def watch(model: Dict[str, Any], project_id: str, cluster_status: Dict[str, Any],
+          interval_seconds: float) -> None:
+    """Run the reconciler for one cluster against the project model registry"""
+    print(f"👀 Watching {', '.join(WATCHED_NAMESPACES)} on {cluster_status['name']} "
+          f"(writes at most every {interval_seconds:g}s)")
+    with tempfile.TemporaryDirectory(prefix="gke-credentials-") as directory:
+        try:
+            kubeconfig = cluster_credentials(project_id, cluster_status,
+                                             Path(directory))
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Failed to get credentials for {cluster_status['name']}: {e}")
+            sys.exit(1)
+        DeploymentStateReconciler(model, project_id, cluster=cluster_status["name"],
+                                  kubeconfig=kubeconfig,
+                                  interval_seconds=interval_seconds).run()
+
+
+def print_summary(cluster_status: Dict[str, Any], state: Dict[str, Any]) -> None:
+    """Print one cluster's deployment state"""
+    deployed_services = state["deployed_services"]
+    print("")
+    print(f"📋 Deployment State Summary: {cluster_status['name']}")
+    print("=============================")
+    print(f"   🎯 Cluster: {cluster_status['name']} ({cluster_status['location']})")
+    print(f"   📍 Status: {cluster_status['status']}")
+    print(f"   🔢 Nodes: {cluster_status['node_count']}")
+    print(f"   🚀 Services: {len(deployed_services)} deployed")
+    print(f"   ⚙️  System Services: {len(state['system_services'])}")
+    utilization = state["resource_utilization"]
+    print(f"   📈 CPU/Memory/Disk: {utilization['cpu_usage_percent']}% / "
+          f"{utilization['memory_usage_percent']}% / "
+          f"{utilization['disk_usage_percent']}%")
+    print(f"   💰 Monthly cost: ${state['cost_tracking']['current_monthly_cost']} "
+          f"(${state['cost_tracking']['budget_remaining']} budget remaining)")
+    
+    # Show service status
+    if deployed_services:
+        print("")
+        print("   📊 Ghostbusters Services:")
+        for service in deployed_services:
+            status_emoji  = \
+     "✅" if service["status"] == "Running" else "⚠️" if service["status"] == "Mixed" else "❌"
+            print( \
+    f"      {status_emoji} {service['name']}: {service['status']} ({service['ready_pods']}/{service['total_pods']})")
+
+
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(
+        description="Update the deployment state in the model")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep reconciling the primary cluster from watches "
+                             "until interrupted")
+    parser.add_argument("--interval", type=float, default=WRITE_INTERVAL_SECONDS,
+                        help="Minimum seconds between registry writes in watch mode")
+    args = parser.parse_args()
+
     print("🔄 Deployment State Updater")
     print("============================")
     print("")
@@ -242,65 +833,70 @@ def main():
     
     # Get project ID from model
     hackathon_config = model['domains']['hackathon']['hackathon_mapping']['gke_turns_10']
-    project_id  = \
-     hackathon_config['gcp_project_setup']['deploy_template']['variables']['project_id']
-    
-    print(f"🔍 Getting GKE cluster status for project: {project_id}")
+    variables = hackathon_config['gcp_project_setup']['deploy_template']['variables']
+    project_id = variables['project_id']
     
-    # Get cluster status
-    cluster_status = get_gke_cluster_status(project_id)
-    if "error" in cluster_status:
-        print(f"❌ {cluster_status['error']}")
+    print(f"🔍 Getting GKE clusters for project: {project_id}")
+    statuses = get_gke_cluster_statuses(project_id)
+    if "error" in statuses:
+        print(f"❌ {statuses['error']}")
         sys.exit(1)
+    clusters = statuses["clusters"]
+    primary = primary_cluster(clusters, variables)
+    for cluster_status in clusters:
+        marker = " [primary]" if cluster_status["name"] == primary else ""
+        print(f"✅ Cluster status: {cluster_status['status']} "
+              f"({cluster_status['name']}, {cluster_status['location']}){marker}")
     
-    print(f"✅ Cluster status: {cluster_status['status']} ({cluster_status['name']})")
+    if args.watch:
+        watch(model, project_id,
+              next(c for c in clusters if c["name"] == primary), args.interval)
+        return
     
-    # Get Kubernetes resources
-    print("🔍 Getting Kubernetes resources...")
-    k8s_resources = get_k8s_resources()
-    if "error" in k8s_resources:
-        print(f"❌ {k8s_resources['error']}")
-        sys.exit(1)
-    
-    print("✅ Kubernetes resources retrieved")
+    # Every cluster at once, each with its own credentials
+    print("🔍 Getting Kubernetes resources and resource usage of "
+          f"{len(clusters)} cluster(s)...")
+    results = collect_clusters(project_id, clusters)
     
-    # Parse services
-    print("🔍 Parsing deployed services...")
-    deployed_services = parse_deployed_services(k8s_resources)
-    print(f"✅ Found {len(deployed_services)} ghostbusters services")
-    
-    print("🔍 Parsing system services...")
-    system_services = parse_system_services(k8s_resources)
-    print(f"✅ Found {len(system_services)} system services")
+    updated = []
+    for cluster_status in clusters:
+        name = cluster_status["name"]
+        fetched = results[name]
+        error = fetched.get("error") or fetched["k8s_resources"].get("error")
+        if error:
+            print(f"❌ {name}: {error}")
+            continue
+        
+        # Classify services in one pass
+        classified = classify_resources(fetched["k8s_resources"])
+        print(f"✅ {name}: {len(classified['deployed_services'])} "
+              "ghostbusters services, "
+              f"{len(classified['system_services'])} system services, "
+              f"{len(classified['monitoring_stack'])} monitoring components")
+        if "error" in fetched["usage"]:
+            print(f"⚠️  {name}: {fetched['usage']['error']}; utilization left unknown")
+        
+        update_deployment_state(
+            model, cluster_status, classified["deployed_services"],
+            classified["system_services"], classified["monitoring_stack"],
+            fetched["usage"], primary=name == primary
+        )
+        updated.append(cluster_status)
     
-    # Update model
-    print("🔧 Updating deployment state in model...")
-    updated_model = update_deployment_state(
-        model, cluster_status, deployed_services, system_services
-    )
+    if not updated:
+        print("❌ No cluster could be read")
+        sys.exit(1)
+    if primary not in {c["name"] for c in updated}:
+        print(f"⚠️  Primary cluster {primary} could not be read; "
+              "deployment_state left as is")
     
     # Save updated model
     print("💾 Saving updated model...")
-    save_project_model(updated_model)
+    save_project_model(model)
     
-    print("")
-    print("📋 Deployment State Summary:")
-    print("=============================")
-    print(f"   🎯 Cluster: {cluster_status['name']}")
-    print(f"   📍 Status: {cluster_status['status']}")
-    print(f"   🔢 Nodes: {cluster_status['node_count']}")
-    print(f"   🚀 Services: {len(deployed_services)} deployed")
-    print(f"   ⚙️  System Services: {len(system_services)}")
-    
-    # Show service status
-    if deployed_services:
-        print("")
-        print("   📊 Ghostbusters Services:")
-        for service in deployed_services:
-            status_emoji  = \
-     "✅" if service["status"] == "Running" else "⚠️" if service["status"] == "Mixed" else "❌"
-            print( \
-    f"      {status_emoji} {service['name']}: {service['status']} ({service['ready_pods']}/{service['total_pods']})")
+    states = hackathon_config['gcp_project_setup']['deployment_states']
+    for cluster_status in updated:
+        print_summary(cluster_status, states[cluster_status["name"]])
     
     print("")
     print("🎉 Deployment state updated successfully!")
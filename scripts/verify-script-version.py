@@ -10,29 +10,34 @@ import re
 import sys
 from pathlib import Path
 
+# Shared registry helpers live at the repository root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from gke_model_registry import (  # noqa: E402
+    load_or_exit,
+    parse_pointer,
+    subtree_version,
+    to_pointer,
+)
+
+MODEL_PATH = Path(__file__).parent.parent.parent / "project_model_registry.json"
+
 
 def load_project_model():
-    """Load the project model registry"""
-    model_path = Path(__file__).parent.parent.parent / "project_model_registry.json"
-    
-    if not model_path.exists():
-        print(f"❌ Project model registry not found at: {model_path}")
-        sys.exit(1)
-    
-    try:
-        with open(model_path, 'r') as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"❌ Failed to parse project model registry: {e}")
-        sys.exit(1)
+    """Load the project model registry (parsed once per change of the file)"""
+    return load_or_exit((), MODEL_PATH)
 
 
 def calculate_model_hash(model):
-    """Calculate a hash of the model for version tracking"""
+    """Calculate a hash of the whole model (scripts stamped before subtree versions)"""
     model_str = json.dumps(model, sort_keys=True, indent=2)
     return hashlib.sha256(model_str.encode()).hexdigest()[:16]
 
 
+def calculate_subtree_hash(subtrees):
+    """Calculate the hash of the model subtrees a script was generated from"""
+    return subtree_version(subtrees, MODEL_PATH)
+
+
 def extract_script_version(script_path):
     """Extract the model version from a generated script"""
     try:
@@ -50,6 +55,24 @@ def extract_script_version(script_path):
         return None
 
 
+def extract_script_subtrees(script_path):
+    """Extract the model subtrees a script was generated from (None if not stamped)"""
+    try:
+        with open(script_path, 'r') as f:
+            content = f.read()
+        
+        # Look for MODEL SUBTREES line
+        match = re.search(r'MODEL SUBTREES: (.+)', content)
+        if match:
+            return [parse_pointer(pointer.strip())
+                    for pointer in match.group(1).split(",")]
+        else:
+            return None
+    except Exception as e:
+        print(f"❌ Failed to read script: {e}")
+        return None
+
+
 def verify_script_version(script_path, current_hash):
     """Verify that a script matches the current model version"""
     script_hash = extract_script_version(script_path)
@@ -86,10 +109,14 @@ def main():
     print("==============================")
     print("")
     
-    # Load current model
-    print("📖 Loading current project model...")
-    model = load_project_model()
-    current_hash = calculate_model_hash(model)
+    # Hash only the subtrees the script was generated from
+    subtrees = extract_script_subtrees(script_path)
+    if subtrees:
+        print(f"📖 Loading model subtrees: {', '.join(map(to_pointer, subtrees))}")
+        current_hash = calculate_subtree_hash(subtrees)
+    else:
+        print("📖 Loading current project model (script predates subtree versions)...")
+        current_hash = calculate_model_hash(load_project_model())
     print(f"✅ Current model hash: {current_hash}")
     
     # Verify script version
@@ -0,0 +1,92 @@
+"""
+Object builders shared by the test modules
+"""
+
+import importlib.util
+import json
+from pathlib import Path
+
+from gke_cost_monitor import MonitorSnapshot, freeze
+
+SCRIPTS = Path(__file__).parent.parent / "scripts"
+
+
+def make_pod(name, namespace="ghostbusters-ai", node="node-a", phase="Running",
+             cpu="100m", memory="128Mi", owner=None):
+    """Build a minimal pod object"""
+    metadata = {"name": name, "namespace": namespace, "labels": {}}
+    if owner:
+        metadata["ownerReferences"] = [{"kind": "ReplicaSet", "name": f"{owner}-abc12"}]
+        metadata["labels"]["pod-template-hash"] = "abc12"
+    return {
+        "metadata": metadata,
+        "spec": {
+            "nodeName": node,
+            "containers": [{"resources": {"requests": {"cpu": cpu, "memory": memory}}}],
+        },
+        "status": {"phase": phase},
+    }
+
+
+def make_metrics(name, cpu, memory, namespace="ghostbusters-ai"):
+    """Build a PodMetrics item"""
+    return {
+        "metadata": {"name": name, "namespace": namespace},
+        "containers": [{"usage": {"cpu": cpu, "memory": memory}}],
+    }
+
+
+NODES = [{
+    "metadata": {"name": "node-a"},
+    "status": {"allocatable": {"cpu": "940m", "memory": "2869Mi"}},
+}]
+
+
+def make_model(state=None):
+    """Registry with a deployment state and unrelated neighbours"""
+    setup = {"deploy_template": {"variables": {"project_id": "demo-project"}},
+             "notes": "café ☕"}
+    if state is not None:
+        setup["deployment_state"] = state
+    return {
+        "domains": {
+            "other": {"items": list(range(5)), "flag": True},
+            "hackathon": {"hackathon_mapping": {"gke_turns_10": {
+                "gcp_project_setup": setup, "after": [{"x": None}]}}},
+        },
+        "version": "1.0",
+    }
+
+
+def write_registry(tmp_path, model):
+    """Write a registry the way the scripts always have"""
+    path = tmp_path / "project_model_registry.json"
+    with open(path, "w") as f:
+        json.dump(model, f, indent=2)
+    return path
+
+
+def make_snapshot(version, taken_at, daily_cost=0.3):
+    """Snapshot with canned values"""
+    costs = {"daily_cost": daily_cost, "weekly_cost": daily_cost * 7,
+             "monthly_cost": daily_cost * 30}
+    return MonitorSnapshot(
+        version=version, taken_at=taken_at, phase="development",
+        thresholds=freeze({"daily": 0.2}),
+        cluster_status=freeze({"node_count": 1}),
+        pod_status=freeze({"running_pods": 3, "cpu_utilization_percent": 40.0}),
+        costs=freeze(costs),
+        threshold_check=freeze({"status": "critical", "alerts": ["🚨 over"],
+                                "warnings": [], "within_budget": False}),
+        recommendations=("💡 Enable preemptible instances",) * 20,
+        cost_attribution=freeze({"namespace/ai": 0.25}),
+    )
+
+
+def load_script(name):
+    """Import a hyphenated script as a module"""
+    path = SCRIPTS / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,79 @@
+"""
+Tests for billing export ingestion and reconciliation
+"""
+
+import csv
+import gzip
+import json
+
+from gke_billing_ingest import BillingAggregator, iter_billing_chunks, reconcile
+
+ROWS = [
+    {"service": {"description": "Compute Engine"},
+     "sku": {"description": "E2 Instance Core"},
+     "usage_start_time": "2025-09-01T01:00:00Z", "project": {"id": "hack"},
+     "labels": [{"key": "goog-k8s-cluster-name", "value": "ghostbusters-hackathon"}],
+     "cost": 0.30, "credits": [{"amount": -0.05}], "currency": "USD"},
+    {"service": {"description": "Compute Engine"},
+     "sku": {"description": "E2 Instance Core"},
+     "usage_start_time": "2025-09-01T02:00:00Z", "project": {"id": "hack"},
+     "labels": [{"key": "goog-k8s-cluster-name", "value": "ghostbusters-hackathon"}],
+     "cost": 0.25, "credits": [], "currency": "USD"},
+    {"service": {"description": "Compute Engine"},
+     "sku": {"description": "E2 Instance Core"},
+     "usage_start_time": "2025-09-02T01:00:00Z", "project": {"id": "hack"},
+     "labels": [{"key": "goog-k8s-cluster-name", "value": "other"}],
+     "cost": 9.00, "credits": [], "currency": "USD"},
+    {"service": {"description": "Cloud Storage"}, "sku": {"description": "Standard"},
+     "usage_start_time": "2025-09-02T01:00:00Z", "project": {"id": "elsewhere"},
+     "labels": [], "cost": 5.00, "credits": [], "currency": "USD"},
+]
+
+
+def test_jsonl_chunks_and_filters(tmp_path):
+    """Test chunked JSONL ingestion with project and cluster filters"""
+    path = tmp_path / "export.jsonl.gz"
+    with gzip.open(path, "wt") as f:
+        for row in ROWS:
+            f.write(json.dumps(row) + "\n")
+
+    assert [len(c) for c in iter_billing_chunks(path, chunk_size=3)] == [3, 1]
+
+    aggregator = BillingAggregator("hack", "ghostbusters-hackathon")
+    aggregator.ingest(path, chunk_size=2)
+    summary = aggregator.summary()
+
+    assert summary["rows_read"] == 4
+    assert summary["rows_matched"] == 2
+    assert summary["by_day"] == {"2025-09-01": 0.5}
+    assert summary["by_service"] == {"Compute Engine": 0.5}
+
+
+def test_csv_flattened_columns(tmp_path):
+    """Test CSV exports with flattened nested columns"""
+    path = tmp_path / "export.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["service.description", "sku.description", "usage_start_time",
+                         "project.id", "labels", "cost", "credits"])
+        for row in ROWS:
+            writer.writerow([row["service"]["description"], row["sku"]["description"],
+                             row["usage_start_time"].replace("T", " "),
+                             row["project"]["id"], json.dumps(row["labels"]),
+                             row["cost"], json.dumps(row["credits"])])
+
+    aggregator = BillingAggregator(project_id="hack")
+    aggregator.ingest(path)
+
+    assert aggregator.daily_totals() == {"2025-09-01": 0.5, "2025-09-02": 9.0}
+
+
+def test_reconcile_reports_error():
+    """Test reconciliation of billed and estimated daily costs"""
+    result = reconcile({"2025-09-01": 0.5, "2025-09-02": 1.0}, 0.75)
+
+    assert result["total_actual"] == 1.5
+    assert result["total_estimated"] == 1.5
+    assert result["bias"] == 0
+    assert [d["error_percent"] for d in result["days"]] == [50.0, -25.0]
+    assert result["mean_absolute_percent_error"] == 37.5
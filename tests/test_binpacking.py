@@ -0,0 +1,98 @@
+"""
+Tests for the node pool bin-packing simulator
+"""
+
+import time
+
+from gke_binpacking import (
+    best_fit_decreasing,
+    first_fit_decreasing,
+    simulate_node_pools,
+    split_pod_requests,
+    split_table_requests,
+)
+from gke_cost_monitor import PodTable, node_allocatable
+
+
+def test_heuristics_pack_identical_pods():
+    """Test that both heuristics fill nodes before opening new ones"""
+    groups = [[300, 500, 10]]
+    capacity = (1000, 4000, 110)
+
+    assert first_fit_decreasing([g[:] for g in groups], capacity) == 4
+    assert best_fit_decreasing([g[:] for g in groups], capacity) == 4
+    assert first_fit_decreasing([[2000, 100, 1]], capacity) is None
+
+
+def test_first_fit_reuses_leftover_capacity():
+    """Test that smaller pods go into gaps left by larger ones"""
+    groups = [[600, 100, 2], [400, 100, 2]]
+    assert first_fit_decreasing(groups, (1000, 1000, 110)) == 2
+
+
+def test_split_pod_requests_charges_daemonsets_per_node():
+    """Test that DaemonSet pods become per-node overhead"""
+    def pod(name, owner_kind, owner, cpu):
+        return {
+            "metadata": {"name": name, "labels": {},
+                         "ownerReferences": [{"kind": owner_kind, "name": owner}]},
+            "spec": {"containers": [{"resources": {"requests": {"cpu": cpu}}}]},
+            "status": {"phase": "Running"},
+        }
+
+    pods = [
+        pod("fluentbit-a", "DaemonSet", "fluentbit", "100m"),
+        pod("fluentbit-b", "DaemonSet", "fluentbit", "100m"),
+        pod("agent-1", "StatefulSet", "agent", "250m"),
+    ]
+    requests, overhead = split_pod_requests(pods)
+
+    assert requests == [(250, 0)]
+    assert overhead == (100, 0, 1)
+
+
+def test_static_pods_are_charged_once_per_component():
+    """Test that each node's kube-proxy counts as one per-node component"""
+    def static_pod(component, node, cpu):
+        return {
+            "metadata": {"name": f"{component}-{node}", "labels": {},
+                         "ownerReferences": [{"kind": "Node", "name": node}]},
+            "spec": {"nodeName": node,
+                     "containers": [{"resources": {"requests": {"cpu": cpu}}}]},
+            "status": {"phase": "Running"},
+        }
+
+    nodes = ["gke-hack-default-pool-3f2a9c1d-x7k2",
+             "gke-hack-default-pool-3f2a9c1d-q9z4"]
+    pods = [static_pod("kube-proxy", node, "100m") for node in nodes]
+    pods.append(static_pod("etcd-backup", nodes[0], "50m"))
+    requests, overhead = split_pod_requests(pods)
+
+    assert requests == []
+    assert overhead == (150, 0, 2)
+    assert split_table_requests(PodTable.from_pods(pods)) == (requests, overhead)
+
+
+def test_simulation_picks_cheapest_feasible_pool():
+    """Test that infeasible small machines are rejected"""
+    requests = [(1500, 1024)] * 4
+    result = simulate_node_pools(requests, machine_types=[
+        "e2-micro", "e2-medium", "e2-standard-2", "e2-standard-4"])
+
+    best = result["best"]
+    assert "e2-micro" in result["infeasible"]
+    assert best["machine_type"] in ("e2-standard-2", "e2-standard-4")
+    cpu, memory = node_allocatable(best["machine_type"])
+    assert best["node_count"] * cpu >= 4 * 1500
+
+
+def test_simulation_is_fast_for_thousands_of_pods():
+    """Test that the full catalog is searched well under a second"""
+    shapes = [(100, 128), (250, 256), (500, 512), (50, 64), (1000, 2048)]
+    requests = [shapes[i % len(shapes)] for i in range(5000)]
+
+    start = time.perf_counter()
+    result = simulate_node_pools(requests, overhead=(200, 400, 3), evaluate_all=True)
+    assert time.perf_counter() - start < 1.0
+    assert result["best"] is not None
+    assert len(result["evaluated"]) > 20
@@ -0,0 +1,96 @@
+"""
+Tests for cost alert deduplication, hysteresis and rate limiting
+"""
+
+from gke_cost_alerts import AlertManager, alert_fingerprint
+
+
+def make_manager(**kwargs):
+    """Alert manager that records delivered batches"""
+    batches = []
+    manager = AlertManager(notifier=batches.append, **kwargs)
+    return manager, batches
+
+
+def test_alerts_fire_once_while_condition_lasts():
+    """Test that polling an unchanged condition does not re-notify"""
+    manager, batches = make_manager()
+    costs = {"daily_cost": 0.30, "weekly_cost": 1.20, "monthly_cost": 4.50}
+    thresholds = {"daily": 0.20, "weekly": 1.40, "monthly": 5.00}
+
+    for minute in range(10):
+        manager.evaluate_thresholds(costs, thresholds, "development", now=minute * 60)
+        manager.flush(now=minute * 60, force=True)
+
+    assert len(batches) == 1
+    names = {(e["name"], e["severity"]) for e in batches[0]}
+    assert names == {("daily_cost", "critical"), ("weekly_cost", "warning"),
+                     ("monthly_cost", "warning")}
+
+
+def test_hysteresis_prevents_flapping():
+    """Test that values hovering at the threshold keep the alert firing"""
+    manager, _ = make_manager(hysteresis=0.1)
+    fingerprint = alert_fingerprint("daily_cost")
+
+    changes = [manager.observe("daily_cost", v, 1.0, now=i)
+               for i, v in enumerate([1.05, 0.98, 1.02, 0.95, 1.01])]
+    assert [c["severity"] for c in changes if c] == ["critical"]
+    assert manager.state(fingerprint) == "firing"
+
+    # Below the band drops to warning, far below resolves
+    assert manager.observe("daily_cost", 0.85, 1.0, now=10)["severity"] == "warning"
+    assert manager.observe("daily_cost", 0.5, 1.0, now=11)["state"] == "resolved"
+    assert manager.state(fingerprint) == "resolved"
+
+
+def test_batching_rate_limit_and_silence():
+    """Test group wait, the hourly cap and silences"""
+    manager, batches = make_manager(group_wait=30, max_notifications_per_hour=1)
+
+    manager.observe("a", 2.0, 1.0, now=0)
+    manager.observe("b", 2.0, 1.0, now=10)
+    assert manager.flush(now=20) is None            # still within group_wait
+    assert len(manager.flush(now=31)) == 2          # one batch for both changes
+
+    manager.observe("a", 0.1, 1.0, now=100)
+    assert manager.flush(now=200) is None           # hourly cap reached
+    assert len(manager.flush(now=3700)) == 1        # delivered once allowed
+
+    fingerprint = alert_fingerprint("c")
+    manager.silence(fingerprint, 600, now=4000)
+    manager.observe("c", 2.0, 1.0, now=4000)
+    assert manager.state(fingerprint, now=4000) == "silenced"
+    assert manager.flush(now=9000, force=True) is None
+    assert len(batches) == 2
+
+
+def test_alert_fired_while_silenced_is_sent_when_silence_lapses():
+    """Test that a still-firing alert is notified once its silence expires"""
+    manager, batches = make_manager(repeat_interval=10_000)
+    fingerprint = alert_fingerprint("daily_cost")
+    manager.silence(fingerprint, 600, now=0)
+
+    change = manager.observe("daily_cost", 2.0, 1.0, now=0)
+    assert change["state_shown"] == "silenced"
+    assert manager.observe("daily_cost", 2.0, 1.0, now=300) is None
+    manager.flush(now=300, force=True)
+    assert batches == []
+
+    repeat = manager.observe("daily_cost", 2.0, 1.0, now=700)
+    assert repeat["state"] == "firing" and "state_shown" not in repeat
+    manager.flush(now=700, force=True)
+    assert [e["name"] for e in batches[0]] == ["daily_cost"]
+    assert manager.observe("daily_cost", 2.0, 1.0, now=800) is None
+
+
+def test_events_repeat_and_expire():
+    """Test point-in-time events dedupe and resolve on their own"""
+    manager, batches = make_manager(event_timeout=100, repeat_interval=1000)
+
+    assert manager.record_event("cost_spike", {"series": "x"}, now=0) is not None
+    manager.flush(now=0, force=True)
+    assert manager.record_event("cost_spike", {"series": "x"}, now=50) is None
+    assert manager.expire_events(now=120) == []
+    resolved = manager.expire_events(now=151)
+    assert [c["state"] for c in resolved] == ["resolved"]
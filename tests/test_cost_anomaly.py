@@ -0,0 +1,61 @@
+"""
+Tests for streaming cost anomaly detection
+"""
+
+import time
+
+from gke_cost_anomaly import CostAnomalyDetector
+from gke_cost_monitor import attribute_costs
+
+
+def test_spike_fires_on_first_sample():
+    """Test that a runaway series alerts in the interval it spikes"""
+    detector = CostAnomalyDetector()
+    for value in (1.00, 1.02, 0.98, 1.01, 0.99, 1.00):
+        assert detector.update("workload/ai/Deployment/agent", value) is None
+
+    anomaly = detector.update("workload/ai/Deployment/agent", 3.0)
+    assert anomaly is not None
+    assert anomaly["baseline"] < 1.1
+    assert anomaly["increase"] > 1.9
+
+
+def test_noise_and_small_changes_do_not_alert():
+    """Test the warm-up period and the absolute/relative floors"""
+    detector = CostAnomalyDetector(min_samples=3)
+    assert detector.update("ns", 5.0) is None
+    assert detector.update("ns", 50.0) is None      # still warming up
+
+    flat = CostAnomalyDetector(min_samples=3)
+    for _ in range(5):
+        flat.update("flat", 1.0)
+    assert flat.update("flat", 1.005) is None         # below min_increase
+    assert flat.update("flat", 1.2) is None           # below 25% relative floor
+    assert flat.update("flat", 2.0) is not None
+
+
+def test_update_many_is_constant_time_per_sample():
+    """Test that thousands of series update quickly"""
+    detector = CostAnomalyDetector()
+    samples = {f"workload/{i}": 1.0 + (i % 7) * 0.01 for i in range(5000)}
+
+    start = time.perf_counter()
+    for _ in range(10):
+        detector.update_many(samples)
+    assert time.perf_counter() - start < 1.0
+    assert len(detector) == 5000
+
+    samples["workload/42"] = 10.0
+    anomalies = detector.update_many(samples)
+    assert [a["series"] for a in anomalies] == ["workload/42"]
+
+
+def test_attribute_costs_charges_max_of_request_and_usage():
+    """Test namespace and workload cost attribution"""
+    entry = {"cpu_requests_millicores": 1000, "cpu_usage_millicores": 2000,
+             "memory_requests_mi": 1024, "memory_usage_mi": 512}
+    costs = attribute_costs({"by_namespace": {"ai": entry},
+                             "by_workload": {"ai/Deployment/agent": entry}})
+
+    assert set(costs) == {"namespace/ai", "workload/ai/Deployment/agent"}
+    assert costs["namespace/ai"] == round((2 * 11.72 + 1.57) / 30, 4)
@@ -0,0 +1,87 @@
+"""
+Tests for the dashboard data layer and history downsampling
+"""
+
+import threading
+import time
+
+from gke_cost_dashboard import DashboardData, linear_forecast
+from gke_cost_history import CostHistory
+from tests.helpers import make_snapshot
+
+
+def fill_minutes(history, minutes, start=1_000_000):
+    """Bulk-insert one-minute samples straight into the store"""
+    with history._connect() as conn:
+        conn.executemany(
+            "INSERT INTO samples (taken_at, phase, daily_cost, status) "
+            "VALUES (?, ?, ?, ?)",
+            [(start + m * 60, "development", 0.2 + m * 1e-5,
+              "healthy" if m < minutes // 2 else "warning") for m in range(minutes)])
+
+
+def test_downsampling_bounds_rows_over_months(tmp_path):
+    """Test that 90 days of one-minute samples come back as a bounded series"""
+    history = CostHistory(tmp_path / "history.db")
+    fill_minutes(history, 90 * 1440)
+
+    start = time.perf_counter()
+    points = history.downsample(hours=None, max_points=500)
+    assert time.perf_counter() - start < 2.0
+    assert 490 <= len(points) <= 500
+    assert sum(p["samples"] for p in points) == 90 * 1440
+
+    changes = history.status_changes()
+    assert [c["status"] for c in changes] == ["warning", "healthy"]
+
+
+def test_queries_are_cached_until_version_changes(tmp_path):
+    """Test the version-keyed query cache"""
+    history = CostHistory(tmp_path / "history.db")
+    history.record(make_snapshot(1, 1_000_000))
+    data = DashboardData(history)
+
+    assert data.attribution() == {"ai": 0.25}
+    data.timeline(24)
+    data.timeline(24)
+    data.attribution()
+    assert (data.hits, data.misses) == (2, 3)   # timeline also looked up latest()
+
+    history.record(make_snapshot(2, 1_000_060, daily_cost=0.5))
+    assert [p["daily_cost"] for p in data.timeline(24)] == [0.3, 0.5]
+    assert data.latest()["daily_cost"] == 0.5
+
+
+def test_result_for_an_old_version_is_not_cached(tmp_path):
+    """Test that a sample recorded during a query does not poison the cache"""
+    history = CostHistory(tmp_path / "history.db")
+    history.record(make_snapshot(1, 1_000_000))
+    data = DashboardData(history)
+
+    def slow_query():
+        history.record(make_snapshot(2, 1_000_060))    # Lands mid-compute
+        return "stale"
+
+    assert data._cached("query", slow_query) == "stale"
+    assert data._cached("query", lambda: "fresh") == "fresh"
+    assert data._cached("query", lambda: "again") == "fresh"
+
+    # Sessions sharing one instance never trip over each other
+    threads = [threading.Thread(target=lambda: [data.attribution() for _ in range(50)])
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert data.hits + data.misses == 3 + 8 * 50
+
+
+def test_linear_forecast():
+    """Test the trend projection"""
+    points = [(day * 86400, 1.0 + 0.1 * day) for day in range(10)]
+    forecast = linear_forecast(points, horizon_days=10)
+
+    assert forecast["slope_per_day"] == 0.1
+    assert forecast["projected_daily_cost"] == 2.9
+    assert forecast["projected_total"] == 24.0
+    assert linear_forecast(points[:1]) is None
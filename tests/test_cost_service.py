@@ -0,0 +1,66 @@
+"""
+Tests for the cached cost service responses and history store
+"""
+
+import gzip
+import json
+
+import pytest
+
+from gke_cost_history import CostHistory
+from gke_cost_service import ResponseCache, encode_response, render
+from tests.helpers import make_snapshot
+
+
+def test_history_records_and_windows(tmp_path):
+    """Test that snapshots are stored and queried by time window"""
+    history = CostHistory(tmp_path / "history.db")
+    for hour in range(5):
+        history.record(make_snapshot(hour + 1, 1_000_000 + hour * 3600, 0.1 * hour))
+
+    assert history.version == 5
+    assert len(history.samples(hours=2.5, now=1_000_000 + 4 * 3600)) == 3
+    series = history.series("namespace/ai", hours=None)
+    assert [s["daily_cost"] for s in series] == [0.25] * 5
+
+
+def test_cached_responses_support_etag_and_gzip(tmp_path):
+    """Test 304 revalidation, gzip and whole-map swaps on publish"""
+    cache = ResponseCache(CostHistory(tmp_path / "history.db"))
+    assert cache.get("costs") is None
+
+    cache.publish(make_snapshot(1, 1_000_000))
+    cached = cache.get("recommendations")
+    status, body, headers = render(cached, None, "gzip, br")
+    assert status == 200 and headers["Content-Encoding"] == "gzip"
+    assert len(json.loads(gzip.decompress(body))["recommendations"]) == 20
+
+    status, body, _ = render(cached, f'W/{cached.etag}', "gzip")
+    assert (status, body) == (304, b"")
+
+    # Identical content gets the same ETag; a new snapshot gets a new one
+    assert encode_response({"a": 1}).etag == encode_response({"a": 1}).etag
+    before = cache.get("costs").etag
+    cache.publish(make_snapshot(2, 1_000_060, daily_cost=0.9))
+    assert cache.get("costs").etag != before
+    assert json.loads(cache.get("history").body)["samples"][-1]["daily_cost"] == 0.9
+
+
+def test_app_serves_cached_bytes(tmp_path, monkeypatch):
+    """Test the FastAPI endpoints end to end"""
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+
+    from gke_cost_service import create_app
+    from tests.test_monitor_snapshot import FakeMonitor
+
+    monkeypatch.chdir(tmp_path)
+    app = create_app(FakeMonitor(), interval_seconds=3600,
+                     history=CostHistory(tmp_path / "history.db"))
+    with TestClient(app) as client:
+        app.state.refresher.wait_for(0, timeout=5)
+        first = client.get("/costs")
+        assert first.status_code == 200
+        again = client.get("/costs", headers={"If-None-Match": first.headers["etag"]})
+        assert again.status_code == 304
+        assert client.get("/history", params={"hours": 1}).json()["hours"] == 1
@@ -0,0 +1,89 @@
+"""
+Tests for the deployment state transition log
+"""
+
+import sys
+import time
+
+from gke_deployment_history import DeploymentHistory, main
+
+HOUR = 3600.0
+
+
+def state(**statuses):
+    """deployment_state with one deployed service per keyword"""
+    return {"deployed_services": [
+        {"name": name.replace("_", "-"), "namespace": "ai", "status": status,
+         "ready_pods": int(status == "Running"), "total_pods": 1}
+        for name, status in statuses.items()]}
+
+
+def test_only_changes_are_logged_and_state_is_answered_at_any_time(tmp_path):
+    """Unchanged updates append nothing; vanished services become Absent"""
+    history = DeploymentHistory(tmp_path / "history.db")
+    assert history.record(state(api="Pending", quality_agent="Running"), at=0) == 2
+    assert history.record(state(api="Pending", quality_agent="Running"), at=HOUR) == 0
+    assert history.record(state(api="Running", quality_agent="Running"),
+                          at=2 * HOUR) == 1
+    assert history.record(state(api="Running"), at=3 * HOUR) == 1
+
+    assert history.state_at(1.5 * HOUR) == {
+        "ai/api": {"status": "Pending", "since": 0},
+        "ai/quality-agent": {"status": "Running", "since": 0}}
+    assert history.state_at(4 * HOUR) == {
+        "ai/api": {"status": "Running", "since": 2 * HOUR}}
+    assert history.status_at("ai/quality-agent", 4 * HOUR) == "Absent"
+    assert history.status_at("ai/api", -1) is None
+
+    # Pending 0-2h, then Absent from 3h: 1h inside [1h, 4h] plus 1h absent
+    assert history.unavailable_seconds("ai/api", HOUR, 4 * HOUR) == HOUR
+    assert history.unavailable_seconds("ai/quality-agent", HOUR, 4 * HOUR) == HOUR
+
+
+def test_checkpoints_bound_replay_and_compaction_keeps_answers(tmp_path):
+    """Queries agree before and after checkpointing and compacting the log"""
+    history = DeploymentHistory(tmp_path / "history.db", checkpoint_every=10,
+                                retention_days=None)
+    for hour in range(48):
+        status = "Pending" if hour % 6 == 0 else "Running"
+        history.record(state(quality_agent=status, api="Running"), at=hour * HOUR)
+
+    expected = [history.state_at(t * HOUR) for t in (30, 47)]
+    downtime = history.unavailable_seconds("ai/quality-agent", 24 * HOUR, 48 * HOUR)
+    assert downtime == 4 * HOUR
+
+    assert history.compact(24 * HOUR) > 0
+    assert len(history.transitions(since=0, until=24 * HOUR)) == 0
+    assert [history.state_at(t * HOUR) for t in (30, 47)] == expected
+    assert history.status_at("ai/api", 25 * HOUR) == "Running"
+    assert history.unavailable_seconds(
+        "ai/quality-agent", 24 * HOUR, 48 * HOUR) == downtime
+
+
+def test_cli_queries_a_service_recorded_under_its_cluster(tmp_path, monkeypatch,
+                                                          capsys):
+    """The --service query finds services logged as cluster/namespace/name"""
+    db = tmp_path / "history.db"
+    history = DeploymentHistory(db)
+    now = time.time()
+    history.record(state(quality_agent="Pending"), at=now - 2 * HOUR,
+                   scope="ghostbusters-hackathon")
+    history.record(state(quality_agent="Running"), at=now - HOUR,
+                   scope="ghostbusters-hackathon")
+
+    def run(*args):
+        monkeypatch.setattr(sys, "argv", ["gke_deployment_history.py",
+                                          "--db", str(db), *args])
+        return main(), capsys.readouterr().out
+
+    code, out = run("--cluster", "ghostbusters-hackathon",
+                    "--service", "ai/quality-agent")
+    assert code == 0
+    assert "ghostbusters-hackathon/ai/quality-agent: unavailable 1.00h" in out
+    assert "Pending (0/1)" in out and "Running (1/1)" in out
+
+    code, out = run("--service", "ai/quality-agent")
+    assert code == 1 and "needs --cluster" in out
+
+    code, out = run("--cluster", "other")
+    assert code == 0 and out == ""
@@ -0,0 +1,242 @@
+"""
+Tests for the deployment state updater script
+"""
+
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+from gke_cost_monitor import compute_utilization
+from gke_deployment_history import DeploymentHistory
+from gke_kubectl import kubectl_command
+from gke_model_registry import DEPLOYMENT_STATE_PATH, GCP_SETUP_PATH, load_subtree
+from tests.helpers import (
+    NODES,
+    load_script,
+    make_metrics,
+    make_model,
+    make_pod,
+    write_registry,
+)
+
+updater = load_script("update-deployment-state")
+NOW = datetime(2026, 1, 10, tzinfo=timezone.utc)
+
+
+def deployment(name, namespace="ghostbusters-ai", labels=None, ready=1, replicas=1,
+               created="2026-01-08T12:00:00Z"):
+    """Listed deployment as the field filter keeps it"""
+    return {"metadata": {"name": name, "namespace": namespace,
+                         "creationTimestamp": created},
+            "spec": {"template": {"metadata": {"labels": labels or {"app": name}}}},
+            "status": {"readyReplicas": ready, "replicas": replicas}}
+
+
+def service(name, selector, ports, namespace="ghostbusters-ai", type_="ClusterIP"):
+    """Listed service"""
+    return {"metadata": {"name": name, "namespace": namespace},
+            "spec": {"selector": selector, "type": type_,
+                     "ports": [{"port": p} for p in ports]}}
+
+
+def keep(kind, items):
+    """Run items through the listing's field filter"""
+    return updater._keep_fields(kind)(iter(items))
+
+
+def test_services_join_deployments_by_selector():
+    """Ports and type come from the services selecting each deployment"""
+    items = keep("Deployment", [
+        deployment("ghostbusters-api", labels={"app": "api", "tier": "web"}),
+        deployment("ghostbusters-worker", ready=0, replicas=2, created=None),
+        deployment("unrelated"),
+        deployment("coredns", namespace="kube-system", ready=1, replicas=2),
+    ]) + keep("Service", [
+        service("api", {"app": "api"}, [8080]),
+        service("api-public", {"app": "api", "tier": "web"}, [443, 8080],
+                type_="LoadBalancer"),
+        service("other", {"app": "api", "tier": "db"}, [5432]),
+        service("elsewhere", {"app": "api"}, [9999], namespace="kube-system"),
+    ])
+
+    classified = updater.classify_resources({"items": items}, now=NOW)
+    api, worker = classified["deployed_services"]
+    assert (api["name"], api["ports"], api["service_type"], api["age"]) == (
+        "ghostbusters-api", [443, 8080], "LoadBalancer", "1d")
+    assert (worker["status"], worker["ports"], worker["service_type"],
+            worker["age"]) == ("Pending", [], None, "unknown")
+    assert classified["system_services"] == [{
+        "name": "coredns", "namespace": "kube-system", "status": "Mixed",
+        "ready_pods": 1, "total_pods": 2, "age": "1d"}]
+
+
+def test_format_age():
+    """Ages use the largest whole unit, like kubectl"""
+    assert updater.format_age("2026-01-09T23:59:15Z", NOW) == "45s"
+    assert updater.format_age("2026-01-09T21:00:00Z", NOW) == "3h"
+    assert updater.format_age("2026-01-09T23:30:00Z", NOW) == "30m"
+
+
+def test_listings_are_scoped_and_concurrent(monkeypatch):
+    """Only the needed (namespace, kind) lists are requested, all at once"""
+    barrier = threading.Barrier(6, timeout=5)
+    paths = []
+
+    def fake_consume_list(path, consumer):
+        paths.append(path)
+        barrier.wait()      # Deadlocks (and times out) unless all run together
+        name = path.rsplit("/", 1)[-1]
+        return consumer(iter([{"metadata": {"name": name, "namespace": "x"}}]))
+
+    monkeypatch.setattr(updater, "consume_list", fake_consume_list)
+    resources = updater.get_k8s_resources()
+
+    assert sorted(paths) == [
+        "/api/v1/namespaces/ghostbusters-ai/services",
+        "/apis/apps/v1/namespaces/ghostbusters-ai/deployments",
+        "/apis/apps/v1/namespaces/gmp-system/daemonsets",
+        "/apis/apps/v1/namespaces/gmp-system/deployments",
+        "/apis/apps/v1/namespaces/gmp-system/statefulsets",
+        "/apis/apps/v1/namespaces/kube-system/deployments",
+    ]
+    assert sorted(i["kind"] for i in resources["items"]) == [
+        "DaemonSet", "Deployment", "Deployment", "Deployment", "Service", "StatefulSet"]
+
+
+def test_monitoring_stack_from_gmp_workloads():
+    """Each GMP workload reports its own ready count"""
+    items = (
+        keep("Deployment", [deployment("gmp-operator", namespace="gmp-system")])
+        + keep("DaemonSet", [
+            {"metadata": {"name": "collector", "namespace": "gmp-system"},
+             "status": {"numberReady": 2, "desiredNumberScheduled": 3}}])
+        + keep("StatefulSet", [
+            {"metadata": {"name": "alertmanager", "namespace": "gmp-system"},
+             "status": {"replicas": 1}}]))
+
+    classified = updater.classify_resources({"items": items}, now=NOW)
+    assert classified["monitoring_stack"] == {
+        "alertmanager": "Pending (0/1 Running)",
+        "collector": "Mixed (2/3 Running)",
+        "gmp-operator": "Running",
+    }
+    assert classified["deployed_services"] == classified["system_services"] == []
+
+
+def test_utilization_and_costs_from_one_collection():
+    """Node usage, disk and costs fill the state; a failed collection stays unknown"""
+    pod_status = compute_utilization(
+        [make_pod("ghostbusters-api-1", cpu="500m", memory="1Gi")],
+        [make_metrics("ghostbusters-api-1", "250m", "512Mi")], NODES,
+        [{"metadata": {"name": "node-a"}, "usage": {"cpu": "1", "memory": "2Gi"}}])
+    usage = {"pod_status": pod_status,
+             "filesystems": {"node-a": (25.0, 100.0), "node-b": (5.0, 100.0)}}
+
+    utilization = updater.summarize_utilization(usage)
+    assert utilization["disk_usage_percent"] == 15.0
+    assert utilization["cpu_usage_percent"] == round(1000 / 940 * 100, 1)
+    unknown = updater.summarize_utilization({"error": "boom"})
+    assert unknown["cpu_usage_percent"] == "unknown"
+
+    cluster = {"machine_type": "e2-medium", "node_count": 1, "disk_size_gb": 20}
+    first = updater.summarize_costs(cluster, usage, {})
+    assert first["cost_trend"] == "unknown"
+    assert first["budget_remaining"] == round(
+        first["monthly_budget"] - first["current_monthly_cost"], 2)
+    assert first["daily_cost_by_namespace"]["ghostbusters-ai"] > 0
+
+    cluster["node_count"] = 2
+    assert updater.summarize_costs(cluster, usage, first)["cost_trend"] == "rising"
+
+
+def test_reconciler_coalesces_a_rollout_into_one_write(tmp_path):
+    """Event bursts are written once per interval, and only real changes count"""
+    path = write_registry(tmp_path, make_model())
+    clock = [0.0]
+    reconciler = updater.DeploymentStateReconciler(
+        make_model(), "demo-project", path, tmp_path / "history.db",
+        cluster="demo", interval_seconds=30, settle_seconds=2,
+        clock=lambda: clock[0])
+
+    api = deployment("ghostbusters-api", ready=0, replicas=3)
+    for namespace, kinds in updater.WATCHED_NAMESPACES.items():
+        for kind in kinds:
+            reconciler.sync(namespace, kind, keep(kind, [api]) if kind == "Deployment"
+                            and namespace == "ghostbusters-ai" else [])
+    assert not reconciler.flush()            # Not settled yet
+    clock[0] = 2.0
+    assert not reconciler.flush(force=True)  # No cluster status fetched yet
+    reconciler.cluster_status = {"status": "RUNNING", "name": "demo", "node_count": 1}
+    assert reconciler.flush() and reconciler.writes == 1
+
+    # The rollout: status updates plus a change the classifier never reads
+    for t, ready in ((3.0, 1), (4.0, 2), (5.0, 3)):
+        clock[0] = t
+        assert reconciler.apply("Deployment", {"type": "MODIFIED", "object": deployment(
+            "ghostbusters-api", ready=ready, replicas=3)})
+    noise = deployment("ghostbusters-api", ready=3, replicas=3)
+    noise["metadata"]["annotations"] = {"revision": "2"}
+    assert not reconciler.apply("Deployment", {"type": "MODIFIED", "object": noise})
+
+    clock[0] = 10.0
+    assert not reconciler.flush()            # Within the write interval
+    clock[0] = 32.0
+    assert reconciler.flush() and reconciler.writes == 2
+    assert not reconciler.dirty
+    state = load_subtree(DEPLOYMENT_STATE_PATH, path)
+    assert state["deployment_health"] == "✅ All services running"
+    assert state["deployed_services"][0]["ready_pods"] == 3
+
+    assert reconciler.apply("Deployment", {"type": "DELETED", "object": noise})
+    clock[0] = 70.0
+    assert reconciler.flush()
+    assert load_subtree(DEPLOYMENT_STATE_PATH, path)["deployed_services"] == []
+
+    # Each write logged only the transitions: Pending, Running, Absent
+    history = DeploymentHistory(tmp_path / "history.db")
+    key = "demo/ghostbusters-ai/ghostbusters-api"
+    assert [t["status"] for t in history.transitions(key)] == [
+        "Pending", "Running", "Absent"]
+
+
+def test_clusters_are_collected_concurrently_with_their_own_credentials(monkeypatch):
+    """Each cluster's listings see its own kubeconfig; states are kept per cluster"""
+    clusters = [{"name": name, "location": "us-central1", "status": "RUNNING",
+                 "node_count": 1} for name in ("east", "west", "staging")]
+    barrier = threading.Barrier(len(clusters), timeout=5)
+    seen = []
+
+    def fake_resources():
+        barrier.wait()      # Times out unless every cluster is collected at once
+        command = kubectl_command("get", "--raw", "/api/v1/services")
+        seen.append(command[2])
+        name = Path(command[2]).stem
+        return {"items": keep("Deployment", [deployment(f"ghostbusters-{name}")])}
+
+    monkeypatch.setattr(updater, "cluster_credentials",
+                        lambda project, status, directory:
+                        directory / f"{status['name']}.yaml")
+    monkeypatch.setattr(updater, "get_k8s_resources", fake_resources)
+    monkeypatch.setattr(updater, "collect_usage", lambda: {"error": "no metrics"})
+
+    results = updater.collect_clusters("demo-project", clusters)
+    assert sorted(Path(p).name for p in seen) == [
+        "east.yaml", "staging.yaml", "west.yaml"]
+    assert kubectl_command("version")[:2] == ["kubectl", "version"]
+
+    model = make_model()
+    primary = updater.primary_cluster(clusters, {"cluster_name": "west"})
+    for status in clusters:
+        classified = updater.classify_resources(
+            results[status["name"]]["k8s_resources"])
+        updater.update_deployment_state(
+            model, status, classified["deployed_services"],
+            classified["system_services"], primary=status["name"] == primary)
+
+    setup = model
+    for key in GCP_SETUP_PATH:
+        setup = setup[key]
+    assert sorted(setup["deployment_states"]) == ["east", "staging", "west"]
+    assert setup["deployment_state"] is setup["deployment_states"]["west"]
+    primary_services = setup["deployment_state"]["deployed_services"]
+    assert primary_services[0]["name"] == "ghostbusters-west"
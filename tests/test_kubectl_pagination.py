@@ -0,0 +1,169 @@
+"""
+Tests for paginated list calls with continue tokens
+"""
+
+import io
+import json
+import subprocess
+import threading
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import gke_kubectl
+from gke_kubectl import (
+    ListExpired,
+    consume_list,
+    iter_list_pages,
+    list_all,
+    list_with_version,
+    watch_events,
+)
+
+
+class FakeApiServer:
+    """Serves a list in pages; can expire a token or change version once"""
+
+    def __init__(self, names, expire_at=None, move_at=None):
+        self.names = names
+        self.version = 100
+        self.expire_at = expire_at
+        self.move_at = move_at
+        self.requests = []
+
+    def __call__(self, path, accept=None):
+        self.requests.append(path)
+        query = parse_qs(urlparse(path).query)
+        limit = int(query["limit"][0])
+        offset = int(query.get("continue", ["0"])[0])
+
+        if offset and offset == self.expire_at:
+            self.expire_at = None
+            self.version += 1
+            raise ListExpired("Error from server (Expired): continue token too old")
+        if offset and offset == self.move_at:
+            self.move_at = None
+            self.version += 1
+
+        end = offset + limit
+        metadata = {"resourceVersion": str(self.version)}
+        if end < len(self.names):
+            metadata["continue"] = str(end)
+        return {"metadata": metadata,
+                "items": [{"metadata": {"name": n}} for n in self.names[offset:end]]}
+
+
+def test_pages_share_one_resource_version(monkeypatch):
+    """Test chunked listing and page-at-a-time delivery"""
+    server = FakeApiServer([f"pod-{i}" for i in range(7)])
+    monkeypatch.setattr(gke_kubectl, "get_raw", server)
+
+    pages = list(iter_list_pages("/api/v1/pods", limit=3))
+    assert [len(p.items) for p in pages] == [3, 3, 1]
+    assert {p.resource_version for p in pages} == {"100"}
+    assert "continue=3" in server.requests[1]
+
+
+@pytest.mark.parametrize("fault", ["expire_at", "move_at"])
+def test_expired_or_moved_list_restarts_consumer(monkeypatch, fault):
+    """Test that the consumer restarts from a fresh, consistent listing"""
+    server = FakeApiServer([f"pod-{i}" for i in range(7)], **{fault: 6})
+    monkeypatch.setattr(gke_kubectl, "get_raw", server)
+    calls = []
+
+    def count(items):
+        calls.append(1)
+        return sum(1 for _ in items)
+
+    assert consume_list("/api/v1/pods", count, limit=3) == 7
+    assert len(calls) == 2
+
+
+def test_gives_up_after_max_restarts(monkeypatch):
+    """Test that a list that never completes raises"""
+    def always_expired(path, accept=None):
+        if "continue" in path:
+            raise ListExpired("410")
+        return {"metadata": {"continue": "x"}, "items": [{}]}
+
+    monkeypatch.setattr(gke_kubectl, "get_raw", always_expired)
+    with pytest.raises(ListExpired):
+        list_all("/api/v1/pods", limit=1)
+
+
+class FakeWatch:
+    """kubectl --raw watch process streaming canned event lines"""
+
+    def __init__(self, command, stdout=None, stderr=None):
+        self.command = command
+        self.stdout = iter(FakeWatch.lines)
+        self.stderr = io.BytesIO(b"")
+        self.returncode = 0
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self):
+        return self.returncode
+
+
+@pytest.mark.parametrize("stderr, expired", [
+    ("Error from server (Expired): The provided continue parameter is too old", True),
+    ("Error from server (Gone): too old resource version: 100 (4104)", True),
+    ('{"kind":"Status","code":410,"reason":"Expired"}', True),
+    ('Error from server (NotFound): pods "worker-4107" not found', False),
+    ("dial tcp 10.0.41.10:443: connect: connection refused", False),
+])
+def test_only_410_errors_expire_a_list(monkeypatch, stderr, expired):
+    """Digits 410 in a name or address are an ordinary kubectl failure"""
+    monkeypatch.setattr(gke_kubectl.subprocess, "run", lambda command, **kwargs:
+                        subprocess.CompletedProcess(command, 1, b"", stderr.encode()))
+    with pytest.raises(ListExpired if expired else subprocess.CalledProcessError):
+        gke_kubectl.get_raw("/api/v1/pods?limit=500")
+
+
+def test_watch_resumes_from_version_and_expires(monkeypatch):
+    """Events stream from the given version; a 410 ERROR event means relist"""
+    FakeWatch.lines = [
+        json.dumps({"type": "ADDED",
+                    "object": {"metadata": {"name": "a"}}}).encode() + b"\n",
+        b"\n",
+        json.dumps({"type": "BOOKMARK", "object": {
+            "metadata": {"resourceVersion": "105"}}}).encode() + b"\n",
+        json.dumps({"type": "ERROR", "object": {
+            "kind": "Status", "code": 410,
+            "message": "too old resource version"}}).encode(),
+    ]
+    started = []
+    monkeypatch.setattr(gke_kubectl.subprocess, "Popen",
+                        lambda command, **kwargs:
+                        started.append(command) or FakeWatch(command))
+
+    events = watch_events("/api/v1/namespaces/x/services", "100")
+    assert [next(events)["type"], next(events)["type"]] == ["ADDED", "BOOKMARK"]
+    with pytest.raises(ListExpired):
+        next(events)
+    query = parse_qs(urlparse(started[0][-1]).query)
+    assert query["resourceVersion"] == ["100"] and query["watch"] == ["1"]
+
+
+def test_list_with_version_returns_the_listing_version(monkeypatch):
+    """The version to watch from is the one the consistent listing was read at"""
+    server = FakeApiServer([f"pod-{i}" for i in range(7)], expire_at=6)
+    monkeypatch.setattr(gke_kubectl, "get_raw", server)
+
+    names, version = list_with_version("/api/v1/pods", list, limit=3)
+    assert len(names) == 7 and version == "101"
+
+
+def test_transfer_stats_count_every_concurrent_response(monkeypatch):
+    """Listing threads never lose each other's transfer counts"""
+    monkeypatch.setattr(gke_kubectl, "transfer_stats", {"requests": 0, "bytes": 0})
+    threads = [threading.Thread(target=lambda: [gke_kubectl._record_transfer(b"12345")
+                                                for _ in range(2000)])
+               for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert gke_kubectl.transfer_stats == {"requests": 32000, "bytes": 160000}
@@ -0,0 +1,226 @@
+"""
+Tests for incremental, atomic project model registry updates
+"""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+import gke_model_registry
+from gke_model_registry import (
+    DEPLOY_TEMPLATE_PATH,
+    DEPLOYMENT_STATE_PATH,
+    GCP_SETUP_PATH,
+    ShardedRegistry,
+    SubtreeHasher,
+    apply_patch,
+    load_subtree,
+    locate,
+    shard_root,
+    update_subtree,
+    update_subtrees,
+)
+from tests.helpers import load_script, make_model, write_registry
+
+
+def state(health="✅ All services running", updated="2026-01-01T00:00:00"):
+    """A deployment state with volatile timestamps"""
+    return {"cluster_status": "RUNNING", "deployed_services": [{"name": "a"}],
+            "deployment_timestamp": updated, "last_updated": updated,
+            "deployment_health": health}
+
+
+def test_locate_finds_nested_value():
+    """The span of a nested value decodes to that value"""
+    text = json.dumps(make_model(state()), indent=2)
+    start, end = locate(text, DEPLOYMENT_STATE_PATH)
+    assert json.loads(text[start:end]) == state()
+
+
+def test_update_rewrites_only_the_subtree(tmp_path):
+    """The file matches a full re-serialization, and only the subtree moved"""
+    path = write_registry(tmp_path, make_model(state()))
+    new_state = state(health="❌ All services pending", updated="2026-02-01T00:00:00")
+
+    assert update_subtree(DEPLOYMENT_STATE_PATH, new_state, path)
+    assert path.read_text() == json.dumps(make_model(new_state), indent=2)
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
+
+
+def test_unchanged_state_is_not_written(tmp_path):
+    """Only timestamps changed: the registry is left alone"""
+    path = write_registry(tmp_path, make_model(state()))
+    before = path.stat().st_mtime_ns, path.read_text()
+
+    assert not update_subtree(DEPLOYMENT_STATE_PATH,
+                              state(updated="2026-03-01T00:00:00"), path)
+    assert (path.stat().st_mtime_ns, path.read_text()) == before
+
+
+def test_missing_subtree_is_added(tmp_path):
+    """A first run adds deployment_state to its parent"""
+    path = write_registry(tmp_path, make_model())
+
+    assert update_subtree(DEPLOYMENT_STATE_PATH, state(), path)
+    assert json.loads(path.read_text()) == make_model(state())
+
+
+def test_patch_rejects_unknown_operations(tmp_path):
+    """Only add and replace are supported; replace needs an existing value"""
+    path = write_registry(tmp_path, make_model())
+    with pytest.raises(ValueError):
+        apply_patch([{"op": "remove", "path": "/version"}], path)
+    with pytest.raises(KeyError):
+        apply_patch([{"op": "replace", "path": "/missing", "value": 1}], path)
+    assert apply_patch([{"op": "replace", "path": "/version", "value": "2.0"}], path)
+    assert json.loads(path.read_text())["version"] == "2.0"
+
+
+@pytest.mark.parametrize("sharded", [False, True])
+def test_several_subtrees_are_written_at_once(tmp_path, monkeypatch, sharded):
+    """Sibling subtrees land in one write, so readers never see only one"""
+    path = write_registry(tmp_path, make_model(state()))
+    if sharded:
+        ShardedRegistry.split(path)
+    writes = []
+    write = gke_model_registry.atomic_write_text
+    monkeypatch.setattr(gke_model_registry, "atomic_write_text",
+                        lambda target, text: (writes.append(Path(target).name),
+                                              write(target, text)))
+
+    new_state = state(health="❌ All services pending")
+    states_path = DEPLOYMENT_STATE_PATH[:-1] + ("deployment_states",)
+    assert update_subtrees([(states_path, {"west": new_state}),
+                            (DEPLOYMENT_STATE_PATH, new_state)], path)
+    assert [name for name in writes if name != "index.json"] == \
+        ["hackathon.json" if sharded else path.name]
+    assert load_subtree(states_path, path) == {"west": new_state}
+    assert load_subtree(DEPLOYMENT_STATE_PATH, path) == new_state
+
+
+def test_sharded_store_reads_only_the_requested_subtree(tmp_path):
+    """Loads seek into one shard; other shards are never parsed"""
+    model = make_model(state())
+    path = write_registry(tmp_path, model)
+    store = ShardedRegistry.split(path)
+    assert store.root == shard_root(path)
+
+    # An unreadable neighbour shard proves it is not touched
+    (store.root / "domains" / "other.json").write_text("not json")
+
+    assert load_subtree(GCP_SETUP_PATH, path) == \
+        model["domains"]["hackathon"]["hackathon_mapping"]["gke_turns_10"]["gcp_project_setup"]
+    assert load_subtree(GCP_SETUP_PATH + ("deploy_template", "variables", "project_id"),
+                        path) == "demo-project"
+    assert load_subtree(("version",), path) == "1.0"
+
+
+def test_sharded_store_updates_one_shard(tmp_path):
+    """Writes splice into the domain's shard and keep the index current"""
+    model = make_model(state())
+    path = write_registry(tmp_path, model)
+    store = ShardedRegistry.split(path)
+    other = store.root / "domains" / "other.json"
+    other_mtime = other.stat().st_mtime_ns
+
+    new_state = state(health="❌ All services pending")
+    assert update_subtree(DEPLOYMENT_STATE_PATH, new_state, path)
+    assert not update_subtree(DEPLOYMENT_STATE_PATH, new_state, path)
+    assert other.stat().st_mtime_ns == other_mtime
+    assert load_subtree(DEPLOYMENT_STATE_PATH, path) == new_state
+
+    # A shard edited behind the store's back is re-indexed on read
+    other.write_text(json.dumps({"flag": False, "items": []}, indent=2))
+    assert load_subtree(("domains", "other", "flag"), path) is False
+
+    store.export(path)
+    expected = make_model(new_state)
+    expected["domains"]["other"] = {"flag": False, "items": []}
+    assert json.loads(path.read_text()) == expected
+
+
+def test_parse_cache_is_reused_until_the_registry_changes(tmp_path, monkeypatch):
+    """The registry is parsed once per change, even across a touch"""
+    model = make_model(state())
+    path = write_registry(tmp_path, model)
+    parses = []
+    real_loads = json.loads
+    monkeypatch.setattr(gke_model_registry.json, "loads",
+                        lambda data: parses.append(1) or real_loads(data))
+
+    assert gke_model_registry.load_project_model(path) == model
+    assert gke_model_registry.cache_path(path).exists()
+    assert load_subtree(GCP_SETUP_PATH + ("notes",), path) == "café ☕"
+    assert len(parses) == 1
+
+    # Same content, new mtime: the hash still matches
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000))
+    assert gke_model_registry.load_project_model(path) == model
+    assert len(parses) == 1
+
+    model["version"] = "2.0"
+    write_registry(tmp_path, model)
+    assert gke_model_registry.load_project_model(path)["version"] == "2.0"
+    assert len(parses) == 2
+
+    # A corrupt cache is ignored and rewritten
+    gke_model_registry.cache_path(path).write_bytes(b"\x00garbage")
+    assert gke_model_registry.load_project_model(path) == model
+    assert gke_model_registry.load_project_model(path) == model
+    assert len(parses) == 3
+
+
+def test_subtree_hash_rehashes_only_the_changed_path(monkeypatch):
+    """Memoized digests: an edit recomputes its path, not its siblings"""
+    model = make_model(state())
+    model["domains"]["other"]["items"] = list(range(2000))
+    hasher = SubtreeHasher(model)
+    root = hasher.digest()
+    template = hasher.version([DEPLOY_TEMPLATE_PATH])
+
+    hashes = []
+    real_hash = gke_model_registry._hash
+    monkeypatch.setattr(gke_model_registry, "_hash",
+                        lambda *parts: hashes.append(1) or real_hash(*parts))
+    hasher.update(DEPLOYMENT_STATE_PATH, state(health="❌ All services pending"))
+    new_root = hasher.digest()
+    assert new_root != root and len(hashes) < 50
+    assert new_root == SubtreeHasher(json.loads(json.dumps(model))).digest()
+    assert hasher.version([DEPLOY_TEMPLATE_PATH]) == template
+
+    hasher.update(DEPLOY_TEMPLATE_PATH + ("variables", "project_id"), "other-project")
+    assert hasher.version([DEPLOY_TEMPLATE_PATH]) != template
+
+
+def test_deploy_script_goes_stale_only_when_its_template_changes(tmp_path, monkeypatch):
+    """A deployment_state update leaves the generated script's version valid"""
+    generator = load_script("generate-deploy-script")
+    verifier = load_script("verify-script-version")
+    model = make_model(state())
+    template = model["domains"]["hackathon"]["hackathon_mapping"]["gke_turns_10"] \
+        ["gcp_project_setup"]["deploy_template"]
+    template["variables"].update(cluster_name="demo", region="us-east1",
+                                 zone="us-east1-b", max_nodes=2,
+                                 max_pods_per_service=2)
+    path = write_registry(tmp_path, model)
+    monkeypatch.setattr(verifier, "MODEL_PATH", path)
+
+    script = tmp_path / "deploy.sh"
+    script.write_text(generator.generate_script(
+        template, generator.calculate_model_hash(model)))
+
+    def current():
+        subtrees = verifier.extract_script_subtrees(script)
+        assert subtrees == [DEPLOY_TEMPLATE_PATH]
+        return verifier.verify_script_version(
+            script, verifier.calculate_subtree_hash(subtrees))
+
+    assert current()
+    assert update_subtree(DEPLOYMENT_STATE_PATH,
+                          state(health="❌ All services pending"), path)
+    assert current()
+    assert update_subtree(DEPLOY_TEMPLATE_PATH + ("variables", "max_nodes"), 5, path)
+    assert not current()
@@ -0,0 +1,174 @@
+"""
+Tests for immutable monitor snapshots and the background refresher
+"""
+
+import threading
+
+import pytest
+
+import gke_binpacking
+from gke_cost_monitor import GKECostMonitor, PodTable, SnapshotRefresher
+from tests.helpers import make_pod
+
+
+class FakeMonitor(GKECostMonitor):
+    """Monitor with canned cluster data that counts cluster calls"""
+
+    def __init__(self):
+        self.cluster_calls = 0
+        self.node_count = 1
+        super().__init__()
+
+    def _get_project_id(self):
+        return "hack"
+
+    def _get_billing_account(self):
+        return "billing"
+
+    def get_gke_cluster_status(self):
+        self.cluster_calls += 1
+        return {"name": "ghostbusters-hackathon", "status": "RUNNING",
+                "node_count": self.node_count, "machine_type": "e2-micro",
+                "disk_size_gb": 20, "preemptible": False}
+
+    def get_gke_pod_status(self):
+        return {"total_pods": 2, "running_pods": 2, "cpu_utilization_percent": 50,
+                "memory_utilization_percent": 50, "by_namespace": {}, "by_workload": {}}
+
+    def get_cost_optimization_recommendations(self, cluster_status=None,
+                                              pod_status=None, pod_table=None):
+        return [f"💡 {cluster_status['node_count']} node(s)"]
+
+
+@pytest.fixture
+def monitor(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return FakeMonitor()
+
+
+def test_snapshot_is_immutable_and_consistent(monitor):
+    """Test that a snapshot cannot be mutated and matches its own analyses"""
+    snapshot = monitor.take_snapshot(1)
+
+    with pytest.raises(TypeError):
+        snapshot.costs["daily_cost"] = 0
+    with pytest.raises(TypeError):
+        monitor.cost_thresholds["development"]["daily"] = 100
+    assert snapshot.threshold_check["costs"] == snapshot.costs
+    assert snapshot.recommendations == ("💡 1 node(s)",)
+    assert snapshot.to_dict()["thresholds"] == {
+        "daily": 0.2, "weekly": 1.4, "monthly": 5.0}
+    assert monitor.cluster_calls == 1
+
+
+def test_phase_and_threshold_changes_do_not_touch_published_snapshots(monitor):
+    """Test copy-on-write phase and threshold updates"""
+    refresher = SnapshotRefresher(monitor)
+    first = refresher.refresh()
+
+    assert monitor.set_phase("demo")
+    monitor.update_thresholds("demo", {"daily": 2.0})
+    second = refresher.refresh()
+
+    assert first.phase == "development"
+    assert first.thresholds["daily"] == 0.2
+    assert (second.version, second.phase) == (2, "demo")
+    assert second.thresholds == {"daily": 2.0, "weekly": 5.83, "monthly": 25.0}
+    assert second.threshold_check["current_phase"] == "demo"
+
+
+def test_readers_share_background_snapshots(monitor):
+    """Test that many readers see whole snapshots without extra cluster calls"""
+    refresher = SnapshotRefresher(monitor, interval_seconds=0.01)
+    published = []
+    refresher.subscribe(published.append)
+    refresher.start()
+    assert refresher.wait_for(0, timeout=5) is not None
+
+    errors = []
+
+    def reader():
+        last_version = 0
+        for _ in range(2000):
+            snapshot = refresher.latest()
+            if snapshot.version < last_version or \
+                    snapshot.recommendations[0] != \
+                    f"💡 {snapshot.cluster_status['node_count']} node(s)":
+                errors.append(snapshot)
+            last_version = snapshot.version
+
+    def writer():
+        for count in range(2, 50):
+            monitor.node_count = count
+
+    threads = [threading.Thread(target=reader) for _ in range(8)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    refresher.stop(timeout=5)
+
+    assert not errors
+    assert monitor.cluster_calls == len(published) == refresher.version
+
+
+def test_pod_strings_are_rebuilt_as_rollouts_churn(monitor):
+    """Test that per-rollout label values leave the strings with their tables"""
+    for rollout in range(50):
+        table = PodTable(monitor.pod_strings)
+        for i in range(3):
+            table.append("ghostbusters-ai", f"web-{rollout}-{i}", "Running", "node-a",
+                         "Deployment/web", {"pod-template-hash": f"h{rollout}"},
+                         100.0, 128.0)
+        monitor._add_pod_table(table)
+
+    retained = {monitor.pod_strings[k] for t in monitor.pod_tables
+                for label_set in t.label_sets for _, k in label_set}
+    assert retained == {f"h{rollout}" for rollout in range(44, 50)}
+    assert len(monitor.pod_strings) <= 2 * (4 + len(monitor.pod_tables))
+    changes = monitor.pod_changes()
+    assert len(changes["added"]) == len(changes["removed"]) == 3
+    assert monitor.pod_tables[-1].rows(label=("pod-template-hash", "h49")) == [0, 1, 2]
+
+
+def test_snapshot_carries_pod_changes(monitor):
+    """Test that the report shows what changed between collections"""
+    for names in (["a", "b"], ["b", "c", "d"]):
+        table = PodTable(monitor.pod_strings)
+        for name in names:
+            table.append("jobs", name, "Running", "node-a", f"Pod/{name}", {},
+                         100.0, 64.0)
+        monitor._add_pod_table(table)
+
+    snapshot = monitor.take_snapshot(1)
+    assert snapshot.to_dict()["pod_changes"]["added"] == [["jobs", "c"], ["jobs", "d"]]
+    report = monitor.generate_cost_report(snapshot)
+    assert "2 added, 1 removed, 0 changed" in report
+    assert "**jobs**: CPU requests +100m" in report
+
+
+def test_snapshot_recommendations_come_from_its_own_collection(tmp_path,
+                                                               monkeypatch):
+    """Test that the node pool advice packs the snapshot's pods without re-listing"""
+    class CollectingMonitor(FakeMonitor):
+        get_cost_optimization_recommendations = \
+            GKECostMonitor.get_cost_optimization_recommendations
+
+        def get_gke_pod_status(self):
+            pods = [make_pod(f"api-{i}", cpu="100m", memory="64Mi") for i in range(2)]
+            self._add_pod_table(PodTable.from_pods(pods, (), self.pod_strings))
+            return super().get_gke_pod_status()
+
+    def collect_pods(*args, **kwargs):
+        raise AssertionError("pods were listed a second time")
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(gke_binpacking, "collect_pods", collect_pods)
+    monitor = CollectingMonitor()
+    monitor.node_count = 4
+    snapshot = monitor.take_snapshot(1)
+
+    assert len(monitor.pod_tables) == 1
+    assert snapshot.recommendations[0].startswith(
+        "💡 1 x e2-micro nodes would fit current workloads")
@@ -0,0 +1,76 @@
+"""
+Tests for the compact struct-of-arrays pod table
+"""
+
+import time
+
+from gke_cost_monitor import PodTable, StringTable
+from tests.helpers import make_metrics, make_pod
+
+
+def test_columns_and_scans():
+    """Rows are filtered and summed by code without per-pod dicts"""
+    pods = [
+        make_pod("web-1", owner="web"),
+        make_pod("web-2", owner="web", node="node-b"),
+        make_pod("batch-1", namespace="jobs", cpu="500m", memory="1Gi"),
+        make_pod("done-1", namespace="jobs", phase="Succeeded", cpu="2"),
+        make_pod("waiting", node=None, phase="Pending"),
+    ]
+    table = PodTable.from_pods(pods, [make_metrics("web-1", "50m", "64Mi")])
+
+    assert len(table) == 5
+    assert table.key(2) == ("jobs", "batch-1")
+    assert table.phase_counts() == {"Pending": 1, "Running": 3, "Succeeded": 1}
+    assert table.rows(namespace="jobs") == [2, 3]
+    assert table.rows(phase="Running", node="node-a") == [0, 2]
+    assert table.rows(label=("pod-template-hash", "abc12")) == [0, 1]
+    assert table.rows(namespace="missing") == []
+
+    # Terminated pods hold no requests
+    assert table.group_sum("cpu_requests_millicores") == {
+        "ghostbusters-ai": 300.0, "jobs": 500.0}
+    assert table.group_sum("cpu_requests_millicores", by="workload") == {
+        "Deployment/web": 200.0, "Pod/batch-1": 500.0, "Pod/done-1": 0.0,
+        "Pod/waiting": 100.0}
+    assert table.total("cpu_usage_millicores") == 50.0
+    assert table.total("memory_requests_mi", table.rows(namespace="jobs")) == 1024.0
+
+
+def test_strings_are_shared_and_diff():
+    """Tables sharing a StringTable store each string once and diff by pod"""
+    strings = StringTable()
+    before = PodTable.from_pods(
+        [make_pod("a"), make_pod("b"), make_pod("c", cpu="200m")], strings=strings)
+    after = PodTable.from_pods(
+        [make_pod("a"), make_pod("c", cpu="300m"), make_pod("d", namespace="new")],
+        strings=strings)
+
+    assert strings.values.count("ghostbusters-ai") == 1
+    assert before.namespace[0] == after.namespace[0]
+
+    changes = after.diff(before)
+    assert changes["added"] == [("new", "d")]
+    assert changes["removed"] == [("ghostbusters-ai", "b")]
+    assert changes["changed"] == [("ghostbusters-ai", "c")]
+    # b's removal and c's increase cancel out in the old namespace
+    assert changes["cpu_requests_delta_millicores"] == {"new": 100.0}
+
+
+def test_large_cluster_stays_compact():
+    """50k pods fit in a few MB and scan quickly"""
+    strings = StringTable()
+    table = PodTable(strings)
+    labels = [{"app": f"app-{i}", "pod-template-hash": "abc12"} for i in range(500)]
+    for i in range(50_000):
+        table.append(f"ns-{i % 40}", f"pod-{i:06d}", "Running", f"node-{i % 300}",
+                     f"Deployment/app-{i % 500}", labels[i % 500], 100.0, 256.0)
+
+    assert len(table.label_sets) == 500
+    assert table.nbytes < 4 * 1024 * 1024
+
+    start = time.perf_counter()
+    sums = table.group_sum("memory_requests_mi")
+    assert len(sums) == 40 and sums["ns-0"] == 1250 * 256.0
+    assert len(table.rows(namespace="ns-1", node="node-1")) > 0
+    assert time.perf_counter() - start < 2.0
@@ -0,0 +1,135 @@
+"""
+Tests for the rightsizing manifest patcher
+"""
+
+from pathlib import Path
+
+import pytest
+
+from gke_rightsizing import patch_manifest, rightsize_manifests
+
+MANIFEST = """# Agent
+apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: agent
+spec:
+  replicas: 2  # two replicas
+  template:
+    spec:
+      containers:
+      - name: worker
+        image: example/worker:v1
+        resources:
+          requests:
+            memory: "128Mi"    # Conservative resource requests
+            cpu: "100m"
+      - name: sidecar
+        image: example/sidecar:v1
+---
+apiVersion: v1
+kind: Service
+metadata:
+  name: agent
+"""
+
+
+def test_patch_replaces_values_and_keeps_comments():
+    """Test that existing values are replaced in place"""
+    recs = {("agent", "worker"): {"requests": {"memory": "64Mi", "cpu": "50m"}}}
+    patched, changes = patch_manifest(MANIFEST, recs)
+
+    assert '            memory: "64Mi"     # Conservative resource requests' in patched
+    assert '            cpu: "50m"' in patched
+    assert patched.startswith("# Agent\n")
+    assert "  replicas: 2  # two replicas" in patched
+    assert len(changes) == 2
+    assert all(c["replicas"] == 2 for c in changes)
+    # Both request reductions save money across two replicas
+    assert sum(c["monthly_delta"] for c in changes) < 0
+
+
+def test_patch_inserts_missing_sections():
+    """Test that limits and whole resources blocks are inserted when absent"""
+    recs = {
+        ("agent", "worker"): {"limits": {"cpu": "200m"}},
+        ("agent", "sidecar"): {"requests": {"cpu": "10m"}},
+    }
+    patched, changes = patch_manifest(MANIFEST, recs)
+    lines = patched.split("\n")
+
+    limits = lines.index("          limits:")
+    assert lines[limits + 1] == '            cpu: "200m"'
+
+    sidecar = lines.index("        image: example/sidecar:v1")
+    assert lines[sidecar + 1:sidecar + 4] == [
+        "        resources:",
+        "          requests:",
+        '            cpu: "10m"',
+    ]
+    assert {c["container"] for c in changes} == {"worker", "sidecar"}
+
+
+def test_patch_inserts_both_sections_as_one_block():
+    """Test that requests and limits land together in one new resources block"""
+    yaml = pytest.importorskip("yaml")
+    manifest = """apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: web
+spec:
+  template:
+    spec:
+      containers:
+      - name: nginx
+        image: nginx:1.25
+        ports:
+        - containerPort: 80
+"""
+    recs = {("web", "nginx"): {"requests": {"cpu": "50m", "memory": "64Mi"},
+                               "limits": {"cpu": "200m"}}}
+    patched, changes = patch_manifest(manifest, recs)
+
+    container = yaml.safe_load(patched)["spec"]["template"]["spec"]["containers"][0]
+    assert container["resources"] == {"requests": {"cpu": "50m", "memory": "64Mi"},
+                                      "limits": {"cpu": "200m"}}
+    assert container["ports"] == [{"containerPort": 80}]
+    assert len(changes) == 3
+
+
+def test_patch_ignores_unchanged_and_other_kinds():
+    """Test that matching values and non-Deployments are left alone"""
+    recs = {("agent", "worker"): {"requests": {"cpu": "100m"}}}
+    patched, changes = patch_manifest(MANIFEST, recs)
+
+    assert patched == MANIFEST
+    assert changes == []
+
+
+def test_rightsize_manifests_writes_copies(tmp_path):
+    """Test that copies, diff and saving are produced"""
+    manifest = tmp_path / "agent.yaml"
+    manifest.write_text(MANIFEST)
+    out_dir = tmp_path / "out"
+
+    recs = {("agent", "worker"): {"requests": {"cpu": "50m"}},
+            ("missing", "worker"): {"requests": {"cpu": "50m"}}}
+    result = rightsize_manifests(recs, [manifest], out_dir)
+
+    assert manifest.read_text() == MANIFEST
+    assert Path(result["written"][0]).read_text() != MANIFEST
+    assert '+            cpu: "50m"' in result["diff"]
+    assert result["unmatched"] == [("missing", "worker")]
+    assert result["monthly_saving"] > 0
+
+
+def test_rightsized_containers_are_not_unmatched(tmp_path):
+    """Test that a container already at its recommendation still counts as found"""
+    manifest = tmp_path / "agent.yaml"
+    manifest.write_text(MANIFEST)
+
+    recs = {("agent", "worker"): {"requests": {"cpu": "100m"}}}
+    result = rightsize_manifests(recs, [manifest], tmp_path / "out")
+
+    assert result["changes"] == []
+    assert result["unmatched"] == []
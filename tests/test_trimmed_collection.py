@@ -0,0 +1,105 @@
+"""
+Tests for server-side trimmed pod collection
+"""
+
+import json
+from urllib.parse import parse_qs, urlparse
+
+import gke_cost_monitor
+import gke_kubectl
+from gke_cost_monitor import collect_pods, compute_utilization
+
+
+def table(rows):
+    """Table response with metadata-only row objects"""
+    return {"kind": "Table", "metadata": {"resourceVersion": "7"},
+            "columnDefinitions": [{"name": "Name"}, {"name": "Status"},
+                                  {"name": "Node"}],
+            "rows": [{"cells": [m["name"], "Running", node],
+                      "object": {"metadata": m}} for m, node in rows]}
+
+
+def agent_pod(i):
+    return {"name": f"agent-abc12-{i}", "namespace": "ai",
+            "labels": {"pod-template-hash": "abc12"},
+            "ownerReferences": [{"kind": "ReplicaSet", "name": "agent-abc12"}]}
+
+
+class FakeApi:
+    """Answers pod, template and single-pod requests like the API server"""
+
+    def __init__(self):
+        self.paths = []
+
+    def __call__(self, path, accept=None):
+        self.paths.append(path)
+        url = urlparse(path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        selector = query.get("fieldSelector", "")
+
+        if url.path == "/apis/apps/v1/replicasets":
+            return {"metadata": {}, "items": [{
+                "metadata": {"name": "agent-abc12", "namespace": "ai"},
+                "spec": {"template": {"spec": {"containers": [
+                    {"resources": {"requests": {"cpu": "250m", "memory": "256Mi"}},
+                     "env": [{"name": "BIG", "value": "x" * 1000}]}]}}}}]}
+        if url.path.endswith("/pods/static"):
+            return {"spec": {"nodeName": "node-a", "containers": [
+                {"resources": {"requests": {"cpu": "100m"}}}]}}
+        if url.path == "/api/v1/pods" and selector == "status.phase=Running":
+            assert query["includeObject"] == "Metadata" and "Table" in accept
+            return table([(agent_pod(i), "node-a") for i in range(3)]
+                         + [({"name": "static", "namespace": "kube-system"}, "node-a")])
+        if url.path == "/api/v1/pods" and selector == "status.phase=Pending":
+            return table([(agent_pod(9), "<none>")])
+        if url.path == "/api/v1/pods" and selector == "status.phase=Failed":
+            assert query["includeObject"] == "None"
+            return {"kind": "Table", "metadata": {}, "rows": [{"cells": []}] * 2}
+        return {"kind": "Table", "metadata": {}, "rows": []}
+
+
+def test_pods_from_metadata_rows_and_templates(monkeypatch):
+    """Test that metadata-only rows get template requests and phase counts"""
+    api = FakeApi()
+    monkeypatch.setattr(gke_kubectl, "get_raw", api)
+    monkeypatch.setattr(gke_cost_monitor, "get_raw", api)
+    monkeypatch.setattr(gke_cost_monitor, "supports_trimmed_responses", lambda: True)
+
+    pods = collect_pods()
+    assert pods["counts"] == {"Succeeded": 0, "Failed": 2}
+    assert len(pods["items"]) == 5
+    assert "env" not in json.dumps(pods["items"])
+
+    status = compute_utilization(pods["items"], [], [], phase_counts=pods["counts"])
+    assert (status["total_pods"], status["running_pods"],
+            status["pending_pods"]) == (7, 4, 1)
+    assert status["requested_cpu_millicores"] == 4 * 250 + 100
+    assert status["by_node"]["node-a"]["pods"] == 4
+    assert sum(1 for p in api.paths if "/pods/static" in p) == 1
+
+
+def test_fallback_lists_full_pods_by_phase(monkeypatch):
+    """Test that without the client, full pods are compacted page by page"""
+    full_pod = {"metadata": {"name": "web", "namespace": "ai",
+                             "annotations": {"a": "b"}},
+                "spec": {"nodeName": "node-b", "containers": [
+                    {"resources": {"requests": {"cpu": "1"}}, "image": "web"}]},
+                "status": {"phase": "Running", "conditions": []}}
+    served = []
+
+    def api(path, accept=None):
+        served.append(path)
+        running = "status.phase%3DRunning" in path
+        return {"metadata": {}, "items": [full_pod] if running else []}
+
+    monkeypatch.setattr(gke_kubectl, "get_raw", api)
+    monkeypatch.setattr(gke_cost_monitor, "supports_trimmed_responses", lambda: False)
+
+    pods = collect_pods(namespaces=["ai"])
+    assert pods["items"] == [{"metadata": {"name": "web", "namespace": "ai"},
+                              "spec": {"nodeName": "node-b",
+                                       "containers": [
+                                           {"resources": {"requests": {"cpu": "1"}}}],
+                                       "initContainers": []},
+                              "status": {"phase": "Running"}}]
+    assert all(p.startswith("/api/v1/namespaces/ai/pods?") for p in served)
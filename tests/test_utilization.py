@@ -0,0 +1,98 @@
+"""
+Tests for request-based utilization in the GKE cost monitor
+"""
+
+from gke_cost_monitor import (
+    compute_utilization,
+    parse_cpu_millicores,
+    parse_memory_mi,
+    pod_requests,
+    pod_workload,
+)
+from tests.helpers import NODES, make_metrics, make_pod
+
+
+def test_quantity_parsing():
+    """Test Kubernetes quantity conversion"""
+    assert parse_cpu_millicores("250m") == 250
+    assert parse_cpu_millicores("0.5") == 500
+    assert parse_cpu_millicores("2500000n") == 2.5
+    assert parse_memory_mi("1Gi") == 1024
+    assert parse_memory_mi("2048Ki") == 2
+    assert parse_memory_mi("") == 0
+
+
+def test_pod_requests_and_workload():
+    """Test effective requests and owner resolution"""
+    pod = make_pod("agent-abc12-xyz", owner="agent")
+    pod["spec"]["initContainers"] = [{"resources": {"requests": {"cpu": "500m"}}}]
+
+    assert pod_requests(pod) == (500, 128)
+    assert pod_workload(pod) == "Deployment/agent"
+    assert pod_workload(make_pod("bare")) == "Pod/bare"
+
+
+def test_utilization_uses_requests_of_measured_pods():
+    """Test that pods without metrics do not dilute utilization"""
+    pods = [
+        make_pod("a-abc12-1", owner="a"),
+        make_pod("a-abc12-2", owner="a"),
+        make_pod("b", namespace="kube-system", cpu="200m", memory="256Mi"),
+        make_pod("done", phase="Succeeded"),
+    ]
+    metrics = [
+        make_metrics("a-abc12-1", "50m", "64Mi"),
+        make_metrics("b", "20m", "64Mi", namespace="kube-system"),
+    ]
+
+    status = compute_utilization(pods, metrics, NODES)
+
+    assert status["total_pods"] == 4
+    assert status["running_pods"] == 3
+    assert status["pods_without_metrics"] == 2
+    # 70m used over the 300m requested by the two measured pods
+    assert status["cpu_utilization_percent"] == round(70 / 300 * 100, 1)
+    assert status["requested_cpu_millicores"] == 400
+    assert status["cpu_allocated_percent"] == round(400 / 940 * 100, 1)
+
+    workload = status["by_workload"]["ghostbusters-ai/Deployment/a"]
+    assert workload["pods"] == 2
+    assert workload["cpu_utilization_percent"] == 50.0
+
+    assert status["by_namespace"]["kube-system"]["memory_utilization_percent"] == 25.0
+    assert status["by_node"]["node-a"]["allocatable_cpu_millicores"] == 940
+
+
+def test_node_metrics_matrix_and_pool_scores():
+    """Test the per-node matrix, hot nodes, stranded capacity and pool scores"""
+    nodes = [
+        {"metadata": {"name": name, "labels": {
+            "cloud.google.com/gke-nodepool": pool,
+            "node.kubernetes.io/instance-type": "e2-standard-2"}},
+         "status": {"allocatable": {"cpu": "1930m", "memory": "6000Mi", "pods": "110"}}}
+        for name, pool in (("node-a", "default-pool"), ("node-b", "default-pool"),
+                           ("node-c", "spot-pool"))
+    ]
+    pods = [make_pod("big", node="node-a", cpu="500m", memory="5800Mi"),
+            make_pod("small", node="node-b", cpu="100m", memory="128Mi")]
+    node_metrics = [
+        {"metadata": {"name": "node-a"}, "usage": {"cpu": "1800m", "memory": "3Gi"}},
+        {"metadata": {"name": "node-b"}, "usage": {"cpu": "200m", "memory": "1Gi"}}]
+
+    status = compute_utilization(pods, [], nodes, node_metrics)
+
+    node_a = status["by_node"]["node-a"]
+    assert (node_a["pool"], node_a["machine_type"]) == ("default-pool", "e2-standard-2")
+    assert node_a["stranded_cpu_millicores"] == 1430       # memory is fully requested
+    assert node_a["stranded_memory_mi"] == 0
+    assert status["hot_nodes"] == ["node-a"]
+    assert status["nodes_without_metrics"] == 1
+
+    columns = status["node_matrix"]["columns"]
+    rows = {row[0]: dict(zip(columns, row)) for row in status["node_matrix"]["rows"]}
+    assert rows["node-a"]["cpu_used_percent"] == round(1800 / 1930 * 100, 1)
+
+    default_pool = status["by_pool"]["default-pool"]
+    assert (default_pool["nodes"], default_pool["hot_nodes"]) == (2, 1)
+    assert status["by_pool"]["spot-pool"]["allocation_score"] == 0
+    assert 0 < default_pool["usage_score"] < 100
@@ -0,0 +1,115 @@
+"""
+Tests for the idle and orphaned resource detector
+"""
+
+from datetime import datetime, timezone
+
+import gke_cost_monitor
+import gke_kubectl
+from gke_waste_detector import LOAD_BALANCER_DAILY_COST, collect_snapshot, find_waste
+
+NOW = datetime(2025, 9, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def pod(name, phase="Running", owner=None, claim=None, **status):
+    """Build a minimal pod object"""
+    metadata = {"name": name, "namespace": "ai", "labels": {},
+                "creationTimestamp": "2025-09-01T10:00:00Z"}
+    if owner:
+        metadata["ownerReferences"] = [{"kind": "ReplicaSet", "name": f"{owner}-h1"}]
+        metadata["labels"]["pod-template-hash"] = "h1"
+    spec = {"containers": [{"resources": {"requests": {"cpu": "500m",
+                                                        "memory": "512Mi"}}}]}
+    if claim:
+        spec["volumes"] = [{"persistentVolumeClaim": {"claimName": claim}}]
+    return {"kind": "Pod", "metadata": metadata, "spec": spec,
+            "status": dict(phase=phase, **status)}
+
+
+def test_find_waste_flags_each_category():
+    """Test that every waste category is detected with a cost"""
+    items = [
+        pod("job-1", phase="Succeeded"),
+        pod("stuck", phase="Pending", conditions=[
+            {"type": "PodScheduled", "status": "False", "reason": "Unschedulable"}]),
+        pod("db-0", claim="data-used"),
+        pod("web-h1-a", owner="web"),
+        pod("web-h1-b", owner="web"),
+        {"kind": "PersistentVolumeClaim",
+         "metadata": {"name": "data-used", "namespace": "ai"},
+         "spec": {"storageClassName": "standard-rwo"},
+         "status": {"phase": "Bound", "capacity": {"storage": "30Gi"}}},
+        {"kind": "PersistentVolumeClaim",
+         "metadata": {"name": "data-old", "namespace": "ai"},
+         "spec": {"storageClassName": "standard-rwo"},
+         "status": {"phase": "Bound", "capacity": {"storage": "30Gi"}}},
+        {"kind": "PersistentVolumeClaim",
+         "metadata": {"name": "data-new", "namespace": "ai"},
+         "status": {"phase": "Pending"}},
+        {"kind": "Service", "metadata": {"name": "public", "namespace": "ai"},
+         "spec": {"type": "LoadBalancer"}},
+        {"kind": "Endpoints", "metadata": {"name": "public", "namespace": "ai"},
+         "subsets": []},
+        {"kind": "Deployment", "metadata": {"name": "web", "namespace": "ai"},
+         "spec": {"replicas": 2, "template": pod("template")}},
+    ]
+    metrics = [
+        {"metadata": {"name": "web-h1-a", "namespace": "ai"},
+         "containers": [{"usage": {"cpu": "1m"}}]},
+        {"metadata": {"name": "web-h1-b", "namespace": "ai"},
+         "containers": [{"usage": {"cpu": "2m"}}]},
+    ]
+
+    result = find_waste({"items": items, "pod_metrics": metrics}, now=NOW)
+    found = {(f["type"], f["name"]): f for f in result["findings"]}
+
+    assert set(found) == {
+        ("finished_pod", "job-1"),
+        ("pending_pod", "stuck"),
+        ("unused_pvc", "data-old"),
+        ("unbound_pvc", "data-new"),
+        ("idle_load_balancer", "public"),
+        ("idle_deployment", "web"),
+    }
+    assert found[("unused_pvc", "data-old")]["daily_cost"] == 0.1
+    assert found[("idle_load_balancer", "public")]["daily_cost"] == \
+        LOAD_BALANCER_DAILY_COST
+    assert found[("pending_pod", "stuck")]["daily_cost"] > 0
+    assert found[("idle_deployment", "web")]["daily_cost"] == \
+        found[("pending_pod", "stuck")]["daily_cost"]
+    assert result["by_type"]["finished_pod"]["count"] == 1
+
+
+def test_idle_deployments_need_metrics():
+    """Test that traffic is not judged when metrics are unavailable"""
+    items = [
+        pod("web-h1-a", owner="web"),
+        {"kind": "Deployment", "metadata": {"name": "web", "namespace": "ai"},
+         "spec": {"replicas": 3}},
+    ]
+    result = find_waste({"items": items, "pod_metrics": None}, now=NOW)
+    assert result["findings"] == []
+
+
+def test_collect_snapshot_lists_each_kind_in_pages(monkeypatch):
+    """Test that the snapshot comes from paged listings with kinds restored"""
+    requests = []
+
+    def get_raw(path, accept=None):
+        requests.append(path)
+        if path.startswith("/apis/metrics.k8s.io"):
+            return {"items": [{"metadata": {"name": "api-1"}}]}
+        resource = path.split("?")[0].rsplit("/", 1)[-1]
+        return {"metadata": {"resourceVersion": "7"},
+                "items": [{"metadata": {"name": f"{resource}-1"}}]}
+
+    monkeypatch.setattr(gke_kubectl, "get_raw", get_raw)
+    monkeypatch.setattr(gke_cost_monitor, "get_raw", get_raw)
+    snapshot = collect_snapshot()
+
+    assert [(i["kind"], i["metadata"]["name"]) for i in snapshot["items"]] == [
+        ("Pod", "pods-1"), ("PersistentVolumeClaim", "persistentvolumeclaims-1"),
+        ("Service", "services-1"), ("Endpoints", "endpoints-1"),
+        ("Deployment", "deployments-1")]
+    assert snapshot["pod_metrics"] == [{"metadata": {"name": "api-1"}}]
+    assert all("limit=" in path for path in requests[:-1])
@@ -0,0 +1,58 @@
+"""
+Tests for the what-if scenario cost engine
+"""
+
+import time
+
+import pytest
+
+from gke_cost_monitor import MACHINE_TYPES, node_pool_costs
+from gke_what_if import compare, price_scenarios
+
+
+def test_grid_matches_cluster_cost_model():
+    """Test that every scenario costs what estimate_gke_costs would report"""
+    rows = price_scenarios(["e2-medium", "e2-standard-2"], [1, 3],
+                           disk_sizes_gb=[20, 100], phases=["development", "demo"])
+
+    assert len(rows) == 2 * 2 * 2 * 2 * 2
+    for row in rows:
+        expected = node_pool_costs(row["machine_type"], row["node_count"], row["spot"],
+                                   row["disk_size_gb"])
+        assert row["daily_cost"] == expected["daily_cost"]
+        assert row["monthly_cost"] == expected["monthly_cost"]
+    assert [r["daily_cost"] for r in rows] == sorted(r["daily_cost"] for r in rows)
+
+
+def test_compare_spot_against_on_demand():
+    """Test the spot e2-medium x3 vs on-demand e2-standard-2 x2 question"""
+    rows = compare([
+        {"machine_type": "e2-medium", "node_count": 3, "spot": True},
+        {"machine_type": "e2-standard-2", "node_count": 2, "spot": False,
+         "phase": "demo"},
+    ])
+
+    assert [r["machine_type"] for r in rows] == ["e2-medium", "e2-standard-2"]
+    assert rows[0]["node_cost"] == round(18.0 * 0.5 * 3 / 30, 2)
+    assert (rows[1]["phase"], rows[1]["status"]) == ("demo", "critical")
+
+
+def test_fit_status_and_validation():
+    """Test the aggregate capacity check and input validation"""
+    rows = price_scenarios(["e2-micro", "e2-standard-4"], [1], spot=[False],
+                           cpu_requests_millicores=2000, memory_requests_mi=4096)
+    assert [(r["machine_type"], r["fits"]) for r in rows] == [
+        ("e2-standard-4", True), ("e2-micro", False)]
+
+    with pytest.raises(ValueError):
+        price_scenarios(["e2-huge"], [1])
+
+
+def test_large_grid_is_fast():
+    """Test that thousands of scenarios price in well under a second"""
+    start = time.perf_counter()
+    rows = price_scenarios(list(MACHINE_TYPES), list(range(1, 21)),
+                           disk_sizes_gb=[20, 50, 100],
+                           phases=["development", "testing", "demo"])
+    assert len(rows) == len(MACHINE_TYPES) * 20 * 2 * 3 * 3
+    assert time.perf_counter() - start < 1.0